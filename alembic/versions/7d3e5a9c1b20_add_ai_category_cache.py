@@ -0,0 +1,42 @@
+"""Add ai_category_cache table
+
+Also merges the two existing heads (budgets cleanup and recurring removal).
+
+Revision ID: 7d3e5a9c1b20
+Revises: 3f2c9a1b7e4a, c5f1e2b3d4e5
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3e5a9c1b20'
+down_revision: Union[str, Sequence[str], None] = ('3f2c9a1b7e4a', 'c5f1e2b3d4e5')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ai_category_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('description_key', sa.String(length=255), nullable=False),
+        sa.Column('categories_hash', sa.String(length=64), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('description_key', 'categories_hash', name='uq_ai_category_cache_key'),
+    )
+    op.create_index(op.f('ix_ai_category_cache_id'), 'ai_category_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_category_cache_updated_at'), 'ai_category_cache', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_category_cache_updated_at'), table_name='ai_category_cache')
+    op.drop_index(op.f('ix_ai_category_cache_id'), table_name='ai_category_cache')
+    op.drop_table('ai_category_cache')
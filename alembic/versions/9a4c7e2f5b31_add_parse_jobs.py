@@ -0,0 +1,47 @@
+"""Add parse_jobs table
+
+Revision ID: 9a4c7e2f5b31
+Revises: 7d3e5a9c1b20
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c7e2f5b31'
+down_revision: Union[str, Sequence[str], None] = '7d3e5a9c1b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'parse_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=True),
+        sa.Column('status', sa.String(length=20), server_default='queued', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error_code', sa.String(length=50), nullable=True),
+        sa.Column('error_detail', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_parse_jobs_user_id'), 'parse_jobs', ['user_id'], unique=False)
+    op.create_index('ix_parse_jobs_status_created_at', 'parse_jobs', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_parse_jobs_status_created_at', table_name='parse_jobs')
+    op.drop_index(op.f('ix_parse_jobs_user_id'), table_name='parse_jobs')
+    op.drop_table('parse_jobs')
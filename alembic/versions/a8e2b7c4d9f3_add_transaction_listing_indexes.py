@@ -0,0 +1,32 @@
+"""Add transaction listing indexes
+
+Per-user indexes for the filtered/sorted GET /transactions/ (date, amount, type).
+
+Revision ID: a8e2b7c4d9f3
+Revises: f1c6d8a3b5e7
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e2b7c4d9f3'
+down_revision: Union[str, Sequence[str], None] = 'f1c6d8a3b5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_transactions_user_date_id', 'transactions', ['user_id', 'transaction_date', 'id'], unique=False)
+    op.create_index('ix_transactions_user_amount_id', 'transactions', ['user_id', 'amount', 'id'], unique=False)
+    op.create_index('ix_transactions_user_type_date', 'transactions', ['user_id', 'type', 'transaction_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_user_type_date', table_name='transactions')
+    op.drop_index('ix_transactions_user_amount_id', table_name='transactions')
+    op.drop_index('ix_transactions_user_date_id', table_name='transactions')
@@ -0,0 +1,53 @@
+"""Restore budgets table
+
+The table was dropped in 3f2c9a1b7e4a while the budgets module was parked;
+the module is mounted again. Skipped when the table already exists (created
+by `create_all` on environments that kept the model).
+
+Revision ID: b2e8d4f6a913
+Revises: 9a4c7e2f5b31
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e8d4f6a913'
+down_revision: Union[str, Sequence[str], None] = '9a4c7e2f5b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('budgets'):
+        return
+    op.create_table(
+        'budgets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('notify_threshold', sa.Float(), nullable=False, comment='Percentual para alerta, ex.: 0.8 = 80%'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'category_id', 'year', 'month', name='uq_budget_user_category_month'),
+    )
+    op.create_index(op.f('ix_budgets_id'), 'budgets', ['id'], unique=False)
+    op.create_index(op.f('ix_budgets_user_id'), 'budgets', ['user_id'], unique=False)
+    op.create_index(op.f('ix_budgets_category_id'), 'budgets', ['category_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_budgets_category_id'), table_name='budgets')
+    op.drop_index(op.f('ix_budgets_user_id'), table_name='budgets')
+    op.drop_index(op.f('ix_budgets_id'), table_name='budgets')
+    op.drop_table('budgets')
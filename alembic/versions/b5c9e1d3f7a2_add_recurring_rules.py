@@ -0,0 +1,56 @@
+"""Add recurring transaction rules
+
+Rules only: occurrences are computed on demand for the requested window
+(no next_run_date, no materialized rows).
+
+Revision ID: b5c9e1d3f7a2
+Revises: a8e2b7c4d9f3
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c9e1d3f7a2'
+down_revision: Union[str, Sequence[str], None] = 'a8e2b7c4d9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'recurring_transactions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('type', postgresql.ENUM('INCOME', 'EXPENSE', name='transactiontype', create_type=False), nullable=False),
+        sa.Column('frequency', sa.Enum('DAILY', 'WEEKLY', 'MONTHLY', name='frequency'), nullable=False),
+        sa.Column('interval', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.Column('weekday', sa.Integer(), nullable=True, comment='0 = segunda ... 6 = domingo (WEEKLY)'),
+        sa.Column('day_of_month', sa.Integer(), nullable=True, comment='1-31; meses curtos usam o último dia (MONTHLY)'),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_recurring_transactions_id'), 'recurring_transactions', ['id'], unique=False)
+    op.create_index(op.f('ix_recurring_transactions_category_id'), 'recurring_transactions', ['category_id'], unique=False)
+    op.create_index('ix_recurring_transactions_user_dates', 'recurring_transactions', ['user_id', 'start_date', 'end_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recurring_transactions_user_dates', table_name='recurring_transactions')
+    op.drop_index(op.f('ix_recurring_transactions_category_id'), table_name='recurring_transactions')
+    op.drop_index(op.f('ix_recurring_transactions_id'), table_name='recurring_transactions')
+    op.drop_table('recurring_transactions')
+    op.execute("DROP TYPE IF EXISTS frequency")
@@ -0,0 +1,66 @@
+"""Add budget spent counters
+
+Adds budgets.spent / budgets.alert_level (maintained on every expense write)
+and backfills them from existing transactions. Columns/index already created
+by `create_all` are left as they are.
+
+Revision ID: c4f1a7b9d2e6
+Revises: b2e8d4f6a913
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f1a7b9d2e6'
+down_revision: Union[str, Sequence[str], None] = 'b2e8d4f6a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Each step is skipped when `create_all` already built it (see b2e8d4f6a913)
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('budgets')}
+    indexes = {index['name'] for index in inspector.get_indexes('budgets')}
+    if 'spent' not in columns:
+        op.add_column('budgets', sa.Column('spent', sa.Numeric(precision=15, scale=2), server_default='0', nullable=False))
+    if 'alert_level' not in columns:
+        op.add_column('budgets', sa.Column('alert_level', sa.String(length=10), server_default='ok', nullable=False, comment='ok | warning | exceeded'))
+    if 'ix_budgets_user_month_alert' not in indexes:
+        op.create_index('ix_budgets_user_month_alert', 'budgets', ['user_id', 'year', 'month', 'alert_level'], unique=False)
+
+    # Backfill recomputes from the transactions, so it is safe to run either way
+    op.execute("""
+        UPDATE budgets b
+        SET spent = s.total
+        FROM (
+            SELECT user_id, category_id,
+                   EXTRACT(YEAR FROM transaction_date)::int AS year,
+                   EXTRACT(MONTH FROM transaction_date)::int AS month,
+                   SUM(amount) AS total
+            FROM transactions
+            WHERE type = 'EXPENSE' AND category_id IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ) s
+        WHERE b.user_id = s.user_id AND b.category_id = s.category_id
+          AND b.year = s.year AND b.month = s.month
+    """)
+    op.execute("""
+        UPDATE budgets
+        SET alert_level = CASE
+            WHEN spent >= amount THEN 'exceeded'
+            WHEN spent >= amount * notify_threshold THEN 'warning'
+            ELSE 'ok'
+        END
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_budgets_user_month_alert', table_name='budgets')
+    op.drop_column('budgets', 'alert_level')
+    op.drop_column('budgets', 'spent')
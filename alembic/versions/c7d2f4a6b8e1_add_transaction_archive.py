@@ -0,0 +1,75 @@
+"""Add transaction archive
+
+Cold history moves from `transactions` to `archived_transactions` (same ids,
+one index) with per-month totals in `transaction_month_summaries`;
+`users.archived_before` tells reads when the archive must be consulted.
+
+Revision ID: c7d2f4a6b8e1
+Revises: b5c9e1d3f7a2
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2f4a6b8e1'
+down_revision: Union[str, Sequence[str], None] = 'b5c9e1d3f7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    transaction_type = postgresql.ENUM('INCOME', 'EXPENSE', name='transactiontype', create_type=False)
+    op.create_table(
+        'archived_transactions',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('type', transaction_type, nullable=False),
+        sa.Column('transaction_date', sa.Date(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_transactions_user_date', 'archived_transactions', ['user_id', 'transaction_date', 'id'], unique=False)
+
+    op.create_table(
+        'transaction_month_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('type', transaction_type, nullable=False),
+        sa.Column('total', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('last_date', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_transaction_month_summaries_user_period', 'transaction_month_summaries', ['user_id', 'year', 'month'], unique=False)
+
+    op.add_column('users', sa.Column('archived_before', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    # Devolve o histórico arquivado para a tabela quente antes de remover o arquivo
+    op.execute(
+        "INSERT INTO transactions (id, user_id, description, amount, type, transaction_date, category_id, created_at) "
+        "SELECT id, user_id, description, amount, type, transaction_date, category_id, created_at FROM archived_transactions"
+    )
+    op.drop_column('users', 'archived_before')
+    op.drop_index('ix_transaction_month_summaries_user_period', table_name='transaction_month_summaries')
+    op.drop_table('transaction_month_summaries')
+    op.drop_index('ix_archived_transactions_user_date', table_name='archived_transactions')
+    op.drop_table('archived_transactions')
@@ -0,0 +1,32 @@
+"""Add covering index for category usage statistics
+
+Revision ID: d7a2c5e8f1b4
+Revises: c4f1a7b9d2e6
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2c5e8f1b4'
+down_revision: Union[str, Sequence[str], None] = 'c4f1a7b9d2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_transactions_user_category_date',
+        'transactions',
+        ['user_id', 'category_id', 'transaction_date'],
+        unique=False,
+        postgresql_include=['amount', 'type'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_user_category_date', table_name='transactions')
@@ -0,0 +1,57 @@
+"""Add categorization_backfills table
+
+Checkpoints of the resumable auto-categorization of uncategorized history,
+plus a partial index for the keyset walk over uncategorized transactions.
+
+Revision ID: e3b9f4a6c8d1
+Revises: d7a2c5e8f1b4
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b9f4a6c8d1'
+down_revision: Union[str, Sequence[str], None] = 'd7a2c5e8f1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'categorization_backfills',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), server_default='queued', nullable=False,
+                  comment='queued | running | completed | cancelled | failed'),
+        sa.Column('last_transaction_id', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('processed', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('categorized', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('error_detail', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index(
+        'ix_categorization_backfills_status_heartbeat', 'categorization_backfills', ['status', 'heartbeat_at'], unique=False
+    )
+    op.create_index(
+        'ix_transactions_uncategorized',
+        'transactions',
+        ['user_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text('category_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_uncategorized', table_name='transactions')
+    op.drop_index('ix_categorization_backfills_status_heartbeat', table_name='categorization_backfills')
+    op.drop_table('categorization_backfills')
@@ -0,0 +1,61 @@
+"""Add transaction description search
+
+pg_trgm / unaccent / btree_gin, the immutable f_unaccent() wrapper, generated
+search_text / search_vector columns and their per-user GIN indexes.
+
+Revision ID: f1c6d8a3b5e7
+Revises: e3b9f4a6c8d1
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6d8a3b5e7'
+down_revision: Union[str, Sequence[str], None] = 'e3b9f4a6c8d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+            AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """)
+    op.add_column('transactions', sa.Column(
+        'search_text', sa.Text(), sa.Computed('lower(f_unaccent(description))', persisted=True), nullable=True
+    ))
+    op.add_column('transactions', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple'::regconfig, lower(f_unaccent(description)))", persisted=True),
+        nullable=True,
+    ))
+    op.create_index(
+        'ix_transactions_search_text_trgm',
+        'transactions',
+        ['user_id', 'search_text'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'search_text': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_transactions_search_vector', 'transactions', ['user_id', 'search_vector'], unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_search_vector', table_name='transactions')
+    op.drop_index('ix_transactions_search_text_trgm', table_name='transactions')
+    op.drop_column('transactions', 'search_vector')
+    op.drop_column('transactions', 'search_text')
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
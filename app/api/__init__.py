@@ -3,6 +3,10 @@ from .transactions import router as transactions_router
 from .auth import router as auth_router
 from .user import router as user_router
 from .insights import router as insights_router
+from .jobs import router as jobs_router
+from .categories import router as categories_router
+from .budgets import router as budgets_router
+from .recurring import router as recurring_router
 
 api_router = APIRouter()
 
@@ -10,3 +14,7 @@ api_router.include_router(auth_router)
 api_router.include_router(transactions_router)
 api_router.include_router(user_router)
 api_router.include_router(insights_router)
+api_router.include_router(jobs_router)
+api_router.include_router(categories_router)
+api_router.include_router(budgets_router)
+api_router.include_router(recurring_router)
@@ -2,10 +2,11 @@ from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 
 from app.config import get_db
-from app.schemas import BudgetCreate, BudgetResponse
+from app.schemas import BudgetCreate, BudgetBatchUpsert, BudgetResponse
 from app.services import BudgetService
-from app.repositories import BudgetRepository, TransactionRepository
+from app.repositories import BudgetRepository, TransactionRepository, CategoryRepository
 from app.api.dependencies import get_current_user
+from app.api.responses import list_response
 from app.infrastructure.database import User
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/budgets", tags=["budgets"])
 def get_budget_service(db: Session = Depends(get_db)) -> BudgetService:
     budget_repo = BudgetRepository(db)
     txn_repo = TransactionRepository(db)
-    return BudgetService(budget_repo, txn_repo)
+    return BudgetService(budget_repo, txn_repo, CategoryRepository(db))
 
 
 @router.get("/", response_model=list[BudgetResponse])
@@ -25,7 +26,7 @@ def list_budgets(
     current_user: User = Depends(get_current_user),
     service: BudgetService = Depends(get_budget_service),
 ):
-    return service.list_budgets(current_user, year, month, alerts_only)
+    return list_response(BudgetResponse, service.list_budgets(current_user, year, month, alerts_only), trusted=True)
 
 
 @router.post("/", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
@@ -35,3 +36,25 @@ def upsert_budget(
     service: BudgetService = Depends(get_budget_service),
 ):
     return service.upsert_budget(current_user, data)
+
+
+@router.post("/batch", response_model=list[BudgetResponse])
+def upsert_budgets_batch(
+    data: BudgetBatchUpsert,
+    current_user: User = Depends(get_current_user),
+    service: BudgetService = Depends(get_budget_service),
+):
+    """Cria/atualiza todos os orçamentos do mês numa única instrução (INSERT ... ON CONFLICT)."""
+    return list_response(BudgetResponse, service.upsert_budgets_batch(current_user, data), trusted=True)
+
+
+@router.post("/copy-previous", response_model=list[BudgetResponse])
+def copy_previous_month_budgets(
+    year: int = Query(..., ge=2000, le=2100),
+    month: int = Query(..., ge=1, le=12),
+    overwrite: bool = Query(False, description="Substitui orçamentos já definidos no mês de destino"),
+    current_user: User = Depends(get_current_user),
+    service: BudgetService = Depends(get_budget_service),
+):
+    """Copia os orçamentos do mês anterior para year/month e retorna os orçamentos do mês."""
+    return list_response(BudgetResponse, service.copy_previous_month(current_user, year, month, overwrite), trusted=True)
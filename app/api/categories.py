@@ -2,10 +2,11 @@ from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.orm import Session
 
 from app.config import get_db
-from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse
-from app.services import CategoryService
-from app.repositories import CategoryRepository
+from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithStatsResponse, CategoryMergeResponse
+from app.services import CategoryService, TransactionService
+from app.repositories import CategoryRepository, TransactionRepository, BudgetRepository
 from app.api.dependencies import get_current_user
+from app.api.responses import list_response
 from app.infrastructure.database import User
 
 router = APIRouter(prefix="/categories", tags=["categories"])
@@ -13,16 +14,19 @@ router = APIRouter(prefix="/categories", tags=["categories"])
 
 def get_category_service(db: Session = Depends(get_db)) -> CategoryService:
     repo = CategoryRepository(db)
-    return CategoryService(repo)
+    return CategoryService(repo, TransactionService(TransactionRepository(db), BudgetRepository(db)))
 
 
-@router.get("/", response_model=list[CategoryResponse])
+@router.get("/", response_model=list[CategoryWithStatsResponse] | list[CategoryResponse])
 def list_categories(
     origin: str | None = Query(None, pattern="^(auto|manual)$", description="Filtrar origem da categoria"),
+    with_stats: bool = Query(False, description="Incluir transaction_count, month_spent e last_used"),
     current_user: User = Depends(get_current_user),
     service: CategoryService = Depends(get_category_service),
 ):
-    return service.list_categories(current_user, origin=origin)
+    if with_stats:
+        return list_response(CategoryWithStatsResponse, service.list_categories_with_stats(current_user, origin=origin), trusted=True)
+    return list_response(CategoryResponse, service.list_categories(current_user, origin=origin), trusted=True)
 
 
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
@@ -44,6 +48,17 @@ def rename_category(
     return service.rename_category(current_user, category_id, data)
 
 
+@router.post("/{category_id}/merge-into/{target_id}", response_model=CategoryMergeResponse)
+def merge_category(
+    category_id: int,
+    target_id: int,
+    current_user: User = Depends(get_current_user),
+    service: CategoryService = Depends(get_category_service),
+):
+    """Move todas as transações para a categoria de destino e remove a de origem (e seus orçamentos)."""
+    return service.merge_category(current_user, category_id, target_id)
+
+
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_category(
     category_id: int,
@@ -0,0 +1,187 @@
+"""
+Response compression negotiated via `Accept-Encoding`.
+
+`CompressionMiddleware` (pure ASGI) compresses response bodies with Brotli
+or gzip, preferring the client's highest q-value and Brotli on ties.
+
+- Buffered responses shorter than `minimum_size` go out untouched.
+- Streamed responses (`more_body`) are buffered only up to `minimum_size`;
+  past that every chunk is compressed and flushed as it arrives, so large
+  streams start transferring at once and memory stays bounded by one chunk.
+- Responses that already carry a `Content-Encoding`, or whose media type is
+  already compressed (images, audio, video, archives, PDF), pass through.
+"""
+
+import zlib
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_PRECOMPRESSED_TYPES = (
+    "image/",
+    "audio/",
+    "video/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-bzip2",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/pdf",
+    "application/octet-stream",
+    # SSE: cada evento precisa chegar assim que é enviado
+    "text/event-stream",
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick "br" or "gzip" from an `Accept-Encoding` header (None = send identity).
+
+    Honours q-values (`gzip;q=0` refuses gzip) and `*`; on equal weights Brotli wins.
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in ("br", "gzip"):
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Incremental gzip/Brotli compressor: `compress` + `flush` per chunk, `finish` at the end."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31: container gzip (cabeçalho + CRC)
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress `data` and flush it, so the client can decode what was sent so far."""
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush()
+
+
+class CompressionMiddleware:
+    """Compress responses for clients that accept gzip/Brotli (pure ASGI, streaming-safe)."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+
+class _CompressingSend:
+    """The `send` callable handed to the app for one request."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.buffer = bytearray()
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").lower()
+            if (
+                message["status"] < 200
+                or message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or media_type.startswith(_PRECOMPRESSED_TYPES)
+            ):
+                self.passthrough = True
+                await self.send(message)
+                return
+            MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            if self.encoding is None:
+                self.passthrough = True
+                await self.send(message)
+                return
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            data = self.compressor.chunk(body) if more_body else self.compressor.finish(body)
+            if data or not more_body:
+                await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        self.buffer.extend(body)
+        if len(self.buffer) < self.middleware.minimum_size:
+            if more_body:
+                return
+            # Pequena demais: compressão não compensa o cabeçalho + CPU
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": bytes(self.buffer)})
+            return
+
+        self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        data = bytes(self.buffer)
+        self.buffer = bytearray()
+        if more_body:
+            # Tamanho final desconhecido: vai em chunked
+            del headers["Content-Length"]
+            compressed = self.compressor.chunk(data)
+        else:
+            compressed = self.compressor.finish(data)
+            headers["Content-Length"] = str(len(compressed))
+        # ETag forte descreve os bytes originais, não os comprimidos
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
@@ -0,0 +1,51 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+
+from app.config import get_db, settings
+from app.schemas import ParseJobResponse
+from app.services.parse_job_worker import get_parse_job_worker
+from app.repositories import ParseJobRepository
+from app.infrastructure.database import User
+from app.api.dependencies import get_current_user
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+_TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+@router.get("/{job_id}", response_model=ParseJobResponse)
+async def get_job(
+    job_id: str,
+    wait: int = Query(0, ge=0, description="Long-polling: segundos a aguardar a conclusão do job"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Estado de um smart-parse assíncrono.
+
+    Com `wait=N` a resposta é segurada até o job terminar ou N segundos
+    passarem (limitado por `parse_jobs_long_poll_max_seconds`).
+    """
+    repository = ParseJobRepository(db)
+    worker = get_parse_job_worker()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(wait, settings.parse_jobs_long_poll_max_seconds)
+
+    user_id = current_user.id
+    while True:
+        job = await asyncio.to_thread(repository.get_for_user, job_id, user_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"detail": "Job não encontrado", "code": "JOB_NOT_FOUND"}
+            )
+        remaining = deadline - loop.time()
+        if job.status in _TERMINAL_STATUSES or remaining <= 0:
+            return ParseJobResponse.from_job(job)
+        # Give the connection back to the pool while waiting; the next round reads
+        # fresh (the worker commits from another session) on a new checkout
+        await asyncio.to_thread(db.close)
+        # Woken immediately by a local worker; otherwise re-check the DB each poll interval
+        await worker.wait_for(job_id, timeout=min(remaining, settings.parse_jobs_poll_seconds))
@@ -0,0 +1,88 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.config import get_db, settings
+from app.schemas import (
+    RecurringTransactionCreate,
+    RecurringTransactionUpdate,
+    RecurringTransactionResponse,
+    RecurringOccurrence,
+)
+from app.services import RecurringTransactionService
+from app.repositories import RecurringTransactionRepository
+from app.api.dependencies import get_current_user
+from app.api.responses import list_response
+from app.infrastructure.database import User
+
+router = APIRouter(prefix="/recurring-transactions", tags=["recurring-transactions"])
+
+
+def get_recurring_service(db: Session = Depends(get_db)) -> RecurringTransactionService:
+    return RecurringTransactionService(RecurringTransactionRepository(db))
+
+
+@router.get("/", response_model=list[RecurringTransactionResponse])
+def list_recurring_transactions(
+    current_user: User = Depends(get_current_user),
+    service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    return list_response(RecurringTransactionResponse, service.list_rules(current_user))
+
+
+@router.post("/", response_model=RecurringTransactionResponse, status_code=status.HTTP_201_CREATED)
+def create_recurring_transaction(
+    data: RecurringTransactionCreate,
+    current_user: User = Depends(get_current_user),
+    service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    return service.create_rule(current_user, data)
+
+
+@router.get("/occurrences", response_model=list[RecurringOccurrence])
+def list_occurrences(
+    start: date = Query(...),
+    end: date = Query(...),
+    current_user: User = Depends(get_current_user),
+    service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    """Ocorrências projetadas de todas as regras em [start, end], calculadas sob demanda."""
+    if end < start or (end - start).days > settings.balance_forecast_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "detail": f"Janela inválida: end deve ser posterior a start e no máximo {settings.balance_forecast_max_days} dias depois",
+                "code": "INVALID_FORECAST_WINDOW",
+                "meta": {"max_days": settings.balance_forecast_max_days},
+            },
+        )
+    return list_response(RecurringOccurrence, service.occurrences(current_user, start, end), trusted=True)
+
+
+@router.get("/{rule_id}", response_model=RecurringTransactionResponse)
+def get_recurring_transaction(
+    rule_id: int,
+    current_user: User = Depends(get_current_user),
+    service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    return service.get_rule(current_user, rule_id)
+
+
+@router.patch("/{rule_id}", response_model=RecurringTransactionResponse)
+def update_recurring_transaction(
+    rule_id: int,
+    data: RecurringTransactionUpdate,
+    current_user: User = Depends(get_current_user),
+    service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    return service.update_rule(current_user, rule_id, data)
+
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_recurring_transaction(
+    rule_id: int,
+    current_user: User = Depends(get_current_user),
+    service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    service.delete_rule(current_user, rule_id)
+    return None
@@ -1,5 +1,7 @@
-from fastapi.responses import JSONResponse
-from typing import Dict, Any
+from functools import lru_cache
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+from typing import Dict, Any, Iterable, List
 
 
 def success_response(message: str, data: Any = None, status_code: int = 200) -> JSONResponse:
@@ -16,6 +18,34 @@ def error_response(message: str, details: Dict = None, status_code: int = 400) -
     return JSONResponse(content=response, status_code=status_code)
 
 
+@lru_cache(maxsize=None)
+def list_adapter(item_type: type) -> TypeAdapter:
+    """Compiled (and cached) validator/serializer for `List[item_type]`."""
+    return TypeAdapter(List[item_type])
+
+
+def list_response(item_type: type, items: Iterable, trusted: bool = False) -> Response:
+    """
+    Serialize a list response straight to JSON bytes (pydantic-core), bypassing
+    FastAPI's response_model pass (validate → python → JSON encoder).
+
+    ORM rows are read once through `from_attributes`; `trusted=True` skips
+    validation for items that already are `item_type` instances built by the
+    service. Plain dicts (e.g. balance series) should use `ORJSONResponse`.
+    """
+    adapter = list_adapter(item_type)
+    if trusted:
+        items = list(items)
+    else:
+        items = adapter.validate_python(items, from_attributes=True)
+    return Response(content=adapter.dump_json(items), media_type="application/json")
+
+
+def model_response(model) -> Response:
+    """JSON bytes of an already-built pydantic model (no second validation)."""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
 class APIMessages:
     TRANSACTION_CREATED = "Transação criada com sucesso"
     TRANSACTION_UPDATED = "Transação atualizada com sucesso"
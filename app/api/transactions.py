@@ -1,28 +1,65 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import JSONResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
-from datetime import date
+from datetime import date, timedelta
+from decimal import Decimal
 
-from app.config import get_db
+from app.config import get_db, settings
 from app.schemas import (
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
+    TransactionRecategorize,
+    TransactionRecategorizeResponse,
+    TransactionBulkUpdate,
+    TransactionBulkDelete,
+    TransactionBulkResponse,
+    TransactionSearchPage,
+    TransactionSort,
     DailyBalanceResponse,
+    BalanceForecastResponse,
+    ParseJobResponse,
+    CategorizationBackfillResponse,
 )
 from app.schemas.smart_transaction import SmartTransactionRequest, SmartTransactionResponse
-from app.services import TransactionService
+from app.services import TransactionService, RecurringTransactionService
 from app.services.smart_transaction_parser import get_smart_parser
-from app.repositories import TransactionRepository
-from app.infrastructure.database import User
+from app.services.ai_resilience import CircuitOpenError
+from app.services.parse_job_worker import get_parse_job_worker
+from app.services.categorization_backfill import request_backfill
+from app.services.transaction_categorizer import categorize_in_background
+from app.repositories import (
+    TransactionRepository,
+    ParseJobRepository,
+    BudgetRepository,
+    CategorizationBackfillRepository,
+    RecurringTransactionRepository,
+)
+from app.infrastructure.database import User, TransactionType
 from app.api.dependencies import get_current_user
+from app.api.uploads import read_upload, check_audio_duration
+from app.api.responses import list_response, model_response
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 
 def get_transaction_service(db: Session = Depends(get_db)) -> TransactionService:
     repository = TransactionRepository(db)
-    return TransactionService(repository)
+    return TransactionService(repository, BudgetRepository(db))
+
+
+async def enqueue_parse_job(db: Session, user: User, kind: str, data: bytes, content_type: str) -> JSONResponse:
+    """Persist an image/audio parse job and answer 202 with its polling location."""
+    job = await asyncio.to_thread(ParseJobRepository(db).create, user.id, kind, content_type, data)
+    get_parse_job_worker().notify()
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=ParseJobResponse.from_job(job).model_dump(mode="json"),
+        headers={"Location": f"{settings.api_v1_prefix}/jobs/{job.id}"},
+    )
 
 
 @router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
@@ -32,9 +69,13 @@ def create_transaction(
     service: TransactionService = Depends(get_transaction_service)
 ):
     try:
-        return service.create_transaction(transaction, current_user)
+        created = service.create_transaction(transaction, current_user)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"detail": str(e), "code": "TRANSACTION_CREATE_ERROR"})
+    # Após o commit e fora da requisição: regras e, se preciso, AI
+    if created.category_id is None and current_user.auto_categorize_enabled:
+        categorize_in_background(current_user.id, [created.id])
+    return created
 
 
 @router.get("/", response_model=List[TransactionResponse])
@@ -42,12 +83,121 @@ def list_transactions(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
     on_date: date | None = Query(None, description="Filtrar por data exata (YYYY-MM-DD)"),
+    start: date | None = Query(None, description="Data inicial (inclusive)"),
+    end: date | None = Query(None, description="Data final (inclusive)"),
+    type: TransactionType | None = Query(None, description="income | expense"),
+    category_id: str | None = Query(
+        None, pattern=r"^(\d{1,9}|uncategorized)$", description="Id da categoria ou 'uncategorized'"
+    ),
+    min_amount: Decimal | None = Query(None, ge=0),
+    max_amount: Decimal | None = Query(None, ge=0),
+    sort: TransactionSort = Query(TransactionSort.DATE_DESC, description="date_desc | date_asc | amount_desc | amount_asc"),
     current_user: User = Depends(get_current_user),
     service: TransactionService = Depends(get_transaction_service)
 ):
-    return service.list_transactions(
-        current_user, skip=skip, limit=limit, on_date=on_date
-    )
+    try:
+        transactions = service.list_transactions(
+            current_user,
+            skip=skip,
+            limit=limit,
+            on_date=on_date,
+            start_date=start,
+            end_date=end,
+            transaction_type=type,
+            category_id=int(category_id) if category_id and category_id != "uncategorized" else None,
+            uncategorized=category_id == "uncategorized",
+            min_amount=min_amount,
+            max_amount=max_amount,
+            sort=sort,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"detail": str(e), "code": "INVALID_FILTER"})
+    return list_response(TransactionResponse, transactions)
+
+
+@router.get("/search", response_model=TransactionSearchPage)
+def search_transactions(
+    q: str = Query(..., min_length=2, max_length=100, description="Texto buscado na descrição (sem diferenciar acentos/maiúsculas)"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor da página anterior"),
+    current_user: User = Depends(get_current_user),
+    service: TransactionService = Depends(get_transaction_service)
+):
+    """Busca ranqueada (full-text + trigramas) com paginação keyset."""
+    try:
+        page = service.search_transactions(current_user, q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"detail": str(e), "code": "INVALID_CURSOR"})
+    return model_response(page)
+
+
+@router.post("/recategorize", response_model=TransactionRecategorizeResponse)
+def recategorize_transactions(
+    data: TransactionRecategorize,
+    current_user: User = Depends(get_current_user),
+    service: TransactionService = Depends(get_transaction_service)
+):
+    """Recategoriza em um único UPDATE todas as transações que atendem aos filtros."""
+    try:
+        return TransactionRecategorizeResponse(updated=service.recategorize(data, current_user))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"detail": str(e), "code": "CATEGORY_NOT_FOUND"})
+
+
+@router.patch("/bulk", response_model=TransactionBulkResponse)
+def bulk_update_transactions(
+    data: TransactionBulkUpdate,
+    current_user: User = Depends(get_current_user),
+    service: TransactionService = Depends(get_transaction_service)
+):
+    """Aplica as mesmas alterações (`type`, `transaction_date`, `category_id`) às transações selecionadas em um único UPDATE."""
+    try:
+        return TransactionBulkResponse(affected=service.bulk_update(data, current_user))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"detail": str(e), "code": "CATEGORY_NOT_FOUND"})
+
+
+@router.post("/bulk-delete", response_model=TransactionBulkResponse)
+def bulk_delete_transactions(
+    data: TransactionBulkDelete,
+    current_user: User = Depends(get_current_user),
+    service: TransactionService = Depends(get_transaction_service)
+):
+    """Remove as transações selecionadas (`ids` ou `filter`) em um único DELETE."""
+    return TransactionBulkResponse(affected=service.bulk_delete(data, current_user))
+
+
+@router.post(
+    "/auto-categorize/backfill",
+    response_model=CategorizationBackfillResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def start_categorization_backfill(
+    restart: bool = Query(False, description="Recomeçar do início (reavalia transações já percorridas)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Enfileira (ou retoma) a categorização automática das transações sem categoria."""
+    if not current_user.auto_categorize_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"detail": "Categorização automática está desativada", "code": "AUTO_CATEGORIZE_DISABLED"},
+        )
+    return CategorizationBackfillResponse.from_backfill(request_backfill(db, current_user.id, restart=restart))
+
+
+@router.get("/auto-categorize/backfill", response_model=CategorizationBackfillResponse)
+def get_categorization_backfill(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    backfill = CategorizationBackfillRepository(db).get(current_user.id)
+    if backfill is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"detail": "Nenhuma categorização do histórico iniciada", "code": "BACKFILL_NOT_FOUND"},
+        )
+    return CategorizationBackfillResponse.from_backfill(backfill)
 
 
 @router.get("/balance/daily", response_model=List[DailyBalanceResponse])
@@ -57,7 +207,32 @@ def get_daily_balance(
     current_user: User = Depends(get_current_user),
     service: TransactionService = Depends(get_transaction_service)
 ):
-    return service.calculate_daily_balance(year, month, current_user)
+    # Série já montada pelo serviço (floats/strings): direto para orjson, sem revalidar
+    return ORJSONResponse(service.calculate_daily_balance(year, month, current_user))
+
+
+@router.get("/balance/forecast", response_model=List[BalanceForecastResponse])
+def get_balance_forecast(
+    until: date = Query(..., description="Último dia da previsão (a partir de hoje)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    service: TransactionService = Depends(get_transaction_service)
+):
+    """Saldo diário do início do mês corrente até `until`, somando as ocorrências futuras das regras recorrentes."""
+    today = date.today()
+    if until < today or until > today + timedelta(days=settings.balance_forecast_max_days):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "detail": f"until deve estar entre hoje e {settings.balance_forecast_max_days} dias à frente",
+                "code": "INVALID_FORECAST_WINDOW",
+                "meta": {"max_days": settings.balance_forecast_max_days},
+            },
+        )
+    projected = RecurringTransactionService(RecurringTransactionRepository(db)).occurrences(
+        current_user, today + timedelta(days=1), until
+    )
+    return ORJSONResponse(service.forecast_balance(current_user, until, projected))
 
 
 @router.get("/daily-balance", response_model=List[DailyBalanceResponse])
@@ -71,7 +246,7 @@ def get_daily_balance_alias(
 
     Retorna o saldo diário do mês (um objeto por dia), cumulativo.
     """
-    return service.calculate_daily_balance(year, month, current_user)
+    return ORJSONResponse(service.calculate_daily_balance(year, month, current_user))
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
@@ -161,14 +336,23 @@ def parse_smart_transaction(
         )
 
 
-@router.post("/smart-parse-image", response_model=SmartTransactionResponse)
+@router.post(
+    "/smart-parse-image",
+    response_model=SmartTransactionResponse,
+    responses={202: {"model": ParseJobResponse, "description": "Job enfileirado (async=true)"}},
+)
 async def parse_image_transaction(
     image: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    run_async: bool = Query(False, alias="async", description="Enfileira o parse e responde 202 com o id do job"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """
     Parse transaction data from an image (receipt, note, etc) using AI.
     Supports: JPG, PNG, WEBP
+
+    With `?async=true` the upload is queued and the endpoint answers 202 with a
+    job id; poll `GET /jobs/{id}` (optionally with `wait=N` long-polling).
     """
     import logging
     logger = logging.getLogger(__name__)
@@ -196,8 +380,10 @@ async def parse_image_transaction(
                 }
             )
         
-        image_bytes = await image.read()
-        result = parser.parse_image(image_bytes, image.content_type)
+        image_bytes = await read_upload(image, settings.upload_max_image_bytes)
+        if run_async:
+            return await enqueue_parse_job(db, current_user, "image", image_bytes, image.content_type)
+        result = await parser.parse_image_async(image_bytes, image.content_type)
         
         if not result:
             logger.warning(f"⚠️ Failed to parse image from user {current_user.id}")
@@ -213,6 +399,22 @@ async def parse_image_transaction(
         return result
     except HTTPException:
         raise
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "detail": "Serviço de AI demorou demais para responder. Tente novamente.",
+                "code": "AI_TIMEOUT"
+            }
+        )
+    except CircuitOpenError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "detail": "Serviço de AI não está disponível no momento.",
+                "code": "AI_SERVICE_UNAVAILABLE"
+            }
+        )
     except Exception as e:
         logger.error(f"❌ Unexpected error in image parse: {e}", exc_info=True)
         raise HTTPException(
@@ -224,14 +426,23 @@ async def parse_image_transaction(
         )
 
 
-@router.post("/smart-parse-audio", response_model=SmartTransactionResponse)
+@router.post(
+    "/smart-parse-audio",
+    response_model=SmartTransactionResponse,
+    responses={202: {"model": ParseJobResponse, "description": "Job enfileirado (async=true)"}},
+)
 async def parse_audio_transaction(
     audio: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    run_async: bool = Query(False, alias="async", description="Enfileira o parse e responde 202 com o id do job"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """
     Parse transaction data from an audio file using AI (transcription + parsing).
     Supports: MP3, WAV, M4A, OGG
+
+    With `?async=true` the upload is queued and the endpoint answers 202 with a
+    job id; poll `GET /jobs/{id}` (optionally with `wait=N` long-polling).
     """
     import logging
     logger = logging.getLogger(__name__)
@@ -259,8 +470,11 @@ async def parse_audio_transaction(
                 }
             )
         
-        audio_bytes = await audio.read()
-        result = parser.parse_audio(audio_bytes, audio.content_type)
+        audio_bytes = await read_upload(audio, settings.upload_max_audio_bytes)
+        check_audio_duration(audio_bytes, audio.content_type, settings.upload_max_audio_seconds)
+        if run_async:
+            return await enqueue_parse_job(db, current_user, "audio", audio_bytes, audio.content_type)
+        result = await parser.parse_audio_async(audio_bytes, audio.content_type)
         
         if not result:
             logger.warning(f"⚠️ Failed to parse audio from user {current_user.id}")
@@ -276,6 +490,22 @@ async def parse_audio_transaction(
         return result
     except HTTPException:
         raise
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "detail": "Serviço de AI demorou demais para responder. Tente novamente.",
+                "code": "AI_TIMEOUT"
+            }
+        )
+    except CircuitOpenError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "detail": "Serviço de AI não está disponível no momento.",
+                "code": "AI_SERVICE_UNAVAILABLE"
+            }
+        )
     except Exception as e:
         logger.error(f"❌ Unexpected error in audio parse: {e}", exc_info=True)
         raise HTTPException(
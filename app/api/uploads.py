@@ -0,0 +1,108 @@
+"""
+Size-limited upload handling for the multimodal endpoints.
+
+`UploadLimitMiddleware` rejects oversized requests with 413 as early as
+possible: from the Content-Length header before any byte is read, or while
+the body streams in (chunked uploads / lying clients). Multipart files are
+spooled to a temporary file by Starlette beyond 1 MB, and `read_upload`
+re-checks the per-type limit in chunks, so memory per request stays bounded
+by the configured maximums.
+"""
+
+import io
+import wave
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_CHUNK_SIZE = 256 * 1024
+# Multipart boundaries/headers around the file part
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail={
+            "detail": f"Arquivo excede o tamanho máximo de {max_bytes / (1024 * 1024):.0f} MB.",
+            "code": "PAYLOAD_TOO_LARGE",
+            "meta": {"max_bytes": max_bytes},
+        },
+    )
+
+
+class UploadLimitMiddleware:
+    """Enforce a maximum request body size on specific paths (pure ASGI, streaming-safe)."""
+
+    def __init__(self, app: ASGIApp, limits: dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_bytes = self.limits.get(scope["path"].rstrip("/"))
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            error = _too_large(max_bytes)
+            response = JSONResponse(status_code=error.status_code, content=error.detail)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Raised inside body parsing: FastAPI re-raises HTTPException untouched
+                    raise _too_large(max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def read_upload(upload: UploadFile, max_bytes: int) -> bytes:
+    """Read an UploadFile in chunks, failing with 413 as soon as it exceeds `max_bytes`."""
+    buffer = bytearray()
+    while True:
+        chunk = await upload.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise _too_large(max_bytes)
+    return bytes(buffer)
+
+
+def check_audio_duration(audio_bytes: bytes, content_type: str, max_seconds: int) -> None:
+    """
+    Reject audio longer than `max_seconds` when the duration can be read from the header.
+
+    Only WAV headers are inspected (stdlib); compressed formats are bounded by size alone.
+    """
+    if content_type not in ("audio/wav", "audio/x-wav", "audio/wave"):
+        return
+    try:
+        with wave.open(io.BytesIO(audio_bytes)) as wav:
+            duration = wav.getnframes() / float(wav.getframerate() or 1)
+    except (wave.Error, EOFError):
+        return
+    if duration > max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail={
+                "detail": f"Áudio excede a duração máxima de {max_seconds} segundos.",
+                "code": "AUDIO_TOO_LONG",
+                "meta": {"max_seconds": max_seconds, "duration_seconds": round(duration, 1)},
+            },
+        )
@@ -0,0 +1,16 @@
+"""
+One archival sweep of cold transaction history (for cron / scheduled jobs).
+
+    python -m app.archive
+
+Moves transactions older than ARCHIVE_AFTER_MONTHS to the archive; see
+app/services/transaction_archive.py.
+"""
+import logging
+
+from app.config import settings  # noqa: F401  (config must load before the services package)
+from app.services.transaction_archive import TransactionArchiver
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    TransactionArchiver().run_once()
@@ -17,8 +17,87 @@ class Settings(BaseSettings):
     cors_allow_credentials: bool = False
     
     # AI Configuration
-    ai_provider: str = "gemini"
+    ai_provider: str = "gemini"  # gemini | stub
     ai_provider_api_key: str | None = None
+    # Provedor stub (offline, determinístico): latência ± jitter e taxa de erros injetados
+    ai_stub_latency_ms: int = 300
+    ai_stub_jitter_ms: int = 100
+    ai_stub_error_rate: float = 0.0
+    ai_stub_seed: int = 42
+    # Gravação/reprodução de respostas da AI: "" (desligado) | record | replay
+    ai_record_mode: str = ""
+    ai_record_dir: str = "ai_recordings"
+    # Prazo máximo (segundos) de cada chamada ao provedor de AI
+    ai_request_timeout_seconds: float = 30.0
+    # Circuit breaker: falhas consecutivas (erro, timeout ou chamada lenta) que abrem o circuito
+    ai_breaker_failure_threshold: int = 5
+    ai_breaker_reset_seconds: float = 30.0
+    ai_breaker_slow_call_seconds: float = 15.0
+    # Hedging: dispara uma segunda tentativa se a primeira não responder em N segundos (0 desativa)
+    ai_hedge_after_seconds: float = 0.0
+    ai_max_concurrency: int = 16
+    # Smart-parse: confiança mínima do parser local para dispensar a AI
+    smart_parse_local_confidence_threshold: float = 0.85
+    # Cache de resultados do smart-parse (comando normalizado + data de hoje)
+    smart_parse_cache_size: int = 2048
+    smart_parse_cache_ttl_seconds: int = 600
+    # Resultados de imagem/áudio por hash do conteúdo (entradas; cada uma guarda só o resultado)
+    smart_parse_media_cache_size: int = 1024
+    # Pré-processamento de imagens de recibo antes do upload para a AI
+    image_preprocess_enabled: bool = True
+    image_max_dimension: int = 1600
+    image_output_format: str = "JPEG"  # JPEG | WEBP
+    image_quality: int = 80
+    image_preprocess_workers: int = 2
+    # Limites de upload (smart-parse de imagem/áudio)
+    upload_max_image_bytes: int = 10 * 1024 * 1024
+    upload_max_audio_bytes: int = 10 * 1024 * 1024
+    upload_max_audio_seconds: int = 120
+    # Jobs assíncronos de smart-parse (?async=true): workers por processo (0 = só enfileira;
+    # rode `python -m app.parse_worker` em processo separado)
+    parse_jobs_workers: int = 4
+    parse_jobs_poll_seconds: float = 1.0
+    parse_jobs_max_attempts: int = 3
+    # Job "running" há mais tempo que isso é considerado abandonado (worker morreu) e volta à fila
+    parse_jobs_stale_after_seconds: int = 300
+    # Tempo de espera pelos jobs em andamento no desligamento
+    parse_jobs_drain_seconds: float = 25.0
+    # Long-polling máximo em GET /jobs/{id}?wait=N
+    parse_jobs_long_poll_max_seconds: int = 30
+    # Cache de categorização por AI (memória LRU + tabela ai_category_cache)
+    ai_category_cache_ttl_hours: int = 720
+    ai_category_cache_size: int = 4096
+    # Categorização automática pós-criação (threads dedicadas, fora do threadpool web)
+    auto_categorize_workers: int = 4
+    # Espera pelas categorizações na fila ao desligar (o que sobrar fica para o backfill)
+    auto_categorize_drain_seconds: float = 10.0
+    # Backfill da categorização automática do histórico (um job por vez por processo)
+    categorize_backfill_enabled: bool = True
+    categorize_backfill_batch_size: int = 200
+    # Pausa entre lotes para não competir com o tráfego interativo
+    categorize_backfill_pause_seconds: float = 0.5
+    categorize_backfill_poll_seconds: float = 5.0
+    # Job "running" sem heartbeat há mais tempo que isso foi abandonado e é retomado
+    categorize_backfill_stale_after_seconds: int = 120
+    # Estatísticas de uso por categoria (GET /categories/?with_stats=true), por usuário
+    category_stats_cache_size: int = 1024
+    category_stats_cache_ttl_seconds: int = 60
+    # Arquivamento do histórico frio: transações com mais de N meses (alinhado ao mês) saem da tabela quente
+    archive_enabled: bool = False
+    archive_after_months: int = 24
+    archive_batch_size: int = 5000
+    archive_interval_seconds: int = 86400
+    # Previsão de saldo (GET /transactions/balance/forecast): horizonte máximo de `until`
+    balance_forecast_max_days: int = 731
+    # Compressão das respostas (Brotli ou gzip), negociada por Accept-Encoding
+    compression_enabled: bool = True
+    # Respostas menores que isso (bytes) vão sem compressão
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6  # 1-9
+    compression_brotli_quality: int = 4  # 0-11
+    # Micro-batching: máximo de descrições por prompt e espera máxima (0 desativa o agrupamento)
+    ai_batch_max_size: int = 25
+    ai_batch_max_wait_ms: int = 50
     
     class Config:
         env_file = ".env"
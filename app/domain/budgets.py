@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+BUDGET_OK = "ok"
+BUDGET_WARNING = "warning"
+BUDGET_EXCEEDED = "exceeded"
+ALERT_STATUSES = (BUDGET_WARNING, BUDGET_EXCEEDED)
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date]:
+    """First and last day of the month."""
+    start_date = date(year, month, 1)
+    if month == 12:
+        end_date = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        end_date = date(year, month + 1, 1) - timedelta(days=1)
+    return start_date, end_date
+
+
+def budget_status(spent: Decimal, amount: Decimal, notify_threshold: float) -> str:
+    """ok | warning (>= notify_threshold of the amount) | exceeded (>= 100%)."""
+    amount = Decimal(amount)
+    percent = float(Decimal(spent) / amount) if amount > 0 else 0.0
+    if percent >= 1.0:
+        return BUDGET_EXCEEDED
+    if percent >= notify_threshold:
+        return BUDGET_WARNING
+    return BUDGET_OK
@@ -0,0 +1,66 @@
+import calendar
+import enum
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+
+class Frequency(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+def _ceil_div(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+def occurrences(
+    frequency: Frequency,
+    interval: int,
+    start_date: date,
+    window_start: date,
+    window_end: date,
+    end_date: Optional[date] = None,
+    weekday: Optional[int] = None,
+    day_of_month: Optional[int] = None,
+) -> Iterator[date]:
+    """
+    Lazily yield the rule's dates within [window_start, window_end] (inclusive).
+
+    Nothing is stored: the first occurrence inside the window is found
+    arithmetically (no walk from `start_date`), then each next one is a
+    fixed step away, so a window years after the start costs the same.
+
+    - DAILY: every `interval` days from `start_date`.
+    - WEEKLY: every `interval` weeks on `weekday` (0 = Monday; default: weekday of `start_date`).
+    - MONTHLY: every `interval` months on `day_of_month` (default: day of `start_date`);
+      short months use their last day (31 → 28/29/30).
+    """
+    first = max(start_date, window_start)
+    last = min(end_date, window_end) if end_date is not None else window_end
+    if first > last:
+        return
+
+    if frequency == Frequency.MONTHLY:
+        day = day_of_month or start_date.day
+        start_index = start_date.year * 12 + start_date.month - 1
+        k = _ceil_div(max(0, first.year * 12 + first.month - 1 - start_index), interval)
+        while True:
+            year, month0 = divmod(start_index + k * interval, 12)
+            current = date(year, month0 + 1, min(day, calendar.monthrange(year, month0 + 1)[1]))
+            if current > last:
+                return
+            if current >= first:
+                yield current
+            k += 1
+
+    if frequency == Frequency.WEEKLY:
+        anchor = start_date + timedelta(days=((weekday if weekday is not None else start_date.weekday()) - start_date.weekday()) % 7)
+        step = 7 * interval
+    else:
+        anchor = start_date
+        step = interval
+    current = anchor + timedelta(days=_ceil_div(max(0, (first - anchor).days), step) * step)
+    while current <= last:
+        yield current
+        current += timedelta(days=step)
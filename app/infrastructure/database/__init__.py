@@ -2,6 +2,12 @@ from .database import Base, engine, get_db, SessionLocal
 from .user import User
 from .transaction import Transaction, TransactionType
 from .category import Category
+from .budget import Budget
+from .ai_category_cache import AICategoryCacheEntry
+from .parse_job import ParseJob
+from .categorization_backfill import CategorizationBackfill
+from .recurring_transaction import RecurringTransaction
+from .transaction_archive import ArchivedTransaction, TransactionMonthSummary
 
 __all__ = [
 	"Base",
@@ -12,4 +18,11 @@ __all__ = [
 	"Transaction",
 	"TransactionType",
 	"Category",
+	"Budget",
+	"AICategoryCacheEntry",
+	"ParseJob",
+	"CategorizationBackfill",
+	"RecurringTransaction",
+	"ArchivedTransaction",
+	"TransactionMonthSummary",
 ]
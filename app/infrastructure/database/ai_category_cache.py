@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.infrastructure.database.database import Base
+
+
+class AICategoryCacheEntry(Base):
+    """Memo da resposta da AI para (descrição normalizada, conjunto de categorias)."""
+
+    __tablename__ = "ai_category_cache"
+    __table_args__ = (
+        UniqueConstraint('description_key', 'categories_hash', name='uq_ai_category_cache_key'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    description_key = Column(String(255), nullable=False)
+    categories_hash = Column(String(64), nullable=False)
+    # NULL = a AI não encontrou categoria válida (resultado negativo também é memorizado)
+    category = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<AICategoryCacheEntry(description_key='{self.description_key}', category='{self.category}')>"
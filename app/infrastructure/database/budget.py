@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Numeric, DateTime, ForeignKey, UniqueConstraint, Float
+from sqlalchemy import Column, Integer, Numeric, DateTime, ForeignKey, UniqueConstraint, Float, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -9,6 +9,8 @@ class Budget(Base):
     __tablename__ = "budgets"
     __table_args__ = (
         UniqueConstraint('user_id', 'category_id', 'year', 'month', name='uq_budget_user_category_month'),
+        # alerts_only: orçamentos do mês em warning/exceeded sem reagregar transações
+        Index('ix_budgets_user_month_alert', 'user_id', 'year', 'month', 'alert_level'),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -18,6 +20,9 @@ class Budget(Base):
     month = Column(Integer, nullable=False)
     amount = Column(Numeric(15, 2), nullable=False)
     notify_threshold = Column(Float, nullable=False, default=0.8, comment="Percentual para alerta, ex.: 0.8 = 80%")
+    # Gasto acumulado (despesas da categoria no mês), mantido a cada escrita de transação
+    spent = Column(Numeric(15, 2), nullable=False, default=0, server_default='0')
+    alert_level = Column(String(10), nullable=False, default="ok", server_default='ok', comment="ok | warning | exceeded")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -25,4 +30,4 @@ class Budget(Base):
     category = relationship("Category")
 
     def __repr__(self):
-        return f"<Budget(id={self.id}, category_id={self.category_id}, {self.month}/{self.year}, amount={self.amount})>"
\ No newline at end of file
+        return f"<Budget(id={self.id}, category_id={self.category_id}, {self.month}/{self.year}, amount={self.amount})>"
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from app.infrastructure.database.database import Base
+
+
+class CategorizationBackfill(Base):
+    """Checkpoint da categorização automática do histórico (um por usuário)."""
+
+    __tablename__ = "categorization_backfills"
+    __table_args__ = (
+        Index('ix_categorization_backfills_status_heartbeat', 'status', 'heartbeat_at'),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(20), nullable=False, default="queued", server_default="queued",
+                    comment="queued | running | completed | cancelled | failed")
+    # Cursor keyset: maior transactions.id já processado
+    last_transaction_id = Column(Integer, nullable=False, default=0, server_default="0")
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    processed = Column(Integer, nullable=False, default=0, server_default="0")
+    categorized = Column(Integer, nullable=False, default=0, server_default="0")
+    error_detail = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    # Atualizado a cada lote; job "running" sem heartbeat recente foi abandonado
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<CategorizationBackfill(user_id={self.user_id}, status='{self.status}', processed={self.processed}/{self.total})>"
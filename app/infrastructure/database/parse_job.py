@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, JSON, Index
+from sqlalchemy.sql import func
+
+from app.infrastructure.database.database import Base
+
+
+class ParseJob(Base):
+    """Fila de smart-parse assíncrono (imagem/áudio) processada pelo pool de workers."""
+
+    __tablename__ = "parse_jobs"
+    __table_args__ = (
+        # Workers buscam o job mais antigo por status
+        Index('ix_parse_jobs_status_created_at', 'status', 'created_at'),
+    )
+
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String(10), nullable=False)  # image | audio
+    content_type = Column(String(100), nullable=False)
+    # Upload original; apagado quando o job termina
+    payload = Column(LargeBinary, nullable=True)
+    status = Column(String(20), nullable=False, default="queued", server_default="queued")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    result = Column(JSON, nullable=True)
+    error_code = Column(String(50), nullable=True)
+    error_detail = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ParseJob(id='{self.id}', kind='{self.kind}', status='{self.status}')>"
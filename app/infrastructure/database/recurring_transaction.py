@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Enum, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.domain.recurrence import Frequency
+from app.infrastructure.database.database import Base
+from app.infrastructure.database.transaction import TransactionType
+
+
+class RecurringTransaction(Base):
+    """Regra de recorrência; as ocorrências são calculadas sob demanda (app.domain.recurrence), nunca gravadas."""
+
+    __tablename__ = "recurring_transactions"
+    __table_args__ = (
+        # Previsão: regras do usuário vigentes na janela pedida
+        Index('ix_recurring_transactions_user_dates', 'user_id', 'start_date', 'end_date'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    description = Column(String(255), nullable=False)
+    amount = Column(Numeric(15, 2), nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
+    frequency = Column(Enum(Frequency, name="frequency"), nullable=False)
+    interval = Column(Integer, nullable=False, default=1, server_default="1")
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+    weekday = Column(Integer, nullable=True, comment="0 = segunda ... 6 = domingo (WEEKLY)")
+    day_of_month = Column(Integer, nullable=True, comment="1-31; meses curtos usam o último dia (MONTHLY)")
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    category = relationship("Category")
+
+    def __repr__(self):
+        return f"<RecurringTransaction(id={self.id}, {self.frequency.value}/{self.interval}, amount={self.amount})>"
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Enum, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, DDL, Integer, String, Numeric, Date, DateTime, Enum, ForeignKey, Index, Text, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
@@ -12,8 +13,48 @@ class TransactionType(str, enum.Enum):
     EXPENSE = "expense"
 
 
+# Busca: descrição sem acentos e em minúsculas, como auto_categorizer._normalize.
+# unaccent() não é IMMUTABLE; o wrapper permite usá-lo em colunas geradas/índices.
+SEARCH_SETUP_DDL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+"""
+SEARCH_TEXT_EXPRESSION = "lower(f_unaccent(description))"
+SEARCH_VECTOR_EXPRESSION = f"to_tsvector('simple'::regconfig, {SEARCH_TEXT_EXPRESSION})"
+
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Estatísticas por categoria (GET /categories/?with_stats=true) só pelo índice
+        Index(
+            'ix_transactions_user_category_date',
+            'user_id', 'category_id', 'transaction_date',
+            postgresql_include=['amount', 'type'],
+        ),
+        # GET /transactions/: filtros/ordenação por data, valor e tipo dentro do usuário
+        Index('ix_transactions_user_date_id', 'user_id', 'transaction_date', 'id'),
+        Index('ix_transactions_user_amount_id', 'user_id', 'amount', 'id'),
+        Index('ix_transactions_user_type_date', 'user_id', 'type', 'transaction_date'),
+        # Backfill de categorização: percorre só as sem categoria, em ordem de id (keyset)
+        Index(
+            'ix_transactions_uncategorized',
+            'user_id', 'id',
+            postgresql_where=text('category_id IS NULL'),
+        ),
+        # GET /transactions/search: btree_gin permite user_id na frente dos índices GIN
+        Index(
+            'ix_transactions_search_text_trgm',
+            'user_id', 'search_text',
+            postgresql_using='gin',
+            postgresql_ops={'search_text': 'gin_trgm_ops'},
+        ),
+        Index('ix_transactions_search_vector', 'user_id', 'search_vector', postgresql_using='gin'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -24,9 +65,21 @@ class Transaction(Base):
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Mantidas pelo banco (colunas geradas); deferred para não trafegar em toda leitura
+    search_text = deferred(Column(Text, Computed(SEARCH_TEXT_EXPRESSION, persisted=True)))
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
 
     user = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
 
+    @property
+    def category_name(self):
+        # Listagens carregam a categoria via JOIN (joinedload); aqui não há query extra
+        return self.category.name if self.category is not None else None
+
     def __repr__(self):
         return f"<Transaction(id={self.id}, description='{self.description}', amount={self.amount}, type={self.type})>"
+
+
+# create_all (bancos novos sem migrations) precisa das extensões/função antes da tabela
+event.listen(Transaction.__table__, "before_create", DDL(SEARCH_SETUP_DDL).execute_if(dialect="postgresql"))
@@ -0,0 +1,62 @@
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Enum, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.infrastructure.database.database import Base
+from app.infrastructure.database.transaction import TransactionType
+
+
+class ArchivedTransaction(Base):
+    """
+    Transação antiga movida de `transactions` (mesmo id). Somente leitura: sem
+    colunas de busca e com um único índice, para manter a tabela quente pequena.
+    """
+
+    __tablename__ = "archived_transactions"
+    __table_args__ = (
+        Index('ix_archived_transactions_user_date', 'user_id', 'transaction_date', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    description = Column(String(255), nullable=False)
+    amount = Column(Numeric(15, 2), nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
+    transaction_date = Column(Date, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    category = relationship("Category")
+
+    # Leituras mescladas (listagem, saldo diário, insights) tratam as duas tabelas igual
+    archived = True
+
+    @property
+    def category_name(self):
+        return self.category.name if self.category is not None else None
+
+    def __repr__(self):
+        return f"<ArchivedTransaction(id={self.id}, {self.transaction_date}, amount={self.amount})>"
+
+
+class TransactionMonthSummary(Base):
+    """Totais mensais do histórico arquivado por (categoria, tipo); recalculados a cada lote arquivado."""
+
+    __tablename__ = "transaction_month_summaries"
+    __table_args__ = (
+        Index('ix_transaction_month_summaries_user_period', 'user_id', 'year', 'month'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+    type = Column(Enum(TransactionType), nullable=False)
+    total = Column(Numeric(15, 2), nullable=False)
+    transaction_count = Column(Integer, nullable=False)
+    last_date = Column(Date, nullable=False)
+
+    def __repr__(self):
+        return f"<TransactionMonthSummary(user_id={self.user_id}, {self.month:02d}/{self.year}, total={self.total})>"
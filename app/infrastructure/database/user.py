@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -23,6 +23,9 @@ class User(Base):
     ok_threshold = Column(Integer, nullable=True, comment="Valor até este limite indica cenário ok (amarelo)")
     good_threshold = Column(Integer, nullable=True, comment="Valor acima indica cenário bom (verde)")
     
+    # Transações com data anterior podem estar em archived_transactions (leituras desse período consultam o arquivo)
+    archived_before = Column(Date, nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
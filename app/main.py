@@ -1,19 +1,74 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings, Base, engine
 from app.api import api_router
+from app.api.compression import CompressionMiddleware
+from app.api.uploads import UploadLimitMiddleware, MULTIPART_OVERHEAD_BYTES
+from app.services.ai_resilience import get_ai_breaker
+from app.services.image_preprocessing import shutdown_pool
+from app.services.parse_job_worker import get_parse_job_worker
+from app.services.categorization_backfill import get_backfill_worker
+from app.services.transaction_archive import get_archive_scheduler
+from app.services.transaction_categorizer import shutdown_executor
 
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker = get_parse_job_worker()
+    worker.start()
+    backfill_worker = get_backfill_worker()
+    backfill_worker.start()
+    archive_scheduler = get_archive_scheduler()
+    archive_scheduler.start()
+    yield
+    # Graceful drain: in-flight jobs finish (or go back to the queue) before the pools close
+    await archive_scheduler.stop()
+    await backfill_worker.stop()
+    await worker.stop()
+    # Off the event loop: draining blocks for up to auto_categorize_drain_seconds
+    await asyncio.to_thread(shutdown_executor)
+    shutdown_pool()
+
+
 app = FastAPI(
     title=settings.app_name,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson encodes response_model output faster than the stdlib json encoder
+    default_response_class=ORJSONResponse,
+)
+
+# Middlewares added before CORS run inside it, so their responses (413s,
+# compressed bodies) still carry CORS headers.
+
+# Reject oversized multimodal uploads early (413) instead of buffering them.
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        f"{settings.api_v1_prefix}/transactions/smart-parse-image": settings.upload_max_image_bytes + MULTIPART_OVERHEAD_BYTES,
+        f"{settings.api_v1_prefix}/transactions/smart-parse-audio": settings.upload_max_audio_bytes + MULTIPART_OVERHEAD_BYTES,
+    },
 )
 
+# gzip/Brotli for large bodies (pages, balance series, insights), streamed responses included.
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
 # Configure CORS with restricted origins for production
 raw_origins = [origin.strip() for origin in settings.cors_origins.split(",") if origin.strip()]
 
@@ -56,7 +111,11 @@ app.include_router(api_router, prefix=settings.api_v1_prefix)
 
 @app.get("/health")
 def health_check():
-    return {"status": "saudável", "service": "Zeni API"}
+    return {
+        "status": "saudável",
+        "service": "Zeni API",
+        "ai": {"circuit_breaker": get_ai_breaker().snapshot()},
+    }
 
 
 # Global exception handlers to normalize error format for the frontend
@@ -81,6 +140,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={
             "detail": "Validation error",
             "code": "VALIDATION_ERROR",
-            "meta": {"errors": exc.errors()}
+            # jsonable_encoder: custom validators put the raised ValueError in ctx
+            "meta": {"errors": jsonable_encoder(exc.errors())}
         },
     )
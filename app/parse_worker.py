@@ -0,0 +1,17 @@
+"""
+Standalone worker for asynchronous smart-parse jobs.
+
+    python -m app.parse_worker
+
+Run it next to the API (with PARSE_JOBS_WORKERS=0 on the web processes) so
+AI latency never occupies web workers.
+"""
+import asyncio
+import logging
+
+from app.config import settings  # noqa: F401  (config must load before the services package)
+from app.services.parse_job_worker import serve
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve())
@@ -1,9 +1,21 @@
 from .transaction_repository import TransactionRepository
 from .user_repository import UserRepository
 from .category_repository import CategoryRepository
+from .budget_repository import BudgetRepository
+from .ai_category_cache_repository import AICategoryCacheRepository
+from .parse_job_repository import ParseJobRepository
+from .categorization_backfill_repository import CategorizationBackfillRepository
+from .recurring_transaction_repository import RecurringTransactionRepository
+from .transaction_archive_repository import TransactionArchiveRepository
 
 __all__ = [
 	"TransactionRepository",
 	"UserRepository",
 	"CategoryRepository",
+	"BudgetRepository",
+	"AICategoryCacheRepository",
+	"ParseJobRepository",
+	"CategorizationBackfillRepository",
+	"RecurringTransactionRepository",
+	"TransactionArchiveRepository",
 ]
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.infrastructure.database import AICategoryCacheEntry
+
+
+class AICategoryCacheRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_fresh(self, description_key: str, categories_hash: str, fresh_after: datetime) -> Optional[AICategoryCacheEntry]:
+        return (
+            self.db.query(AICategoryCacheEntry)
+            .filter(
+                AICategoryCacheEntry.description_key == description_key,
+                AICategoryCacheEntry.categories_hash == categories_hash,
+                AICategoryCacheEntry.updated_at >= fresh_after,
+            )
+            .first()
+        )
+
+    def upsert(self, description_key: str, categories_hash: str, category: Optional[str]) -> None:
+        self.upsert_many([(description_key, categories_hash, category)])
+
+    def upsert_many(self, entries: list[tuple[str, str, Optional[str]]]) -> None:
+        """Single multi-row INSERT ... ON CONFLICT; keys must be unique within `entries`."""
+        if not entries:
+            return
+        stmt = insert(AICategoryCacheEntry).values([
+            {"description_key": key, "categories_hash": cat_hash, "category": category}
+            for key, cat_hash, category in entries
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_ai_category_cache_key',
+            set_={"category": stmt.excluded.category, "updated_at": func.now()},
+        )
+        self.db.execute(stmt)
+        self.db.commit()
@@ -1,8 +1,24 @@
+from datetime import date
+from decimal import Decimal
 from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, joinedload, aliased
+from sqlalchemy import func, update, case, select, literal, union_all
+from sqlalchemy.dialects.postgresql import insert
 
-from app.infrastructure.database import Budget
+from app.domain.budgets import ALERT_STATUSES, budget_status, month_bounds
+from app.infrastructure.database import Budget, Transaction, TransactionMonthSummary, TransactionType
+
+# (category_id, year, month) -> variação do gasto
+SpendDeltas = dict[tuple[int, int, int], Decimal]
+
+
+def _alert_level(spent, amount, notify_threshold):
+    """SQL counterpart of `budget_status`, evaluated inside the writing statement."""
+    return case(
+        (spent >= amount, "exceeded"),
+        (spent >= amount * notify_threshold, "warning"),
+        else_="ok",
+    )
 
 
 class BudgetRepository:
@@ -10,46 +26,202 @@ class BudgetRepository:
         self.db = db
 
     def upsert(self, user_id: int, category_id: int, year: int, month: int, amount, notify_threshold: float) -> Budget:
-        budget = (
+        return self.upsert_many(
+            user_id, year, month, [{"category_id": category_id, "amount": amount, "notify_threshold": notify_threshold}]
+        )[0]
+
+    def upsert_many(self, user_id: int, year: int, month: int, items: List[dict]) -> List[Budget]:
+        """
+        Create or update the month's budgets in a single
+        INSERT ... ON CONFLICT (user_id, category_id, year, month) DO UPDATE ... RETURNING.
+
+        New rows start with the expenses already recorded for the month (one grouped
+        query for all categories); existing rows keep their `spent` counter and only
+        get amount/threshold/alert level updated. `items` must have distinct category_ids.
+        """
+        if not items:
+            return []
+        start_date, end_date = month_bounds(year, month)
+        spent = self.spent_by_category(user_id, start_date, end_date, [i["category_id"] for i in items])
+        rows = []
+        for item in items:
+            category_spent = spent.get(item["category_id"], Decimal("0"))
+            rows.append({
+                "user_id": user_id,
+                "category_id": item["category_id"],
+                "year": year,
+                "month": month,
+                "amount": item["amount"],
+                "notify_threshold": item["notify_threshold"],
+                "spent": category_spent,
+                "alert_level": budget_status(category_spent, item["amount"], item["notify_threshold"]),
+            })
+
+        stmt = insert(Budget).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Budget.user_id, Budget.category_id, Budget.year, Budget.month],
+            set_={
+                "amount": stmt.excluded.amount,
+                "notify_threshold": stmt.excluded.notify_threshold,
+                "alert_level": _alert_level(Budget.spent, stmt.excluded.amount, stmt.excluded.notify_threshold),
+                "updated_at": func.now(),
+            },
+        ).returning(Budget.id)
+        ids = [row.id for row in self.db.execute(stmt)]
+        self.db.commit()
+        return self.get_many(ids)
+
+    def copy_from_month(
+        self, user_id: int, year: int, month: int, source_year: int, source_month: int, overwrite: bool = False
+    ) -> int:
+        """
+        Copy the source month's budgets into (year, month) with one INSERT ... SELECT.
+
+        Counters start from the target month's expenses. Budgets that already exist in
+        the target month are kept unless `overwrite` (then amount/threshold are replaced).
+
+        Returns:
+            Number of budgets created or updated
+        """
+        start_date, end_date = month_bounds(year, month)
+        spent = self._spent_query(user_id, start_date, end_date).subquery()
+        source = aliased(Budget)
+        spent_value = func.coalesce(spent.c.spent, 0)
+        select_stmt = (
+            select(
+                source.user_id,
+                source.category_id,
+                literal(year),
+                literal(month),
+                source.amount,
+                source.notify_threshold,
+                spent_value,
+                _alert_level(spent_value, source.amount, source.notify_threshold),
+            )
+            .outerjoin(spent, spent.c.category_id == source.category_id)
+            .where(source.user_id == user_id, source.year == source_year, source.month == source_month)
+        )
+        stmt = insert(Budget).from_select(
+            ["user_id", "category_id", "year", "month", "amount", "notify_threshold", "spent", "alert_level"],
+            select_stmt,
+        )
+        conflict_target = [Budget.user_id, Budget.category_id, Budget.year, Budget.month]
+        if overwrite:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_target,
+                set_={
+                    "amount": stmt.excluded.amount,
+                    "notify_threshold": stmt.excluded.notify_threshold,
+                    "alert_level": _alert_level(Budget.spent, stmt.excluded.amount, stmt.excluded.notify_threshold),
+                    "updated_at": func.now(),
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_target)
+        count = len(self.db.execute(stmt.returning(Budget.id)).all())
+        self.db.commit()
+        return count
+
+    def get_many(self, budget_ids: List[int]) -> List[Budget]:
+        if not budget_ids:
+            return []
+        budgets = (
+            self.db.query(Budget)
+            .options(joinedload(Budget.category))
+            .filter(Budget.id.in_(budget_ids))
+            .populate_existing()
+            .all()
+        )
+        order = {budget_id: i for i, budget_id in enumerate(budget_ids)}
+        return sorted(budgets, key=lambda b: order[b.id])
+
+    def list_by_user_and_month(self, user_id: int, year: int, month: int, alerts_only: bool = False) -> List[Budget]:
+        q = (
             self.db.query(Budget)
             .options(joinedload(Budget.category))
-            .filter(
-                and_(
+            .filter(Budget.user_id == user_id, Budget.year == year, Budget.month == month)
+        )
+        if alerts_only:
+            # Served by ix_budgets_user_month_alert; no transaction aggregation
+            q = q.filter(Budget.alert_level.in_(ALERT_STATUSES))
+        return q.all()
+
+    def apply_spent_deltas(self, user_id: int, deltas: SpendDeltas) -> list:
+        """
+        Atomically add expense deltas to the matching budgets' `spent` counters.
+
+        Runs inside the caller's transaction (no commit) so counters and the
+        transaction write commit together. `alert_level` is recomputed in the
+        same UPDATE from the new value.
+
+        Returns:
+            Rows (id, category_id, year, month, spent, amount, notify_threshold, alert_level)
+            with the values after the update, one per budget touched
+        """
+        rows = []
+        for (category_id, year, month), delta in deltas.items():
+            new_spent = Budget.spent + delta
+            stmt = (
+                update(Budget)
+                .where(
                     Budget.user_id == user_id,
                     Budget.category_id == category_id,
                     Budget.year == year,
                     Budget.month == month,
                 )
+                .values(
+                    spent=new_spent,
+                    alert_level=_alert_level(new_spent, Budget.amount, Budget.notify_threshold),
+                )
+                .returning(
+                    Budget.id,
+                    Budget.category_id,
+                    Budget.year,
+                    Budget.month,
+                    Budget.spent,
+                    Budget.amount,
+                    Budget.notify_threshold,
+                    Budget.alert_level,
+                )
+                .execution_options(synchronize_session=False)
             )
-            .first()
-        )
-        if budget:
-            budget.amount = amount
-            budget.notify_threshold = notify_threshold
-        else:
-            budget = Budget(
-                user_id=user_id,
-                category_id=category_id,
-                year=year,
-                month=month,
-                amount=amount,
-                notify_threshold=notify_threshold,
-            )
-            self.db.add(budget)
-        self.db.commit()
-        self.db.refresh(budget)
-        # Explicitly load the relationship after refresh
-        self.db.refresh(budget, ['category'])
-        return budget
+            rows.extend(self.db.execute(stmt).all())
+        return rows
 
-    def list_by_user_and_month(self, user_id: int, year: int, month: int) -> List[Budget]:
+    def _spent_query(self, user_id: int, start_date: date, end_date: date, category_ids: Optional[List[int]] = None):
+        """
+        Expense totals per category in the period: hot transactions plus the
+        monthly summaries of archived history (UNION ALL, summed in the database).
+        """
+        hot = select(Transaction.category_id.label("category_id"), Transaction.amount.label("amount")).where(
+            Transaction.user_id == user_id,
+            Transaction.type == TransactionType.EXPENSE,
+            Transaction.category_id.isnot(None),
+            Transaction.transaction_date >= start_date,
+            Transaction.transaction_date <= end_date,
+        )
+        summary_key = TransactionMonthSummary.year * 12 + TransactionMonthSummary.month
+        archived = select(TransactionMonthSummary.category_id, TransactionMonthSummary.total).where(
+            TransactionMonthSummary.user_id == user_id,
+            TransactionMonthSummary.type == TransactionType.EXPENSE,
+            TransactionMonthSummary.category_id.isnot(None),
+            summary_key.between(start_date.year * 12 + start_date.month, end_date.year * 12 + end_date.month),
+        )
+        if category_ids is not None:
+            hot = hot.where(Transaction.category_id.in_(category_ids))
+            archived = archived.where(TransactionMonthSummary.category_id.in_(category_ids))
+        rows = union_all(hot, archived).subquery()
         return (
-            self.db.query(Budget)
-            .options(joinedload(Budget.category))
-            .filter(Budget.user_id == user_id, Budget.year == year, Budget.month == month)
-            .all()
+            self.db.query(rows.c.category_id.label("category_id"), func.sum(rows.c.amount).label("spent"))
+            .group_by(rows.c.category_id)
         )
 
+    def spent_by_category(
+        self, user_id: int, start_date: date, end_date: date, category_ids: Optional[List[int]] = None
+    ) -> dict[int, Decimal]:
+        q = self._spent_query(user_id, start_date, end_date, category_ids)
+        return {category_id: Decimal(total) for category_id, total in q.all()}
+
     def delete(self, budget: Budget) -> None:
         self.db.delete(budget)
         self.db.commit()
@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.infrastructure.database import CategorizationBackfill
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class CategorizationBackfillRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: int) -> Optional[CategorizationBackfill]:
+        return self.db.query(CategorizationBackfill).filter(CategorizationBackfill.user_id == user_id).first()
+
+    def enqueue(self, user_id: int, total: int, restart: bool = False) -> CategorizationBackfill:
+        """
+        Queue the user's backfill. An active one is left untouched; a finished one
+        resumes from its cursor (only newer uncategorized rows) unless `restart`.
+        """
+        backfill = self.get(user_id)
+        if backfill is None:
+            backfill = CategorizationBackfill(user_id=user_id, last_transaction_id=0)
+            self.db.add(backfill)
+        elif backfill.status in ACTIVE_STATUSES and not restart:
+            return backfill
+        if restart:
+            backfill.last_transaction_id = 0
+        backfill.status = "queued"
+        backfill.total = total
+        backfill.processed = 0
+        backfill.categorized = 0
+        backfill.error_detail = None
+        backfill.started_at = None
+        backfill.heartbeat_at = None
+        backfill.finished_at = None
+        self.db.commit()
+        self.db.refresh(backfill)
+        return backfill
+
+    def claim_next(self, stale_before: datetime) -> Optional[CategorizationBackfill]:
+        """
+        Take the oldest runnable backfill and mark it running.
+
+        Runnable = queued, or running without a heartbeat since `stale_before` (its
+        worker died). FOR UPDATE SKIP LOCKED lets several processes claim concurrently.
+        """
+        backfill = (
+            self.db.query(CategorizationBackfill)
+            .filter(
+                or_(
+                    CategorizationBackfill.status == "queued",
+                    and_(
+                        CategorizationBackfill.status == "running",
+                        CategorizationBackfill.heartbeat_at < stale_before,
+                    ),
+                )
+            )
+            .order_by(CategorizationBackfill.created_at)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if backfill is None:
+            self.db.rollback()
+            return None
+        backfill.status = "running"
+        backfill.started_at = func.coalesce(CategorizationBackfill.started_at, func.now())
+        backfill.heartbeat_at = func.now()
+        self.db.commit()
+        self.db.refresh(backfill)
+        return backfill
+
+    def checkpoint(self, user_id: int, last_transaction_id: int, processed: int, categorized: int) -> None:
+        """Advance the cursor and counters inside the caller's transaction (commits with the batch)."""
+        self.db.query(CategorizationBackfill).filter(CategorizationBackfill.user_id == user_id).update(
+            {
+                CategorizationBackfill.last_transaction_id: last_transaction_id,
+                CategorizationBackfill.processed: CategorizationBackfill.processed + processed,
+                CategorizationBackfill.categorized: CategorizationBackfill.categorized + categorized,
+                CategorizationBackfill.heartbeat_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+
+    def heartbeat(self, user_id: int) -> None:
+        """Mark a running backfill as alive (own transaction), so no other process reclaims it."""
+        self.db.query(CategorizationBackfill).filter(
+            CategorizationBackfill.user_id == user_id, CategorizationBackfill.status == "running"
+        ).update({CategorizationBackfill.heartbeat_at: func.now()}, synchronize_session=False)
+        self.db.commit()
+
+    def finish(self, user_id: int, status: str, error_detail: Optional[str] = None) -> None:
+        self.db.query(CategorizationBackfill).filter(CategorizationBackfill.user_id == user_id).update(
+            {
+                CategorizationBackfill.status: status,
+                CategorizationBackfill.error_detail: error_detail,
+                CategorizationBackfill.finished_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def requeue(self, user_id: int) -> int:
+        """Give an interrupted backfill back to the queue; it resumes from its checkpoint."""
+        count = self.db.query(CategorizationBackfill).filter(
+            CategorizationBackfill.user_id == user_id, CategorizationBackfill.status == "running"
+        ).update({CategorizationBackfill.status: "queued"}, synchronize_session=False)
+        self.db.commit()
+        return count
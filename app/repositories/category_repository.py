@@ -1,7 +1,10 @@
+from datetime import date
 from typing import List, Optional
+from sqlalchemy import case, delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from app.infrastructure.database import Category, Transaction
+from app.infrastructure.database import ArchivedTransaction, Budget, Category, Transaction, TransactionMonthSummary, TransactionType
 
 
 class CategoryRepository:
@@ -23,22 +26,115 @@ class CategoryRepository:
             q = q.filter(Category.is_auto_generated == False)  # noqa: E712
         return q.order_by(Category.name.asc()).all()
 
+    def list_with_stats(self, user_id: int, month_start: date, today: date) -> list:
+        """
+        All categories of the user with usage statistics, from one aggregated query.
+
+        Returns:
+            Rows (Category, transaction_count, month_spent, last_used), ordered by name
+        """
+        in_month_expense = (
+            (Transaction.type == TransactionType.EXPENSE)
+            & (Transaction.transaction_date >= month_start)
+            & (Transaction.transaction_date <= today)
+        )
+        usage = (
+            select(
+                Transaction.category_id.label("category_id"),
+                func.count().label("transaction_count"),
+                func.sum(case((in_month_expense, Transaction.amount), else_=0)).label("month_spent"),
+                func.max(Transaction.transaction_date).label("last_used"),
+            )
+            .where(Transaction.user_id == user_id, Transaction.category_id.isnot(None))
+            .group_by(Transaction.category_id)
+            .subquery()
+        )
+        # Histórico arquivado entra pelos resumos mensais (o mês corrente nunca é arquivado)
+        archived = (
+            select(
+                TransactionMonthSummary.category_id.label("category_id"),
+                func.sum(TransactionMonthSummary.transaction_count).label("transaction_count"),
+                func.max(TransactionMonthSummary.last_date).label("last_used"),
+            )
+            .where(TransactionMonthSummary.user_id == user_id, TransactionMonthSummary.category_id.isnot(None))
+            .group_by(TransactionMonthSummary.category_id)
+            .subquery()
+        )
+        last_used = case(
+            (archived.c.last_used > usage.c.last_used, archived.c.last_used),
+            else_=func.coalesce(usage.c.last_used, archived.c.last_used),
+        )
+        return (
+            self.db.query(
+                Category,
+                func.coalesce(usage.c.transaction_count, 0) + func.coalesce(archived.c.transaction_count, 0),
+                func.coalesce(usage.c.month_spent, 0),
+                last_used,
+            )
+            .outerjoin(usage, usage.c.category_id == Category.id)
+            .outerjoin(archived, archived.c.category_id == Category.id)
+            .filter(Category.user_id == user_id)
+            .order_by(Category.name.asc())
+            .all()
+        )
+
     def get_by_id(self, category_id: int) -> Optional[Category]:
         return self.db.query(Category).filter(Category.id == category_id).first()
 
     def get_by_name(self, user_id: int, name: str) -> Optional[Category]:
         return self.db.query(Category).filter(Category.user_id == user_id, Category.name == name).first()
 
+    def get_or_create_many(self, user_id: int, names: List[str]) -> dict[str, int]:
+        """
+        Ids of the user's categories named `names`, creating the missing ones as
+        auto-generated with INSERT ... ON CONFLICT (user_id, name) DO NOTHING, so
+        concurrent writers never trip uq_category_user_name. No commit.
+        """
+        names = sorted(set(names))
+        if not names:
+            return {}
+        stmt = insert(Category).values(
+            [{"user_id": user_id, "name": name, "is_auto_generated": True} for name in names]
+        ).on_conflict_do_nothing(index_elements=[Category.user_id, Category.name])
+        self.db.execute(stmt)
+        rows = self.db.query(Category.id, Category.name).filter(Category.user_id == user_id, Category.name.in_(names)).all()
+        return {row.name: row.id for row in rows}
+
+    def owned_ids(self, user_id: int, category_ids: List[int]) -> set[int]:
+        """Subset of `category_ids` that belongs to the user (one query)."""
+        if not category_ids:
+            return set()
+        rows = self.db.query(Category.id).filter(Category.user_id == user_id, Category.id.in_(category_ids)).all()
+        return {row.id for row in rows}
+
     def rename(self, category: Category, new_name: str) -> Category:
         category.name = new_name
         self.db.commit()
         self.db.refresh(category)
         return category
 
-    def delete(self, category: Category) -> None:
-        # Ensure no transactions linked
-        used = self.db.query(Transaction).filter(Transaction.category_id == category.id).first()
-        if used:
-            raise ValueError("Categoria em uso por transações; remova ou recategorize-as antes de excluir.")
-        self.db.delete(category)
+    def delete_if_unused(self, user_id: int, category_id: int) -> bool:
+        """
+        Delete the user's category unless a transaction (hot or archived) uses it,
+        in one statement (DELETE ... WHERE NOT EXISTS). Returns False when nothing was deleted.
+        """
+        in_use = exists().where(Transaction.category_id == category_id)
+        in_archive = exists().where(ArchivedTransaction.category_id == category_id)
+        stmt = (
+            delete(Category)
+            .where(Category.id == category_id, Category.user_id == user_id, ~in_use, ~in_archive)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = self.db.execute(stmt).rowcount > 0
         self.db.commit()
+        return deleted
+
+    def delete_merged(self, category_id: int) -> None:
+        """
+        Remove a category whose transactions were already moved, with its budgets.
+
+        Runs inside the caller's transaction (no commit); plain DELETEs so the ORM
+        does not load the category's transactions.
+        """
+        self.db.execute(delete(Budget).where(Budget.category_id == category_id))
+        self.db.execute(delete(Category).where(Category.id == category_id))
@@ -0,0 +1,122 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.infrastructure.database import ParseJob
+
+
+class ParseJobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, user_id: int, kind: str, content_type: str, payload: bytes) -> ParseJob:
+        job = ParseJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            kind=kind,
+            content_type=content_type,
+            payload=payload,
+            status="queued",
+            attempts=0,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_for_user(self, job_id: str, user_id: int) -> Optional[ParseJob]:
+        return (
+            self.db.query(ParseJob)
+            .filter(ParseJob.id == job_id, ParseJob.user_id == user_id)
+            .first()
+        )
+
+    def claim_next(self, max_attempts: int, stale_before: datetime) -> Optional[ParseJob]:
+        """
+        Atomically take the oldest runnable job and mark it running.
+
+        Runnable = queued, or running but started before `stale_before` (its worker died).
+        FOR UPDATE SKIP LOCKED lets several workers/processes claim concurrently.
+        """
+        job = (
+            self.db.query(ParseJob)
+            .filter(
+                or_(
+                    ParseJob.status == "queued",
+                    and_(ParseJob.status == "running", ParseJob.started_at < stale_before),
+                ),
+                ParseJob.attempts < max_attempts,
+            )
+            .order_by(ParseJob.created_at)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            self.db.rollback()
+            return None
+        job.status = "running"
+        job.started_at = func.now()
+        job.attempts = ParseJob.attempts + 1
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error_code: Optional[str] = None,
+        error_detail: Optional[str] = None,
+    ) -> None:
+        self.db.query(ParseJob).filter(ParseJob.id == job_id).update(
+            {
+                ParseJob.status: status,
+                ParseJob.result: result,
+                ParseJob.error_code: error_code,
+                ParseJob.error_detail: error_detail,
+                ParseJob.payload: None,
+                ParseJob.finished_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def requeue(self, job_ids: list[str]) -> int:
+        """Give interrupted jobs back to the queue without counting the attempt."""
+        if not job_ids:
+            return 0
+        count = self.db.query(ParseJob).filter(
+            ParseJob.id.in_(job_ids), ParseJob.status == "running"
+        ).update(
+            {
+                ParseJob.status: "queued",
+                ParseJob.started_at: None,
+                ParseJob.attempts: ParseJob.attempts - 1,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+        return count
+
+    def fail_exhausted(self, max_attempts: int, stale_before: datetime) -> int:
+        """Mark as failed the stale running jobs that already used all their attempts."""
+        count = self.db.query(ParseJob).filter(
+            ParseJob.status == "running",
+            ParseJob.started_at < stale_before,
+            ParseJob.attempts >= max_attempts,
+        ).update(
+            {
+                ParseJob.status: "failed",
+                ParseJob.error_code: "JOB_ABANDONED",
+                ParseJob.error_detail: "Processamento interrompido repetidamente.",
+                ParseJob.payload: None,
+                ParseJob.finished_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+        return count
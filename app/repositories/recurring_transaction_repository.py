@@ -0,0 +1,55 @@
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.infrastructure.database import RecurringTransaction
+
+
+class RecurringTransactionRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, rule: RecurringTransaction) -> RecurringTransaction:
+        self.db.add(rule)
+        self.db.commit()
+        self.db.refresh(rule)
+        return rule
+
+    def get_for_user(self, user_id: int, rule_id: int) -> Optional[RecurringTransaction]:
+        return (
+            self.db.query(RecurringTransaction)
+            .filter(RecurringTransaction.id == rule_id, RecurringTransaction.user_id == user_id)
+            .first()
+        )
+
+    def list_by_user(self, user_id: int) -> List[RecurringTransaction]:
+        return (
+            self.db.query(RecurringTransaction)
+            .filter(RecurringTransaction.user_id == user_id)
+            .order_by(RecurringTransaction.start_date.asc(), RecurringTransaction.id.asc())
+            .all()
+        )
+
+    def active_between(self, user_id: int, start_date: date, end_date: date) -> List[RecurringTransaction]:
+        """Rules of the user that can have occurrences in [start_date, end_date]."""
+        return (
+            self.db.query(RecurringTransaction)
+            .filter(
+                RecurringTransaction.user_id == user_id,
+                RecurringTransaction.start_date <= end_date,
+                or_(RecurringTransaction.end_date.is_(None), RecurringTransaction.end_date >= start_date),
+            )
+            .all()
+        )
+
+    def update(self, rule: RecurringTransaction, updates: dict) -> RecurringTransaction:
+        for key, value in updates.items():
+            setattr(rule, key, value)
+        self.db.commit()
+        self.db.refresh(rule)
+        return rule
+
+    def delete(self, rule: RecurringTransaction) -> None:
+        self.db.delete(rule)
+        self.db.commit()
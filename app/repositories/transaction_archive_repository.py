@@ -0,0 +1,117 @@
+from datetime import date
+from typing import List
+from sqlalchemy import Integer, cast, delete, extract, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.domain.budgets import month_bounds
+from app.infrastructure.database import ArchivedTransaction, Transaction, TransactionMonthSummary, User
+
+_ARCHIVED_COLUMNS = ["id", "user_id", "description", "amount", "type", "transaction_date", "category_id", "created_at"]
+
+
+class TransactionArchiveRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def users_with_rows_before(self, cutoff: date) -> List[int]:
+        """Users that still have hot transactions dated before `cutoff`."""
+        rows = self.db.query(Transaction.user_id).filter(Transaction.transaction_date < cutoff).distinct().all()
+        return [row.user_id for row in rows]
+
+    def move_batch(self, user_id: int, cutoff: date, limit: int) -> List[date]:
+        """
+        Move up to `limit` of the user's oldest transactions dated before `cutoff`
+        to the archive with one statement:
+
+            WITH moved AS (DELETE FROM transactions WHERE id IN (...) RETURNING ...)
+            INSERT INTO archived_transactions SELECT * FROM moved
+
+        Rows locked by a concurrent writer are skipped (picked up on the next run).
+        Runs inside the caller's transaction.
+
+        Returns:
+            Dates of the moved rows
+        """
+        batch = (
+            select(Transaction.id)
+            .where(Transaction.user_id == user_id, Transaction.transaction_date < cutoff)
+            .order_by(Transaction.transaction_date.asc(), Transaction.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        moved = (
+            delete(Transaction)
+            .where(Transaction.id.in_(batch.scalar_subquery()))
+            .returning(*(getattr(Transaction, column) for column in _ARCHIVED_COLUMNS))
+            .cte("moved")
+        )
+        stmt = (
+            insert(ArchivedTransaction)
+            .from_select(_ARCHIVED_COLUMNS, select(*(moved.c[column] for column in _ARCHIVED_COLUMNS)))
+            .add_cte(moved)
+            .returning(ArchivedTransaction.transaction_date)
+        )
+        return [row.transaction_date for row in self.db.execute(stmt)]
+
+    def rebuild_summaries(self, user_id: int, first_day: date, last_day: date) -> None:
+        """
+        Recompute the monthly summaries of every month between `first_day` and
+        `last_day` from the archived rows (DELETE + INSERT ... SELECT ... GROUP BY).
+        Runs inside the caller's transaction.
+        """
+        start_date = first_day.replace(day=1)
+        end_date = month_bounds(last_day.year, last_day.month)[1]
+        start_key = start_date.year * 12 + start_date.month
+        end_key = end_date.year * 12 + end_date.month
+        summary_key = TransactionMonthSummary.year * 12 + TransactionMonthSummary.month
+        self.db.execute(
+            delete(TransactionMonthSummary)
+            .where(TransactionMonthSummary.user_id == user_id, summary_key.between(start_key, end_key))
+            .execution_options(synchronize_session=False)
+        )
+
+        year = cast(extract("year", ArchivedTransaction.transaction_date), Integer)
+        month = cast(extract("month", ArchivedTransaction.transaction_date), Integer)
+        grouped = (
+            select(
+                ArchivedTransaction.user_id,
+                year,
+                month,
+                ArchivedTransaction.category_id,
+                ArchivedTransaction.type,
+                func.sum(ArchivedTransaction.amount),
+                func.count(),
+                func.max(ArchivedTransaction.transaction_date),
+            )
+            .where(
+                ArchivedTransaction.user_id == user_id,
+                ArchivedTransaction.transaction_date >= start_date,
+                ArchivedTransaction.transaction_date <= end_date,
+            )
+            .group_by(ArchivedTransaction.user_id, year, month, ArchivedTransaction.category_id, ArchivedTransaction.type)
+        )
+        self.db.execute(
+            insert(TransactionMonthSummary).from_select(
+                ["user_id", "year", "month", "category_id", "type", "total", "transaction_count", "last_date"],
+                grouped,
+            )
+        )
+
+    def mark_archived(self, user_id: int, cutoff: date) -> None:
+        """Advance `users.archived_before` to `cutoff` (never backwards). Caller's transaction."""
+        self.db.execute(
+            update(User)
+            .where(User.id == user_id, (User.archived_before.is_(None)) | (User.archived_before < cutoff))
+            .values(archived_before=cutoff)
+            .execution_options(synchronize_session=False)
+        )
+
+    def reassign_category(self, user_id: int, category_id: int, target_id: int) -> None:
+        """Point archived rows and summaries of `category_id` to `target_id` (category merge). Caller's transaction."""
+        for model in (ArchivedTransaction, TransactionMonthSummary):
+            self.db.execute(
+                update(model)
+                .where(model.user_id == user_id, model.category_id == category_id)
+                .values(category_id=target_id)
+                .execution_options(synchronize_session=False)
+            )
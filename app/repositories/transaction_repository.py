@@ -1,23 +1,291 @@
+import heapq
 from typing import List, Optional
 from datetime import date
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from decimal import Decimal
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, case, cast, delete, extract, func, literal, literal_column, update, Numeric
 
-from app.infrastructure.database import Transaction, TransactionType
+from app.infrastructure.database import ArchivedTransaction, Transaction, TransactionType, Category
+
+# Ordenações permitidas (whitelist): (coluna, descendente); id desempata para paginação estável
+SORTS = {
+    "date_desc": ("transaction_date", True),
+    "date_asc": ("transaction_date", False),
+    "amount_desc": ("amount", True),
+    "amount_asc": ("amount", False),
+}
+
+
+def _order_by(model, sort: str) -> tuple:
+    column, descending = SORTS[sort]
+    if descending:
+        return getattr(model, column).desc(), model.id.desc()
+    return getattr(model, column).asc(), model.id.asc()
 
 
 class TransactionRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, transaction: Transaction) -> Transaction:
+    def create(self, transaction: Transaction, commit: bool = True) -> Transaction:
         self.db.add(transaction)
+        if not commit:
+            self.db.flush()
+            return transaction
         self.db.commit()
         self.db.refresh(transaction)
         return transaction
 
-    def get_by_id(self, transaction_id: int) -> Optional[Transaction]:
-        return self.db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    def commit(self, transaction: Optional[Transaction] = None) -> None:
+        """Commit pending work started with `commit=False` (e.g. together with budget counters)."""
+        self.db.commit()
+        if transaction is not None:
+            self.db.refresh(transaction)
+
+    def category_belongs_to_user(self, category_id: int, user_id: int) -> bool:
+        return self.db.query(Category.id).filter(Category.id == category_id, Category.user_id == user_id).first() is not None
+
+    def match_conditions(
+        self,
+        user_id: int,
+        category_id: Optional[int] = None,
+        uncategorized: bool = False,
+        description_contains: Optional[str] = None,
+        transaction_type: Optional[TransactionType] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        model=Transaction,
+    ) -> list:
+        """
+        WHERE clauses selecting a user's transactions (filtered listings and set-based updates).
+
+        `model` may be `ArchivedTransaction` (same columns) to filter the archive.
+        """
+        conditions = [model.user_id == user_id]
+        if category_id is not None:
+            conditions.append(model.category_id == category_id)
+        if uncategorized:
+            conditions.append(model.category_id.is_(None))
+        if description_contains:
+            escaped = description_contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append(model.description.ilike(f"%{escaped}%", escape="\\"))
+        if transaction_type is not None:
+            conditions.append(model.type == transaction_type)
+        if start_date is not None:
+            conditions.append(model.transaction_date >= start_date)
+        if end_date is not None:
+            conditions.append(model.transaction_date <= end_date)
+        if min_amount is not None:
+            conditions.append(model.amount >= min_amount)
+        if max_amount is not None:
+            conditions.append(model.amount <= max_amount)
+        return conditions
+
+    def expense_totals(self, conditions: list) -> list:
+        """
+        Categorized expense totals per (category_id, year, month) among the matching rows.
+
+        Returns:
+            Rows (category_id, year, month, total)
+        """
+        year = extract("year", Transaction.transaction_date)
+        month = extract("month", Transaction.transaction_date)
+        return (
+            self.db.query(Transaction.category_id, year.label("year"), month.label("month"), func.sum(Transaction.amount))
+            .filter(
+                *conditions,
+                Transaction.type == TransactionType.EXPENSE,
+                Transaction.category_id.isnot(None),
+            )
+            .group_by(Transaction.category_id, year, month)
+            .all()
+        )
+
+    def lock_matching(self, conditions: list) -> list:
+        """
+        SELECT ... FOR UPDATE of the matching rows (in id order, so concurrent batches
+        lock in the same order). They stay locked until the caller's transaction ends.
+
+        Returns:
+            Rows (id, category_id, type, amount, transaction_date)
+        """
+        return (
+            self.db.query(
+                Transaction.id,
+                Transaction.category_id,
+                Transaction.type,
+                Transaction.amount,
+                Transaction.transaction_date,
+            )
+            .filter(*conditions)
+            .order_by(Transaction.id.asc())
+            .with_for_update()
+            .all()
+        )
+
+    def set_category(self, conditions: list, category_id: Optional[int]) -> int:
+        """Single UPDATE of every matching row, inside the caller's transaction. Returns the row count."""
+        return self.update_matching(conditions, {"category_id": category_id})
+
+    def update_matching(self, conditions: list, values: dict) -> int:
+        """Set the same `values` on every matching row with one UPDATE (caller's transaction). Returns the row count."""
+        stmt = (
+            update(Transaction)
+            .where(*conditions)
+            .values(**values, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return self.db.execute(stmt).rowcount
+
+    def delete_matching(self, conditions: list) -> list:
+        """
+        Delete every matching row with one DELETE ... RETURNING (caller's transaction).
+
+        Returns:
+            Deleted rows (id, category_id, type, amount, transaction_date)
+        """
+        stmt = (
+            delete(Transaction)
+            .where(*conditions)
+            .returning(
+                Transaction.id,
+                Transaction.category_id,
+                Transaction.type,
+                Transaction.amount,
+                Transaction.transaction_date,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return self.db.execute(stmt).all()
+
+    def uncategorized_after(self, user_id: int, after_id: int, limit: int) -> list:
+        """Keyset page of uncategorized transactions: rows (id, description) with id > `after_id`."""
+        return (
+            self.db.query(Transaction.id, Transaction.description)
+            .filter(Transaction.user_id == user_id, Transaction.category_id.is_(None), Transaction.id > after_id)
+            .order_by(Transaction.id.asc())
+            .limit(limit)
+            .all()
+        )
+
+    def uncategorized_by_ids(self, user_id: int, transaction_ids: List[int]) -> list:
+        """Rows (id, description) among `transaction_ids` that still have no category."""
+        return (
+            self.db.query(Transaction.id, Transaction.description)
+            .filter(
+                Transaction.user_id == user_id,
+                Transaction.id.in_(transaction_ids),
+                Transaction.category_id.is_(None),
+            )
+            .order_by(Transaction.id.asc())
+            .all()
+        )
+
+    def count_uncategorized(self, user_id: int, after_id: int = 0) -> int:
+        return (
+            self.db.query(func.count(Transaction.id))
+            .filter(Transaction.user_id == user_id, Transaction.category_id.is_(None), Transaction.id > after_id)
+            .scalar()
+        )
+
+    def assign_categories(self, user_id: int, category_by_transaction: dict[int, int]) -> list:
+        """
+        Set a different category per transaction with one UPDATE ... SET category_id = CASE id ...
+        Only still-uncategorized rows are touched (a manual choice made meanwhile wins).
+        Runs inside the caller's transaction.
+
+        Returns:
+            Updated rows (id, category_id, type, amount, transaction_date)
+        """
+        if not category_by_transaction:
+            return []
+        stmt = (
+            update(Transaction)
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.id.in_(list(category_by_transaction)),
+                Transaction.category_id.is_(None),
+            )
+            .values(category_id=case(category_by_transaction, value=Transaction.id), updated_at=func.now())
+            .returning(
+                Transaction.id,
+                Transaction.category_id,
+                Transaction.type,
+                Transaction.amount,
+                Transaction.transaction_date,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return self.db.execute(stmt).all()
+
+    def search(
+        self,
+        user_id: int,
+        normalized_query: str,
+        limit: int,
+        after: Optional[tuple[Decimal, int]] = None,
+        archived_before: Optional[date] = None,
+    ) -> list:
+        """
+        Ranked description search: full-text match on `search_vector` or trigram
+        word similarity on `search_text` (both served by per-user GIN indexes).
+
+        `normalized_query` must be normalized like the stored text (lowercase,
+        no accents). Keyset-paginated by (rank DESC, id DESC); `after` is the
+        (rank, id) of the last row of the previous page.
+
+        When the user has an archive (`archived_before`), archived rows are searched
+        too and merged by (rank, id). The archive has no search columns: its text is
+        normalized on the fly over the user's archived rows (not GIN-indexed).
+
+        Returns:
+            Rows (Transaction | ArchivedTransaction, rank)
+        """
+        hot = self._search_query(
+            Transaction, Transaction.search_text, Transaction.search_vector, user_id, normalized_query, limit, after
+        )
+        if archived_before is None:
+            return hot
+        search_text = func.lower(func.f_unaccent(ArchivedTransaction.description))
+        search_vector = func.to_tsvector(literal_column("'simple'::regconfig"), search_text)
+        archived = self._search_query(
+            ArchivedTransaction, search_text, search_vector, user_id, normalized_query, limit, after
+        )
+        merged = heapq.merge(hot, archived, key=lambda row: (row.rank, row[0].id), reverse=True)
+        return list(merged)[:limit]
+
+    def _search_query(self, model, search_text, search_vector, user_id: int, normalized_query: str, limit: int, after) -> list:
+        tsquery = func.plainto_tsquery(literal_column("'simple'::regconfig"), normalized_query)
+        full_text = search_vector.op("@@")(tsquery)
+        fuzzy = literal(normalized_query).op("<%")(search_text)
+        rank = func.round(
+            cast(
+                func.greatest(
+                    func.ts_rank(search_vector, tsquery),
+                    func.word_similarity(normalized_query, search_text),
+                ),
+                Numeric,
+            ),
+            6,
+        )
+        q = (
+            self.db.query(model, rank.label("rank"))
+            .options(joinedload(model.category))
+            .filter(model.user_id == user_id, or_(full_text, fuzzy))
+        )
+        if after is not None:
+            after_rank, after_id = after
+            q = q.filter(or_(rank < after_rank, and_(rank == after_rank, model.id < after_id)))
+        return q.order_by(rank.desc(), model.id.desc()).limit(limit).all()
+
+    def get_by_id(self, transaction_id: int, for_update: bool = False) -> Optional[Transaction]:
+        """`for_update`: SELECT ... FOR UPDATE, re-read from the DB; the row stays locked until commit/rollback."""
+        q = self.db.query(Transaction).filter(Transaction.id == transaction_id)
+        if for_update:
+            q = q.with_for_update().populate_existing()
+        return q.first()
 
     def get_by_user(
         self,
@@ -25,21 +293,49 @@ class TransactionRepository:
         skip: int = 0,
         limit: int = 100,
         on_date: Optional[date] = None,
+        sort: str = "date_desc",
+        archived_before: Optional[date] = None,
+        **filters,
     ) -> List[Transaction]:
-        q = self.db.query(Transaction).filter(Transaction.user_id == user_id)
-        if on_date is not None:
-            q = q.filter(Transaction.transaction_date == on_date)
-        return (
-            q.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        """
+        Filtered page of the user's transactions with their category in the same query.
+
+        `filters` are the `match_conditions` keywords (period, type, category,
+        amount range); `sort` must be a key of `SORTS`. When the user has an archive
+        (`archived_before`) and the period reaches it, archived rows are merged in:
+        the first `skip + limit` rows of each table are merged in sort order.
+        """
+        if archived_before is None or not self._reaches_archive(archived_before, on_date, filters.get("start_date")):
+            return self._page_query(Transaction, user_id, on_date, sort, filters).offset(skip).limit(limit).all()
+
+        hot = self._page_query(Transaction, user_id, on_date, sort, filters).limit(skip + limit).all()
+        # Archived rows are all older than `archived_before`: a full page of newer rows needs no archive read
+        if sort == "date_desc" and len(hot) == skip + limit and hot[-1].transaction_date >= archived_before:
+            return hot[skip:]
+        archived = self._page_query(ArchivedTransaction, user_id, on_date, sort, filters).limit(skip + limit).all()
+        column, descending = SORTS[sort]
+        merged = heapq.merge(hot, archived, key=lambda t: (getattr(t, column), t.id), reverse=descending)
+        return list(merged)[skip:skip + limit]
+
+    def _page_query(self, model, user_id: int, on_date: Optional[date], sort: str, filters: dict):
+        q = (
+            self.db.query(model)
+            .options(joinedload(model.category))
+            .filter(*self.match_conditions(user_id, model=model, **filters))
         )
+        if on_date is not None:
+            q = q.filter(model.transaction_date == on_date)
+        return q.order_by(*_order_by(model, sort))
+
+    @staticmethod
+    def _reaches_archive(archived_before: date, on_date: Optional[date], start_date: Optional[date]) -> bool:
+        first_day = on_date or start_date
+        return first_day is None or first_day < archived_before
 
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Transaction]:
         return self.db.query(Transaction).order_by(Transaction.transaction_date.desc()).offset(skip).limit(limit).all()
 
-    def update(self, transaction_id: int, updates: dict) -> Optional[Transaction]:
+    def update(self, transaction_id: int, updates: dict, commit: bool = True) -> Optional[Transaction]:
         transaction = self.get_by_id(transaction_id)
         if not transaction:
             return None
@@ -48,27 +344,64 @@ class TransactionRepository:
             if hasattr(transaction, key) and value is not None:
                 setattr(transaction, key, value)
         
+        if not commit:
+            self.db.flush()
+            return transaction
         self.db.commit()
         self.db.refresh(transaction)
         return transaction
 
-    def delete(self, transaction_id: int) -> bool:
+    def delete(self, transaction_id: int, commit: bool = True) -> bool:
         transaction = self.get_by_id(transaction_id)
         if not transaction:
             return False
         
         self.db.delete(transaction)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         return True
 
-    def get_by_date_range_and_user(self, start_date: date, end_date: date, user_id: int) -> List[Transaction]:
-        return self.db.query(Transaction).filter(
+    def daily_net(self, user_id: int, start_date: date, end_date: date) -> dict[date, Decimal]:
+        """Income minus expenses per day in [start_date, end_date], aggregated in the database."""
+        signed = case((Transaction.type == TransactionType.INCOME, Transaction.amount), else_=-Transaction.amount)
+        rows = (
+            self.db.query(Transaction.transaction_date, func.sum(signed))
+            .filter(
+                Transaction.user_id == user_id,
+                Transaction.transaction_date >= start_date,
+                Transaction.transaction_date <= end_date,
+            )
+            .group_by(Transaction.transaction_date)
+            .all()
+        )
+        return {day: Decimal(net) for day, net in rows}
+
+    def get_by_date_range_and_user(
+        self, start_date: date, end_date: date, user_id: int, archived_before: Optional[date] = None
+    ) -> List[Transaction]:
+        """Transactions of the period in date order, archived ones included when the period reaches the archive."""
+        transactions = self.db.query(Transaction).filter(
             and_(
                 Transaction.transaction_date >= start_date,
                 Transaction.transaction_date <= end_date,
                 Transaction.user_id == user_id
             )
         ).order_by(Transaction.transaction_date.asc()).all()
+        if archived_before is None or start_date >= archived_before:
+            return transactions
+        archived = (
+            self.db.query(ArchivedTransaction)
+            .filter(
+                ArchivedTransaction.user_id == user_id,
+                ArchivedTransaction.transaction_date >= start_date,
+                ArchivedTransaction.transaction_date <= end_date,
+            )
+            .order_by(ArchivedTransaction.transaction_date.asc())
+            .all()
+        )
+        return list(heapq.merge(archived, transactions, key=lambda t: t.transaction_date))
 
     def get_by_date_range(self, start_date: date, end_date: date) -> List[Transaction]:
         return self.db.query(Transaction).filter(
@@ -2,12 +2,37 @@ from .transaction import (
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
+    TransactionSort,
+    TransactionRecategorize,
+    TransactionRecategorizeResponse,
+    TransactionFilter,
+    TransactionSelection,
+    TransactionBulkChanges,
+    TransactionBulkUpdate,
+    TransactionBulkDelete,
+    TransactionBulkResponse,
+    TransactionSearchResult,
+    TransactionSearchPage,
     DailyBalanceResponse,
+    BalanceForecastResponse,
+)
+from .recurring_transaction import (
+    RecurringTransactionCreate,
+    RecurringTransactionUpdate,
+    RecurringTransactionResponse,
+    RecurringOccurrence,
 )
 from .smart_transaction import (
     SmartTransactionRequest,
     SmartTransactionResponse,
 )
+from .parse_job import (
+    ParseJobResponse,
+    ParseJobError,
+)
+from .categorization_backfill import (
+    CategorizationBackfillResponse,
+)
 from .auth import (
     UserRegister,
     UserLogin,
@@ -22,6 +47,20 @@ from .user import (
     UserPreferencesUpdate,
     UserPreferencesInit
 )
+from .category import (
+    CategoryCreate,
+    CategoryUpdate,
+    CategoryResponse,
+    CategoryWithStatsResponse,
+    CategoryMergeResponse,
+)
+from .budget import (
+    BudgetCreate,
+    BudgetBatchItem,
+    BudgetBatchUpsert,
+    BudgetResponse,
+    CategoryInBudget,
+)
 from .insights import (
     InsightResponse,
     SpendingPattern,
@@ -33,9 +72,28 @@ __all__ = [
     "TransactionCreate",
     "TransactionUpdate",
     "TransactionResponse",
+    "TransactionSort",
+    "TransactionRecategorize",
+    "TransactionRecategorizeResponse",
+    "TransactionFilter",
+    "TransactionSelection",
+    "TransactionBulkChanges",
+    "TransactionBulkUpdate",
+    "TransactionBulkDelete",
+    "TransactionBulkResponse",
+    "TransactionSearchResult",
+    "TransactionSearchPage",
     "DailyBalanceResponse",
+    "BalanceForecastResponse",
+    "RecurringTransactionCreate",
+    "RecurringTransactionUpdate",
+    "RecurringTransactionResponse",
+    "RecurringOccurrence",
     "SmartTransactionRequest",
     "SmartTransactionResponse",
+    "ParseJobResponse",
+    "ParseJobError",
+    "CategorizationBackfillResponse",
     "UserRegister",
     "UserLogin",
     "UserResponse",
@@ -46,6 +104,16 @@ __all__ = [
     "UserPreferences",
     "UserPreferencesUpdate",
     "UserPreferencesInit",
+    "CategoryCreate",
+    "CategoryUpdate",
+    "CategoryResponse",
+    "CategoryWithStatsResponse",
+    "CategoryMergeResponse",
+    "BudgetCreate",
+    "BudgetBatchItem",
+    "BudgetBatchUpsert",
+    "BudgetResponse",
+    "CategoryInBudget",
     "InsightResponse",
     "SpendingPattern",
     "InsightsSummary",
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List
 from decimal import Decimal
 from datetime import datetime
 
@@ -12,6 +12,26 @@ class BudgetCreate(BaseModel):
     notify_threshold: float = Field(0.8, ge=0.0, le=1.0)
 
 
+class BudgetBatchItem(BaseModel):
+    category_id: int
+    amount: Decimal = Field(..., gt=0)
+    notify_threshold: float = Field(0.8, ge=0.0, le=1.0)
+
+
+class BudgetBatchUpsert(BaseModel):
+    """Todos os orçamentos de um mês, gravados num único INSERT ... ON CONFLICT."""
+    year: int = Field(..., ge=2000, le=2100)
+    month: int = Field(..., ge=1, le=12)
+    items: List[BudgetBatchItem] = Field(..., min_length=1, max_length=200)
+
+    @model_validator(mode="after")
+    def unique_categories(self):
+        category_ids = [item.category_id for item in self.items]
+        if len(set(category_ids)) != len(category_ids):
+            raise ValueError("Cada categoria pode aparecer apenas uma vez no lote")
+        return self
+
+
 class CategoryInBudget(BaseModel):
     id: int
     name: str
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import Optional, Literal
+from datetime import datetime
+
+
+class CategorizationBackfillResponse(BaseModel):
+    """Progresso da categorização automática do histórico."""
+    status: Literal["queued", "running", "completed", "cancelled", "failed"]
+    total: int
+    processed: int
+    categorized: int
+    percent: float
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_backfill(cls, backfill) -> "CategorizationBackfillResponse":
+        total = backfill.total or 0
+        processed = backfill.processed or 0
+        if backfill.status == "completed":
+            percent = 100.0
+        else:
+            percent = round(min(processed / total, 1.0) * 100, 1) if total else 0.0
+        return cls(
+            status=backfill.status,
+            total=total,
+            processed=processed,
+            categorized=backfill.categorized or 0,
+            percent=percent,
+            error=backfill.error_detail,
+            started_at=backfill.started_at,
+            updated_at=backfill.heartbeat_at,
+            finished_at=backfill.finished_at,
+        )
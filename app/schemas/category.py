@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from datetime import date
 from typing import Optional
 
 
@@ -17,3 +18,15 @@ class CategoryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CategoryWithStatsResponse(CategoryResponse):
+    transaction_count: int = 0
+    month_spent: float = Field(0.0, description="Despesas do mês corrente até hoje")
+    last_used: Optional[date] = Field(None, description="Data da transação mais recente")
+
+
+class CategoryMergeResponse(BaseModel):
+    category: CategoryResponse
+    merged_category_id: int
+    transactions_moved: int
@@ -0,0 +1,53 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Literal
+from datetime import datetime
+
+from app.schemas.smart_transaction import SmartTransactionResponse
+
+
+class ParseJobError(BaseModel):
+    detail: str
+    code: str
+
+
+class ParseJobResponse(BaseModel):
+    """Estado de um smart-parse assíncrono (imagem/áudio)."""
+    id: str
+    kind: Literal["image", "audio"]
+    status: Literal["queued", "running", "succeeded", "failed"]
+    result: Optional[SmartTransactionResponse] = None
+    error: Optional[ParseJobError] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "6f1c2a9e-4b7d-4c1e-9a55-0c3e2d1b8f70",
+                "kind": "image",
+                "status": "succeeded",
+                "result": {
+                    "description": "Supermercado",
+                    "amount": 123.45,
+                    "type": "expense",
+                    "transaction_date": "2025-11-11",
+                    "confidence": 0.9,
+                    "cached": False
+                },
+                "error": None,
+                "created_at": "2025-11-11T12:00:00Z",
+                "finished_at": "2025-11-11T12:00:07Z"
+            }
+        }
+
+    @classmethod
+    def from_job(cls, job) -> "ParseJobResponse":
+        return cls(
+            id=job.id,
+            kind=job.kind,
+            status=job.status,
+            result=job.result,
+            error={"detail": job.error_detail or "", "code": job.error_code} if job.error_code else None,
+            created_at=job.created_at,
+            finished_at=job.finished_at,
+        )
@@ -0,0 +1,81 @@
+from pydantic import BaseModel, Field, model_validator
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from app.domain.recurrence import Frequency
+from app.infrastructure.database import TransactionType
+
+
+class RecurringTransactionCreate(BaseModel):
+    description: str = Field(..., min_length=1, max_length=255)
+    amount: Decimal = Field(..., gt=0, decimal_places=2)
+    type: TransactionType
+    category_id: Optional[int] = None
+    frequency: Frequency
+    interval: int = Field(1, ge=1, le=366, description="A cada N dias/semanas/meses")
+    start_date: date
+    end_date: Optional[date] = None
+    weekday: Optional[int] = Field(None, ge=0, le=6, description="WEEKLY: 0 = segunda ... 6 = domingo (padrão: dia de start_date)")
+    day_of_month: Optional[int] = Field(None, ge=1, le=31, description="MONTHLY: dia do mês (padrão: dia de start_date)")
+
+    @model_validator(mode="after")
+    def check_rule(self):
+        check_recurrence(self.frequency, self.start_date, self.end_date, self.weekday, self.day_of_month)
+        return self
+
+
+class RecurringTransactionUpdate(BaseModel):
+    description: Optional[str] = Field(None, min_length=1, max_length=255)
+    amount: Optional[Decimal] = Field(None, gt=0, decimal_places=2)
+    type: Optional[TransactionType] = None
+    category_id: Optional[int] = None
+    frequency: Optional[Frequency] = None
+    interval: Optional[int] = Field(None, ge=1, le=366)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    weekday: Optional[int] = Field(None, ge=0, le=6)
+    day_of_month: Optional[int] = Field(None, ge=1, le=31)
+
+
+class RecurringTransactionResponse(BaseModel):
+    id: int
+    description: str
+    amount: Decimal
+    type: TransactionType
+    category_id: Optional[int] = None
+    frequency: Frequency
+    interval: int
+    start_date: date
+    end_date: Optional[date] = None
+    weekday: Optional[int] = None
+    day_of_month: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RecurringOccurrence(BaseModel):
+    """Ocorrência projetada de uma regra (calculada, não gravada)."""
+    recurring_id: int
+    date: date
+    description: str
+    amount: Decimal
+    type: TransactionType
+    category_id: Optional[int] = None
+
+
+def check_recurrence(
+    frequency: Frequency,
+    start_date: date,
+    end_date: Optional[date],
+    weekday: Optional[int],
+    day_of_month: Optional[int],
+) -> None:
+    """Raise ValueError when the rule fields are inconsistent (also used for partial updates)."""
+    if end_date is not None and end_date < start_date:
+        raise ValueError("end_date deve ser posterior ou igual a start_date")
+    if weekday is not None and frequency != Frequency.WEEKLY:
+        raise ValueError("weekday só se aplica à frequência weekly")
+    if day_of_month is not None and frequency != Frequency.MONTHLY:
+        raise ValueError("day_of_month só se aplica à frequência monthly")
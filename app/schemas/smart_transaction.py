@@ -15,6 +15,7 @@ class SmartTransactionResponse(BaseModel):
     type: Literal["income", "expense"]
     transaction_date: date
     confidence: float = Field(..., ge=0, le=1, description="Confidence score of the parsing")
+    cached: bool = Field(False, description="True when the result was served from the parse cache")
     
     class Config:
         json_schema_extra = {
@@ -23,6 +24,7 @@ class SmartTransactionResponse(BaseModel):
                 "amount": 25.50,
                 "type": "expense",
                 "transaction_date": "2025-11-11",
-                "confidence": 0.95
+                "confidence": 0.95,
+                "cached": False
             }
         }
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+import enum
+from pydantic import BaseModel, Field, model_validator
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
 from app.infrastructure.database import TransactionType
@@ -11,6 +12,15 @@ class TransactionBase(BaseModel):
     amount: Decimal = Field(..., gt=0, decimal_places=2)
     type: TransactionType
     transaction_date: date
+    category_id: Optional[int] = None
+
+
+class TransactionSort(str, enum.Enum):
+    """Ordenações aceitas em GET /transactions/ (cada uma servida por um índice)."""
+    DATE_DESC = "date_desc"
+    DATE_ASC = "date_asc"
+    AMOUNT_DESC = "amount_desc"
+    AMOUNT_ASC = "amount_asc"
 
 
 class TransactionCreate(TransactionBase):
@@ -22,15 +32,120 @@ class TransactionUpdate(BaseModel):
     amount: Optional[Decimal] = Field(None, gt=0, decimal_places=2)
     type: Optional[TransactionType] = None
     transaction_date: Optional[date] = None
+    category_id: Optional[int] = None
+
+
+class TransactionRecategorize(BaseModel):
+    """Set `category_id` (or clear it with null) on every transaction matching the filters."""
+    category_id: Optional[int] = Field(..., description="Categoria de destino; null remove a categoria")
+    from_category_id: Optional[int] = Field(None, description="Apenas transações desta categoria")
+    uncategorized: bool = Field(False, description="Apenas transações sem categoria")
+    description_contains: Optional[str] = Field(
+        None, min_length=1, max_length=255, description="Trecho da descrição (sem diferenciar maiúsculas)"
+    )
+    type: Optional[TransactionType] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_filters(self):
+        if self.from_category_id is not None and self.uncategorized:
+            raise ValueError("Use from_category_id ou uncategorized, não ambos")
+        if self.from_category_id is None and not self.uncategorized and self.description_contains is None:
+            raise ValueError("Informe from_category_id, uncategorized ou description_contains")
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date deve ser anterior ou igual a end_date")
+        return self
+
+
+class TransactionRecategorizeResponse(BaseModel):
+    updated: int
+
+
+class TransactionFilter(BaseModel):
+    """Criteria selecting a user's transactions (same semantics as the GET /transactions/ filters)."""
+    category_id: Optional[int] = None
+    uncategorized: bool = False
+    description_contains: Optional[str] = Field(None, min_length=1, max_length=255)
+    type: Optional[TransactionType] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    min_amount: Optional[Decimal] = Field(None, ge=0)
+    max_amount: Optional[Decimal] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def check_filters(self):
+        if self.category_id is not None and self.uncategorized:
+            raise ValueError("Use category_id ou uncategorized, não ambos")
+        criteria = self.model_dump(exclude={"uncategorized"}, exclude_none=True)
+        if not criteria and not self.uncategorized:
+            # Um filtro vazio selecionaria todas as transações do usuário
+            raise ValueError("Informe ao menos um critério no filtro")
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date deve ser anterior ou igual a end_date")
+        if self.min_amount is not None and self.max_amount is not None and self.min_amount > self.max_amount:
+            raise ValueError("min_amount deve ser menor ou igual a max_amount")
+        return self
+
+
+class TransactionSelection(BaseModel):
+    """Transactions to act on: explicit `ids` or a `filter`, never both."""
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[TransactionFilter] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Informe ids ou filter (apenas um)")
+        return self
+
+
+class TransactionBulkChanges(BaseModel):
+    type: Optional[TransactionType] = None
+    transaction_date: Optional[date] = None
+    category_id: Optional[int] = Field(None, description="null remove a categoria")
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if not self.model_fields_set:
+            raise ValueError("Informe ao menos um campo em changes")
+        if "type" in self.model_fields_set and self.type is None:
+            raise ValueError("type não pode ser null")
+        if "transaction_date" in self.model_fields_set and self.transaction_date is None:
+            raise ValueError("transaction_date não pode ser null")
+        return self
+
+
+class TransactionBulkUpdate(TransactionSelection):
+    changes: TransactionBulkChanges
+
+
+class TransactionBulkDelete(TransactionSelection):
+    pass
+
+
+class TransactionBulkResponse(BaseModel):
+    affected: int
 
 
 class TransactionResponse(TransactionBase):
     id: int
+    category_name: Optional[str] = None
+    archived: bool = Field(False, description="true para histórico arquivado (somente leitura)")
 
     class Config:
         from_attributes = True
 
 
+class TransactionSearchResult(TransactionResponse):
+    rank: float = Field(..., description="Relevância (0-1): maior entre full-text e similaridade de trigramas")
+
+
+class TransactionSearchPage(BaseModel):
+    items: List[TransactionSearchResult]
+    next_cursor: Optional[str] = Field(None, description="Passe em `cursor` para a próxima página; null no fim")
+
+
 class DailyBalanceResponse(BaseModel):
     date: str
     balance: float
@@ -43,3 +158,5 @@ class DailyBalanceResponse(BaseModel):
     )
 
 
+class BalanceForecastResponse(DailyBalanceResponse):
+    projected: bool = Field(False, description="true para dias futuros (inclui ocorrências das regras recorrentes)")
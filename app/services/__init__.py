@@ -2,5 +2,8 @@ from .transaction_service import TransactionService
 from .auth_service import AuthService
 from .user_service import UserService
 from .insights_service import InsightsService
+from .category_service import CategoryService
+from .budget_service import BudgetService
+from .recurring_transaction_service import RecurringTransactionService
 
-__all__ = ["TransactionService", "AuthService", "UserService", "InsightsService"]
+__all__ = ["TransactionService", "AuthService", "UserService", "InsightsService", "CategoryService", "BudgetService", "RecurringTransactionService"]
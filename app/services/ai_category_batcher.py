@@ -0,0 +1,93 @@
+"""
+Micro-batching layer for AI categorization.
+
+Concurrent `submit` calls are grouped per category set and flushed as a
+single prompt when the group reaches `max_batch_size` or its oldest request
+has waited `max_wait_ms`. Each caller gets a Future resolved with its own
+answer once the batch returns.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from app.services.ai_category_cache import hash_categories
+
+logger = logging.getLogger(__name__)
+
+BatchSender = Callable[[list[str], list[str]], list[Optional[str]]]
+
+
+@dataclass
+class _PendingGroup:
+    categories: list[str]
+    created_at: float
+    items: list[tuple[str, Future]] = field(default_factory=list)
+
+
+class AICategoryBatcher:
+    """Collects single categorization requests into batched AI calls."""
+
+    def __init__(self, send_batch: BatchSender, max_batch_size: int, max_wait_ms: int, max_concurrency: int = 2):
+        self.send_batch = send_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self._groups: dict[str, _PendingGroup] = {}
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="ai-batch")
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, description: str, available_categories: list[str]) -> Future:
+        future: Future = Future()
+        key = hash_categories(available_categories)
+        with self._cond:
+            group = self._groups.get(key)
+            if group is None:
+                group = _PendingGroup(categories=list(available_categories), created_at=time.monotonic())
+                self._groups[key] = group
+            group.items.append((description, future))
+            if len(group.items) >= self.max_batch_size:
+                self._dispatch(self._groups.pop(key))
+            else:
+                self._ensure_worker()
+                self._cond.notify()
+        return future
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="ai-batch-collector", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._groups:
+                    self._cond.wait()
+                now = time.monotonic()
+                due = [k for k, g in self._groups.items() if now - g.created_at >= self.max_wait]
+                for key in due:
+                    self._dispatch(self._groups.pop(key))
+                if self._groups:
+                    oldest = min(g.created_at for g in self._groups.values())
+                    self._cond.wait(timeout=max(0.0, oldest + self.max_wait - now))
+
+    def _dispatch(self, group: _PendingGroup) -> None:
+        # Called with the lock held; the remote call itself runs in the executor.
+        self._executor.submit(self._flush, group)
+
+    def _flush(self, group: _PendingGroup) -> None:
+        descriptions = [d for d, _ in group.items]
+        try:
+            results = self.send_batch(descriptions, group.categories)
+        except Exception as e:
+            for _, future in group.items:
+                future.set_exception(e)
+            return
+        if len(results) != len(descriptions):
+            logger.warning(f"⚠️ AI batch returned {len(results)} answers for {len(descriptions)} items")
+            results = list(results)[:len(descriptions)] + [None] * max(0, len(descriptions) - len(results))
+        for (_, future), category in zip(group.items, results):
+            future.set_result(category)
@@ -0,0 +1,97 @@
+"""
+Two-level memo for AI categorization answers.
+
+An in-process LRU sits in front of the persisted `ai_category_cache` table,
+so repeated descriptions ("uber", "ifood", "netflix") are answered without
+reaching the AI provider. Entries are keyed by the normalized description and
+a hash of the available category set, since the answer depends on both.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings, SessionLocal
+from app.infrastructure.cache import TTLCache, MISSING
+from app.repositories import AICategoryCacheRepository
+from app.services.auto_categorizer import _normalize
+
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[str, str]
+
+
+def normalize_description(description: str) -> str:
+    """Accent/case-insensitive form of a description with collapsed whitespace."""
+    return " ".join(_normalize(description).split())[:255]
+
+
+def hash_categories(available_categories: list[str]) -> str:
+    """Order-independent fingerprint of the category names offered to the AI."""
+    joined = "\n".join(sorted(set(available_categories)))
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+class AICategoryCache:
+    """LRU front + DB-backed store for AI categorization results."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        maxsize: Optional[int] = None,
+        ttl_hours: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.ttl = timedelta(hours=ttl_hours if ttl_hours is not None else settings.ai_category_cache_ttl_hours)
+        self.memory = TTLCache(
+            maxsize=maxsize if maxsize is not None else settings.ai_category_cache_size,
+            ttl_seconds=self.ttl.total_seconds(),
+        )
+
+    @staticmethod
+    def make_key(description: str, available_categories: list[str]) -> CacheKey:
+        return normalize_description(description), hash_categories(available_categories)
+
+    def get(self, key: CacheKey):
+        """Return the cached category (possibly None) or `MISSING`."""
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+        if not key[0]:
+            return MISSING
+
+        fresh_after = datetime.now(timezone.utc) - self.ttl
+        db = self.session_factory()
+        try:
+            entry = AICategoryCacheRepository(db).get_fresh(key[0], key[1], fresh_after)
+        except Exception as e:
+            logger.warning(f"⚠️ AI category cache lookup failed: {e}")
+            return MISSING
+        finally:
+            db.close()
+
+        if entry is None:
+            return MISSING
+        self.memory.set(key, entry.category)
+        return entry.category
+
+    def set(self, key: CacheKey, category: Optional[str]) -> None:
+        self.set_many({key: category})
+
+    def set_many(self, answers: dict[CacheKey, Optional[str]]) -> None:
+        for key, category in answers.items():
+            self.memory.set(key, category)
+        entries = [(key[0], key[1], category) for key, category in answers.items() if key[0]]
+        if not entries:
+            return
+        db = self.session_factory()
+        try:
+            AICategoryCacheRepository(db).upsert_many(entries)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ AI category cache write failed: {e}")
+        finally:
+            db.close()
@@ -1,16 +1,23 @@
 """
-AI Categorization Service using Google Gemini API.
+AI Categorization Service using the configured AI provider (Gemini by default).
 
 This service provides intelligent transaction categorization using AI,
 with fallback to rule-based categorization when AI is unavailable.
 """
 
+import json
 import logging
+import re
+import threading
 from typing import Optional
-import google.generativeai as genai
 
 from app.config import settings
+from app.infrastructure.cache import MISSING
 from app.services.auto_categorizer import suggest_category
+from app.services.ai_category_cache import AICategoryCache
+from app.services.ai_category_batcher import AICategoryBatcher
+from app.services.ai_resilience import CircuitOpenError, call_with_resilience, get_ai_breaker
+from app.services.ai_provider import AIResponse, get_ai_provider
 
 logger = logging.getLogger(__name__)
 
@@ -21,26 +28,22 @@ class AICategoryService:
     def __init__(self):
         """Initialize AI service with configured provider."""
         self.provider = settings.ai_provider
-        self.api_key = settings.ai_provider_api_key
-        self.enabled = bool(self.api_key)
+        self.ai = get_ai_provider()
+        self.enabled = self.ai is not None
+        self.cache = AICategoryCache()
+        self._stats = {"requests": 0, "cache_hits": 0, "ai_calls": 0, "ai_items": 0}
+        self._stats_lock = threading.Lock()
+        self.batch_size = max(1, settings.ai_batch_max_size)
+        # Concurrent single categorizations are coalesced into one prompt
+        self.batcher: Optional[AICategoryBatcher] = None
+        if settings.ai_batch_max_wait_ms > 0 and self.batch_size > 1:
+            self.batcher = AICategoryBatcher(
+                self._send_batch,
+                max_batch_size=self.batch_size,
+                max_wait_ms=settings.ai_batch_max_wait_ms,
+            )
         
-        if self.enabled and self.provider == "gemini":
-            try:
-                genai.configure(api_key=self.api_key)
-                
-                # Usar gemini-2.5-pro se disponível (Google One), fallback para flash
-                # Com Google One, você pode ter acesso a modelos mais avançados
-                try:
-                    self.model = genai.GenerativeModel('models/gemini-2.5-pro')
-                    logger.info("✅ Gemini 2.5 Pro enabled (Google One)")
-                except Exception:
-                    self.model = genai.GenerativeModel('models/gemini-2.5-flash')
-                    logger.info("✅ Gemini 2.5 Flash enabled")
-                    
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize Gemini: {e}")
-                self.enabled = False
-        else:
+        if not self.enabled:
             logger.info("ℹ️ AI categorization disabled - using rule-based fallback")
     
     def categorize(self, description: str, available_categories: list[str]) -> Optional[str]:
@@ -57,15 +60,30 @@ class AICategoryService:
         if not description or not available_categories:
             return None
         
-        # Try AI categorization if enabled
-        if self.enabled:
-            try:
-                category = self._categorize_with_ai(description, available_categories)
-                if category:
-                    logger.info(f"✅ AI categorized '{description[:30]}...' → '{category}'")
-                    return category
-            except Exception as e:
-                logger.warning(f"⚠️ AI categorization failed: {e}. Falling back to rules.")
+        # Try AI categorization if enabled (memoized per description + category set).
+        # While the AI circuit is open, go straight to the rule-based fallback.
+        if self.enabled and not get_ai_breaker().is_open():
+            self._count("requests")
+            cache_key = self.cache.make_key(description, available_categories)
+            cached = self.cache.get(cache_key)
+            if cached is not MISSING:
+                self._count("cache_hits")
+                if cached in available_categories:
+                    return cached
+            else:
+                try:
+                    if self.batcher is not None:
+                        category = self.batcher.submit(description, available_categories).result()
+                    else:
+                        category = self._categorize_with_ai(description, available_categories)
+                    self.cache.set(cache_key, category)
+                    if category:
+                        logger.info(f"✅ AI categorized '{description[:30]}...' → '{category}'")
+                        return category
+                except CircuitOpenError:
+                    logger.info("🔌 AI circuit open. Falling back to rules.")
+                except Exception as e:
+                    logger.warning(f"⚠️ AI categorization failed: {e}. Falling back to rules.")
         
         # Fallback to rule-based categorization
         category = suggest_category(description)
@@ -75,6 +93,72 @@ class AICategoryService:
         
         return None
     
+    def categorize_many(self, descriptions: list[str], available_categories: list[str]) -> list[Optional[str]]:
+        """
+        Categorize many descriptions at once (bulk imports, backfills).
+
+        Cache hits are answered locally; distinct misses are sent to the AI in
+        chunks of `ai_batch_max_size` per prompt. Anything the AI cannot place
+        falls back to the rule-based heuristic.
+
+        Returns:
+            One category name (or None) per input description, in order
+        """
+        results: list[Optional[str]] = [None] * len(descriptions)
+        if not available_categories:
+            return results
+
+        if self.enabled and not get_ai_breaker().is_open():
+            pending: dict[tuple[str, str], list[int]] = {}
+            for i, description in enumerate(descriptions):
+                if not description:
+                    continue
+                self._count("requests")
+                key = self.cache.make_key(description, available_categories)
+                cached = self.cache.get(key)
+                if cached is not MISSING:
+                    self._count("cache_hits")
+                    results[i] = cached if cached in available_categories else None
+                    continue
+                pending.setdefault(key, []).append(i)
+
+            keys = list(pending)
+            for start in range(0, len(keys), self.batch_size):
+                chunk = keys[start:start + self.batch_size]
+                texts = [descriptions[pending[k][0]] for k in chunk]
+                try:
+                    answers = self._send_batch(texts, available_categories)
+                except CircuitOpenError:
+                    logger.info("🔌 AI circuit open. Falling back to rules for the remaining items.")
+                    break
+                except Exception as e:
+                    logger.warning(f"⚠️ AI batch categorization failed: {e}. Falling back to rules.")
+                    continue
+                self.cache.set_many(dict(zip(chunk, answers)))
+                for key, category in zip(chunk, answers):
+                    for i in pending[key]:
+                        results[i] = category
+
+        for i, description in enumerate(descriptions):
+            if results[i] is None and description:
+                category = suggest_category(description)
+                if category and category in available_categories:
+                    results[i] = category
+        return results
+
+    def stats(self) -> dict:
+        """Counters for cache effectiveness: AI call rate = ai_calls / requests."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        requests = stats["requests"] or 1
+        stats["ai_call_rate"] = round(stats["ai_calls"] / requests, 4)
+        stats["memory_entries"] = len(self.cache.memory)
+        return stats
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+    
     def _categorize_with_ai(self, description: str, available_categories: list[str]) -> Optional[str]:
         """
         Internal method to categorize using AI provider.
@@ -86,52 +170,121 @@ class AICategoryService:
         Returns:
             Category name or None
         """
-        if self.provider != "gemini":
+        if self.ai is None:
             return None
         
-        # Build category list with better formatting
-        categories_text = "\n".join([f"- {cat}" for cat in available_categories])
+        self._count("ai_calls")
+        self._count("ai_items")
         
         # Very simple prompt to avoid blocks - use JSON format
         categories_list = ', '.join(available_categories)
         prompt = f"Choose the best category for: '{description}'\nCategories: {categories_list}\nRespond with just the category name."
 
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0,
-                    max_output_tokens=15,
-                )
-            )
+            response = self._generate(prompt, task="categorize", max_output_tokens=15)
             
             # Check if response was blocked
-            if not response.candidates or not response.candidates[0].content.parts:
-                logger.warning(f"⚠️ AI response blocked (finish_reason: {response.candidates[0].finish_reason if response.candidates else 'unknown'})")
+            if response.blocked:
+                logger.warning(f"⚠️ AI response blocked (finish_reason: {response.finish_reason})")
                 return None
             
-            category = response.text.strip()
+            return self._match_category(response.text, available_categories)
+            
+        except Exception as e:
+            logger.error(f"❌ AI provider error: {e}")
+            raise
+
+    def _send_batch(self, descriptions: list[str], available_categories: list[str]) -> list[Optional[str]]:
+        """Batch sender: single items keep the short prompt, larger groups use the JSON array one."""
+        if len(descriptions) == 1:
+            return [self._categorize_with_ai(descriptions[0], available_categories)]
+        return self._categorize_batch_with_ai(descriptions, available_categories)
+
+    def _categorize_batch_with_ai(self, descriptions: list[str], available_categories: list[str]) -> list[Optional[str]]:
+        """
+        Categorize several descriptions with a single structured prompt.
+        
+        Args:
+            descriptions: Transaction descriptions
+            available_categories: Available category names
             
-            # Clean up response
-            category = category.strip('"\'.,;: ')
+        Returns:
+            One category name (or None) per description, in order
+        """
+        if self.ai is None:
+            return [None] * len(descriptions)
+        
+        self._count("ai_calls")
+        with self._stats_lock:
+            self._stats["ai_items"] += len(descriptions)
+        
+        categories_list = ', '.join(available_categories)
+        numbered = "\n".join(f"{i}. {d}" for i, d in enumerate(descriptions, start=1))
+        prompt = (
+            f"Choose the best category for each transaction below.\n"
+            f"Categories: {categories_list}\n"
+            f"Transactions:\n{numbered}\n"
+            f"Respond ONLY with a JSON array of {len(descriptions)} category names, in the same order "
+            f"(use null when no category fits)."
+        )
+
+        try:
+            response = self._generate(prompt, task="categorize_batch", max_output_tokens=15 * len(descriptions) + 20)
             
-            # Validate category exists
-            if category in available_categories:
-                return category
+            if response.blocked:
+                logger.warning("⚠️ AI response blocked for batch")
+                return [None] * len(descriptions)
             
-            # Try case-insensitive match
-            category_lower = category.lower()
-            for available_cat in available_categories:
-                if available_cat.lower() == category_lower:
-                    return available_cat
+            json_text = response.text.strip()
+            json_text = re.sub(r'^```json\s*', '', json_text)
+            json_text = re.sub(r'\s*```$', '', json_text)
+            answers = json.loads(json_text.strip())
+            if not isinstance(answers, list):
+                logger.warning("⚠️ AI batch response is not a JSON array")
+                return [None] * len(descriptions)
             
-            logger.warning(f"⚠️ AI returned invalid category: '{category}'")
-            return None
+            answers = (answers + [None] * len(descriptions))[:len(descriptions)]
+            return [
+                self._match_category(str(a), available_categories) if a is not None else None
+                for a in answers
+            ]
             
         except Exception as e:
-            logger.error(f"❌ Gemini API error: {e}")
+            logger.error(f"❌ AI provider error (batch of {len(descriptions)}): {e}")
             raise
 
+    def _generate(self, prompt: str, task: str, max_output_tokens: int) -> AIResponse:
+        """Model call under the shared deadline/circuit breaker."""
+        timeout = settings.ai_request_timeout_seconds
+        return call_with_resilience(
+            lambda: self.ai.generate(
+                prompt,
+                task=task,
+                temperature=0,
+                max_output_tokens=max_output_tokens,
+                timeout=timeout,
+            ),
+            timeout=timeout,
+        )
+
+    @staticmethod
+    def _match_category(raw: str, available_categories: list[str]) -> Optional[str]:
+        """Map a raw AI answer onto one of the available category names."""
+        category = raw.strip().strip('"\'.,;: ')
+        
+        # Validate category exists
+        if category in available_categories:
+            return category
+        
+        # Try case-insensitive match
+        category_lower = category.lower()
+        for available_cat in available_categories:
+            if available_cat.lower() == category_lower:
+                return available_cat
+        
+        logger.warning(f"⚠️ AI returned invalid category: '{category}'")
+        return None
+
 
 # Singleton instance
 _ai_service: Optional[AICategoryService] = None
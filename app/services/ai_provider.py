@@ -0,0 +1,368 @@
+"""
+Pluggable AI provider layer.
+
+Services talk to an `AIProvider` instead of a concrete SDK, so the AI paths
+can run (and be benchmarked) without network access:
+
+- `GeminiProvider`: Google Gemini through `google.generativeai`.
+- `StubProvider`: deterministic local answers with configurable latency,
+  jitter and error injection (seeded, so runs are reproducible).
+- `RecordReplayProvider`: wraps another provider and stores every answer in
+  `ai_record_dir` (`record`), or serves answers only from those files
+  (`replay`), so real traffic can be replayed offline.
+
+Selection: `AI_PROVIDER=gemini|stub`, optionally `AI_RECORD_MODE=record|replay`.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional, Union
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A prompt is either plain text or a list of parts: text and {"mime_type": ..., "data": bytes}
+Contents = Union[str, list]
+
+
+class AIProviderError(Exception):
+    """Raised by providers for failed calls (injected errors, missing recordings...)."""
+
+
+@dataclass
+class AIResponse:
+    text: str = ""
+    blocked: bool = False
+    finish_reason: Optional[str] = None
+
+
+class AIProvider(ABC):
+    """Minimal text-generation interface used by the AI services."""
+
+    name = "base"
+    supports_media = False
+
+    @abstractmethod
+    def generate(
+        self,
+        contents: Contents,
+        *,
+        task: str,
+        temperature: float,
+        max_output_tokens: int,
+        timeout: float,
+    ) -> AIResponse:
+        """Blocking generation. `task` names the prompt kind (categorize, parse_image...)."""
+
+    async def generate_async(
+        self,
+        contents: Contents,
+        *,
+        task: str,
+        temperature: float,
+        max_output_tokens: int,
+        timeout: float,
+    ) -> AIResponse:
+        return await asyncio.to_thread(
+            self.generate,
+            contents,
+            task=task,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            timeout=timeout,
+        )
+
+
+class GeminiProvider(AIProvider):
+    name = "gemini"
+    supports_media = True
+
+    def __init__(self, api_key: str):
+        import google.generativeai as genai
+
+        self._genai = genai
+        genai.configure(api_key=api_key)
+        # Usar gemini-2.5-pro se disponível (Google One), fallback para flash
+        try:
+            self.model = genai.GenerativeModel('models/gemini-2.5-pro')
+            logger.info("✅ Gemini 2.5 Pro enabled")
+        except Exception:
+            self.model = genai.GenerativeModel('models/gemini-2.5-flash')
+            logger.info("✅ Gemini 2.5 Flash enabled")
+
+    def generate(self, contents, *, task, temperature, max_output_tokens, timeout) -> AIResponse:
+        response = self.model.generate_content(
+            contents,
+            generation_config=self._config(temperature, max_output_tokens),
+            request_options={"timeout": timeout},
+        )
+        return self._to_response(response)
+
+    async def generate_async(self, contents, *, task, temperature, max_output_tokens, timeout) -> AIResponse:
+        response = await self.model.generate_content_async(
+            contents,
+            generation_config=self._config(temperature, max_output_tokens),
+            request_options={"timeout": timeout},
+        )
+        return self._to_response(response)
+
+    def _config(self, temperature: float, max_output_tokens: int):
+        return self._genai.types.GenerationConfig(temperature=temperature, max_output_tokens=max_output_tokens)
+
+    @staticmethod
+    def _to_response(response) -> AIResponse:
+        if not response.candidates or not response.candidates[0].content.parts:
+            finish_reason = str(response.candidates[0].finish_reason) if response.candidates else "unknown"
+            return AIResponse(blocked=True, finish_reason=finish_reason)
+        return AIResponse(text=response.text)
+
+
+# Prompt shapes produced by AICategoryService / SmartTransactionParser
+_SINGLE_CATEGORY_RE = re.compile(r"Choose the best category for: '(?P<description>.*)'\nCategories: (?P<categories>.*)\n")
+_BATCH_CATEGORIES_RE = re.compile(r"Categories: (?P<categories>.*)\nTransactions:\n(?P<items>.*?)\nRespond", re.S)
+_COMMAND_RE = re.compile(r'Command: "(?P<command>.*)"')
+_TODAY_RE = re.compile(r"Today's date: (?P<today>\d{4}-\d{2}-\d{2})")
+
+
+class StubProvider(AIProvider):
+    """
+    Deterministic offline provider for benchmarks and capacity tests.
+
+    Answers are derived from the prompt (rule-based categorizer, local command
+    parser, content hash for media), so identical prompts always get identical
+    answers. Latency is `latency_ms ± jitter_ms`; a fraction `error_rate` of the
+    calls raises `AIProviderError` after the latency.
+    """
+
+    name = "stub"
+    supports_media = True
+
+    def __init__(self, latency_ms: int = 0, jitter_ms: int = 0, error_rate: float = 0.0, seed: int = 42):
+        self.latency_ms = max(0, latency_ms)
+        self.jitter_ms = max(0, jitter_ms)
+        self.error_rate = min(max(error_rate, 0.0), 1.0)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, contents, *, task, temperature, max_output_tokens, timeout) -> AIResponse:
+        delay, fail = self._draw()
+        time.sleep(delay)
+        return self._answer(contents, task, fail)
+
+    async def generate_async(self, contents, *, task, temperature, max_output_tokens, timeout) -> AIResponse:
+        delay, fail = self._draw()
+        await asyncio.sleep(delay)
+        return self._answer(contents, task, fail)
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self._random.random() < self.error_rate
+        return max(0.0, self.latency_ms + jitter) / 1000, fail
+
+    def _answer(self, contents: Contents, task: str, fail: bool) -> AIResponse:
+        if fail:
+            raise AIProviderError(f"stub: injected error ({task})")
+        text = _text_of(contents)
+        if task == "categorize":
+            return AIResponse(text=self._categorize(text) or "none")
+        if task == "categorize_batch":
+            return AIResponse(text=json.dumps(self._categorize_batch(text), ensure_ascii=False))
+        if task == "parse_command":
+            return AIResponse(text=json.dumps(self._parse_command(text)))
+        if task in ("parse_image", "parse_audio"):
+            return AIResponse(text=json.dumps(self._parse_media(contents, text, task)))
+        raise AIProviderError(f"stub: unknown task '{task}'")
+
+    @staticmethod
+    def _pick_category(description: str, categories: list[str]) -> Optional[str]:
+        from app.services.auto_categorizer import suggest_category
+
+        if not categories:
+            return None
+        suggested = suggest_category(description)
+        if suggested in categories:
+            return suggested
+        digest = hashlib.blake2b(description.lower().encode("utf-8"), digest_size=4).digest()
+        return categories[int.from_bytes(digest, "big") % len(categories)]
+
+    def _categorize(self, text: str) -> Optional[str]:
+        m = _SINGLE_CATEGORY_RE.search(text)
+        if not m:
+            return None
+        return self._pick_category(m.group("description"), m.group("categories").split(", "))
+
+    def _categorize_batch(self, text: str) -> list[Optional[str]]:
+        m = _BATCH_CATEGORIES_RE.search(text)
+        if not m:
+            return []
+        categories = m.group("categories").split(", ")
+        items = [re.sub(r"^\d+\.\s*", "", line) for line in m.group("items").splitlines()]
+        return [self._pick_category(item, categories) for item in items]
+
+    @staticmethod
+    def _today(text: str) -> date:
+        m = _TODAY_RE.search(text)
+        return date.fromisoformat(m.group("today")) if m else date.today()
+
+    def _parse_command(self, text: str) -> dict:
+        from app.services.local_transaction_parser import parse_command_locally
+
+        m = _COMMAND_RE.search(text)
+        command = m.group("command") if m else ""
+        today = self._today(text)
+        parsed = parse_command_locally(command, today)
+        if parsed is None:
+            return {"description": command[:50] or "Transação", "amount": 0, "type": "expense",
+                    "transaction_date": today.isoformat(), "confidence": 0.1}
+        return {"description": parsed.description, "amount": float(parsed.amount), "type": parsed.type,
+                "transaction_date": parsed.transaction_date.isoformat(), "confidence": 0.9}
+
+    def _parse_media(self, contents: Contents, text: str, task: str) -> dict:
+        digest = hashlib.blake2b(_media_of(contents), digest_size=8).digest()
+        cents = int.from_bytes(digest, "big") % 50000 + 100
+        return {
+            "description": "Compra no mercado" if task == "parse_image" else "Almoço",
+            "amount": cents / 100,
+            "type": "expense",
+            "transaction_date": self._today(text).isoformat(),
+            "confidence": 0.8,
+        }
+
+
+class RecordReplayProvider(AIProvider):
+    """
+    Record real answers to JSON files, or replay them offline.
+
+    Files live at `<directory>/<task>/<key>.json`, where the key hashes the
+    prompt text (ISO dates removed, so "today" in prompts does not break
+    replays on later days), media bytes and generation parameters.
+    """
+
+    def __init__(self, directory: str, mode: str, inner: Optional[AIProvider] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid record mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("Record mode needs a provider to record from")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.inner = inner
+        self.name = f"{mode}:{inner.name if inner else 'files'}"
+        self.supports_media = inner.supports_media if inner else True
+
+    def generate(self, contents, *, task, temperature, max_output_tokens, timeout) -> AIResponse:
+        path = self._path(contents, task, temperature, max_output_tokens)
+        if self.mode == "replay":
+            return self._load(path, task)
+        response = self.inner.generate(
+            contents, task=task, temperature=temperature, max_output_tokens=max_output_tokens, timeout=timeout
+        )
+        self._save(path, contents, task, response)
+        return response
+
+    async def generate_async(self, contents, *, task, temperature, max_output_tokens, timeout) -> AIResponse:
+        path = self._path(contents, task, temperature, max_output_tokens)
+        if self.mode == "replay":
+            return await asyncio.to_thread(self._load, path, task)
+        response = await self.inner.generate_async(
+            contents, task=task, temperature=temperature, max_output_tokens=max_output_tokens, timeout=timeout
+        )
+        await asyncio.to_thread(self._save, path, contents, task, response)
+        return response
+
+    def _path(self, contents: Contents, task: str, temperature: float, max_output_tokens: int) -> Path:
+        digest = hashlib.sha256()
+        digest.update(re.sub(r"\d{4}-\d{2}-\d{2}", "<date>", _text_of(contents)).encode("utf-8"))
+        digest.update(_media_of(contents))
+        digest.update(f"|{temperature}|{max_output_tokens}".encode("utf-8"))
+        return self.directory / task / f"{digest.hexdigest()[:32]}.json"
+
+    @staticmethod
+    def _load(path: Path, task: str) -> AIResponse:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise AIProviderError(f"replay: no recording for {task} ({path.name})")
+        return AIResponse(text=data.get("text", ""), blocked=data.get("blocked", False),
+                          finish_reason=data.get("finish_reason"))
+
+    @staticmethod
+    def _save(path: Path, contents: Contents, task: str, response: AIResponse) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "task": task,
+            "prompt": _text_of(contents)[:2000],
+            "text": response.text,
+            "blocked": response.blocked,
+            "finish_reason": response.finish_reason,
+        }
+        path.write_text(json.dumps(record, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _text_of(contents: Contents) -> str:
+    if isinstance(contents, str):
+        return contents
+    return "\n".join(part for part in contents if isinstance(part, str))
+
+
+def _media_of(contents: Contents) -> bytes:
+    if isinstance(contents, str):
+        return b""
+    return b"".join(part.get("data", b"") for part in contents if isinstance(part, dict))
+
+
+def create_ai_provider() -> Optional[AIProvider]:
+    """Build the provider from settings; None when AI is not configured or fails to start."""
+    provider: Optional[AIProvider] = None
+    mode = (settings.ai_record_mode or "").lower()
+    try:
+        if settings.ai_provider == "stub":
+            provider = StubProvider(
+                latency_ms=settings.ai_stub_latency_ms,
+                jitter_ms=settings.ai_stub_jitter_ms,
+                error_rate=settings.ai_stub_error_rate,
+                seed=settings.ai_stub_seed,
+            )
+        elif settings.ai_provider == "gemini" and settings.ai_provider_api_key:
+            provider = GeminiProvider(settings.ai_provider_api_key)
+
+        if mode == "replay":
+            provider = RecordReplayProvider(settings.ai_record_dir, "replay")
+        elif mode == "record" and provider is not None:
+            provider = RecordReplayProvider(settings.ai_record_dir, "record", inner=provider)
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize AI provider '{settings.ai_provider}': {e}")
+        return None
+
+    if provider is None:
+        logger.info("ℹ️ No AI provider configured")
+    else:
+        logger.info(f"🤖 AI provider: {provider.name}")
+    return provider
+
+
+_provider: Optional[AIProvider] = None
+_provider_created = False
+_provider_lock = threading.Lock()
+
+
+def get_ai_provider() -> Optional[AIProvider]:
+    """Get or create the process-wide provider (shared by categorization and parsing)."""
+    global _provider, _provider_created
+    if not _provider_created:
+        with _provider_lock:
+            if not _provider_created:
+                _provider = create_ai_provider()
+                _provider_created = True
+    return _provider
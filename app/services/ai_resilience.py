@@ -0,0 +1,226 @@
+"""
+Resilience layer shared by every AI provider call.
+
+- Per-call deadline: the caller is released when the deadline passes, even if
+  the SDK is still waiting on the network.
+- Circuit breaker: consecutive failures (errors, timeouts or calls slower than
+  the latency threshold) open the circuit; while open, calls fail fast with
+  `CircuitOpenError` so callers can fall back immediately. After the reset
+  timeout a single probe is let through (half-open).
+- Optional hedging: if the first attempt has not answered after
+  `hedge_after` seconds, a second identical attempt is started and the first
+  successful answer wins.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker rejects a call without trying it."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout_seconds: float, slow_call_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._totals = {"successes": 0, "failures": 0, "rejected": 0}
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected (does not consume the half-open probe)."""
+        with self._lock:
+            return self._state == self.OPEN and not self._reset_elapsed()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self._reset_elapsed():
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._totals["rejected"] += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        if latency > self.slow_call_seconds:
+            self.record_failure(f"slow call ({latency:.1f}s)")
+            return
+        with self._lock:
+            self._totals["successes"] += 1
+            self._failures = 0
+            if self._state != self.CLOSED:
+                logger.info(f"✅ Circuit '{self.name}' closed")
+            self._state = self.CLOSED
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, reason: str) -> None:
+        with self._lock:
+            self._totals["failures"] += 1
+            self._failures += 1
+            self._last_error = reason
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"🔌 Circuit '{self.name}' opened after {self._failures} failure(s): {reason}")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            state = self._state
+            if state == self.OPEN and self._reset_elapsed():
+                state = self.HALF_OPEN
+            retry_in = None
+            if state == self.OPEN and self._opened_at is not None:
+                retry_in = round(self._opened_at + self.reset_timeout_seconds - time.monotonic(), 1)
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": retry_in,
+                "last_error": self._last_error,
+                **self._totals,
+            }
+
+    def _reset_elapsed(self) -> bool:
+        return self._opened_at is not None and time.monotonic() - self._opened_at >= self.reset_timeout_seconds
+
+
+_executor = ThreadPoolExecutor(max_workers=settings.ai_max_concurrency, thread_name_prefix="ai-call")
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_ai_breaker() -> CircuitBreaker:
+    """Shared breaker for the configured AI provider (categorization and parsing hit the same API)."""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(
+                    name=settings.ai_provider,
+                    failure_threshold=settings.ai_breaker_failure_threshold,
+                    reset_timeout_seconds=settings.ai_breaker_reset_seconds,
+                    slow_call_seconds=settings.ai_breaker_slow_call_seconds,
+                )
+    return _breaker
+
+
+def _hedge_delay() -> Optional[float]:
+    delay = settings.ai_hedge_after_seconds
+    return delay if delay and delay > 0 else None
+
+
+def call_with_resilience(fn: Callable[[], T], timeout: Optional[float] = None) -> T:
+    """
+    Run a blocking provider call under deadline, breaker and optional hedging.
+
+    Raises:
+        CircuitOpenError: the breaker is open
+        TimeoutError: no attempt answered within the deadline
+    """
+    breaker = get_ai_breaker()
+    if not breaker.allow_request():
+        raise CircuitOpenError(f"AI circuit '{breaker.name}' is open")
+
+    timeout = timeout if timeout is not None else settings.ai_request_timeout_seconds
+    started = time.monotonic()
+    deadline = started + timeout
+    attempts: list[Future] = [_executor.submit(fn)]
+
+    hedge_after = _hedge_delay()
+    if hedge_after is not None and hedge_after < timeout:
+        done, _ = wait(attempts, timeout=hedge_after)
+        if not done:
+            attempts.append(_executor.submit(fn))
+
+    pending = set(attempts)
+    last_error: Optional[BaseException] = None
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is None:
+                breaker.record_success(time.monotonic() - started)
+                return future.result()
+            last_error = error
+
+    if pending:
+        for future in pending:
+            future.cancel()
+        breaker.record_failure(f"timeout after {timeout}s")
+        raise TimeoutError(f"AI call exceeded {timeout}s")
+    breaker.record_failure(str(last_error))
+    raise last_error
+
+
+async def call_with_resilience_async(factory: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+    """Async counterpart of `call_with_resilience`; `factory` creates a fresh awaitable per attempt."""
+    breaker = get_ai_breaker()
+    if not breaker.allow_request():
+        raise CircuitOpenError(f"AI circuit '{breaker.name}' is open")
+
+    timeout = timeout if timeout is not None else settings.ai_request_timeout_seconds
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout
+    attempts = [asyncio.ensure_future(factory())]
+
+    hedge_after = _hedge_delay()
+    if hedge_after is not None and hedge_after < timeout:
+        done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+        if not done:
+            attempts.append(asyncio.ensure_future(factory()))
+
+    pending = set(attempts)
+    last_error: Optional[BaseException] = None
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    breaker.record_success(loop.time() - started)
+                    return task.result()
+                last_error = error
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if pending:
+        breaker.record_failure(f"timeout after {timeout}s")
+        raise asyncio.TimeoutError(f"AI call exceeded {timeout}s")
+    breaker.record_failure(str(last_error))
+    raise last_error
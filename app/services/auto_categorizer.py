@@ -39,6 +39,9 @@ _RULES: List[Tuple[str, List[str]]] = [
     ("Transferencias", ["pix recebido", "transferencia recebida", "deposito"]),
 ]
 
+# Categorias que as regras podem sugerir (criadas sob demanda como auto-geradas)
+RULE_CATEGORIES: List[str] = [c for c, _ in _RULES]
+
 # Peso base por categoria (pode ser ajustado futuramente se quisermos favorecer algumas categorias)
 _CATEGORY_BASE_WEIGHT: Dict[str, float] = {c: 1.0 for c, _ in _RULES}
 
@@ -0,0 +1,67 @@
+"""
+Budget threshold-crossing events.
+
+Expense writes update `budgets.spent` atomically and report every budget
+whose level changed (ok → warning → exceeded, or back). Events are published
+after the commit to the subscribed handlers, so notifications can be pushed
+(webhook, e-mail, websocket...) instead of clients polling `GET /budgets`.
+"""
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BudgetAlertEvent:
+    user_id: int
+    budget_id: int
+    category_id: int
+    year: int
+    month: int
+    previous_status: str
+    status: str
+    spent: Decimal
+    amount: Decimal
+
+    @property
+    def percent(self) -> float:
+        return float(self.spent / self.amount) if self.amount > 0 else 0.0
+
+
+BudgetAlertHandler = Callable[[BudgetAlertEvent], None]
+
+_handlers: list[BudgetAlertHandler] = []
+
+
+def subscribe(handler: BudgetAlertHandler) -> None:
+    if handler not in _handlers:
+        _handlers.append(handler)
+
+
+def unsubscribe(handler: BudgetAlertHandler) -> None:
+    if handler in _handlers:
+        _handlers.remove(handler)
+
+
+def publish(events: Iterable[BudgetAlertEvent]) -> None:
+    """Deliver events to every handler; a failing handler never breaks the write path."""
+    for event in events:
+        for handler in list(_handlers):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"❌ Budget alert handler {getattr(handler, '__name__', handler)} failed: {e}")
+
+
+def _log_event(event: BudgetAlertEvent) -> None:
+    logger.info(
+        f"🔔 Budget {event.budget_id} (user {event.user_id}, {event.month:02d}/{event.year}): "
+        f"{event.previous_status} → {event.status} ({event.percent:.0%} of {event.amount})"
+    )
+
+
+subscribe(_log_event)
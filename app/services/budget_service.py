@@ -1,17 +1,27 @@
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 
-from app.repositories import BudgetRepository, TransactionRepository
-from app.schemas import BudgetCreate, BudgetResponse
-from app.infrastructure.database import User, TransactionType
+from fastapi import HTTPException, status as http_status
+
+from app.repositories import BudgetRepository, TransactionRepository, CategoryRepository
+from app.schemas import BudgetCreate, BudgetBatchUpsert, BudgetResponse
+from app.schemas.budget import CategoryInBudget
+from app.infrastructure.database import User
 
 
 class BudgetService:
-    def __init__(self, budget_repo: BudgetRepository, txn_repo: TransactionRepository):
+    def __init__(
+        self,
+        budget_repo: BudgetRepository,
+        txn_repo: TransactionRepository,
+        category_repo: Optional[CategoryRepository] = None,
+    ):
         self.budget_repo = budget_repo
         self.txn_repo = txn_repo
+        self.category_repo = category_repo or CategoryRepository(budget_repo.db)
 
     def upsert_budget(self, user: User, data: BudgetCreate) -> BudgetResponse:
+        self._check_categories(user, [data.category_id])
         budget = self.budget_repo.upsert(
             user_id=user.id,
             category_id=data.category_id,
@@ -20,44 +30,42 @@ class BudgetService:
             amount=data.amount,
             notify_threshold=data.notify_threshold,
         )
-        return self._to_response_with_status(user, budget)
+        return self._to_response_with_status(budget)
 
-    def list_budgets(self, user: User, year: int, month: int, alerts_only: bool = False) -> List[BudgetResponse]:
-        budgets = self.budget_repo.list_by_user_and_month(user.id, year, month)
-        responses = [self._to_response_with_status(user, b) for b in budgets]
-        if alerts_only:
-            responses = [r for r in responses if r.status in ("warning", "exceeded")]
-        return responses
+    def upsert_budgets_batch(self, user: User, data: BudgetBatchUpsert) -> List[BudgetResponse]:
+        self._check_categories(user, [item.category_id for item in data.items])
+        budgets = self.budget_repo.upsert_many(
+            user.id, data.year, data.month, [item.model_dump() for item in data.items]
+        )
+        return [self._to_response_with_status(b) for b in budgets]
 
-    def _to_response_with_status(self, user: User, budget) -> BudgetResponse:
-        # Sum expenses for that category/month
-        start_year = budget.year
-        start_month = budget.month
-        # Use repository to fetch transactions
-        from datetime import date, timedelta
-        start_date = date(start_year, start_month, 1)
-        if start_month == 12:
-            end_date = date(start_year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = date(start_year, start_month + 1, 1) - timedelta(days=1)
+    def copy_previous_month(self, user: User, year: int, month: int, overwrite: bool = False) -> List[BudgetResponse]:
+        source_year, source_month = (year, month - 1) if month > 1 else (year - 1, 12)
+        self.budget_repo.copy_from_month(user.id, year, month, source_year, source_month, overwrite=overwrite)
+        return self.list_budgets(user, year, month)
 
-        txns = self.txn_repo.get_by_date_range_and_user(start_date, end_date, user.id)
-        spent = Decimal("0.00")
-        for t in txns:
-            if t.type == TransactionType.EXPENSE and t.category_id == budget.category_id:
-                spent += t.amount
+    def _check_categories(self, user: User, category_ids: List[int]) -> None:
+        owned = self.category_repo.owned_ids(user.id, category_ids)
+        missing = sorted(set(category_ids) - owned)
+        if missing:
+            raise HTTPException(
+                status_code=http_status.HTTP_404_NOT_FOUND,
+                detail={"detail": "Categoria não encontrada", "code": "CATEGORY_NOT_FOUND", "meta": {"category_ids": missing}},
+            )
+
+    def list_budgets(self, user: User, year: int, month: int, alerts_only: bool = False) -> List[BudgetResponse]:
+        budgets = self.budget_repo.list_by_user_and_month(user.id, year, month, alerts_only=alerts_only)
+        return [self._to_response_with_status(b) for b in budgets]
 
+    def _to_response_with_status(self, budget) -> BudgetResponse:
+        # `spent`/`alert_level` are kept up to date on every expense write
         amount = Decimal(budget.amount)
+        spent = Decimal(budget.spent)
         remaining = amount - spent
         percent = float(spent / amount) if amount > 0 else 0.0
-        status = "ok"
-        if percent >= 1.0:
-            status = "exceeded"
-        elif percent >= budget.notify_threshold:
-            status = "warning"
+        status = budget.alert_level
         
         # Build category payload (include basic meta expected by frontend)
-        from app.schemas.budget import CategoryInBudget
         category_obj = None
         if hasattr(budget, 'category') and budget.category is not None:
             category = budget.category
@@ -0,0 +1,199 @@
+"""
+Resumable auto-categorization of a user's uncategorized history.
+
+A backfill walks `category_id IS NULL` transactions in id order (keyset
+pagination over `ix_transactions_uncategorized`), categorizes each batch with
+the rule engine (AI only for rule misses) and writes it with one bulk UPDATE.
+The cursor/counters in `categorization_backfills` are updated in the same DB
+transaction as the batch, so after a crash the job resumes exactly where the
+last committed batch ended.
+
+- Throttled: one backfill at a time per process, `categorize_backfill_pause_seconds`
+  between batches, so interactive traffic keeps the database and the AI quota.
+- Crash recovery: a running backfill without a heartbeat for
+  `categorize_backfill_stale_after_seconds` is claimed again by any process.
+  While a batch runs (AI chunks can take minutes) the heartbeat is refreshed
+  every third of that interval, so a live backfill is never reclaimed.
+- Graceful stop: the current batch finishes and the backfill goes back to the queue.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings, SessionLocal
+from app.infrastructure.database import CategorizationBackfill, User
+from app.repositories import CategorizationBackfillRepository, TransactionRepository
+from app.services.transaction_categorizer import TransactionCategorizer
+
+logger = logging.getLogger(__name__)
+
+
+def request_backfill(db: Session, user_id: int, restart: bool = False) -> CategorizationBackfill:
+    """Queue (or resume) the user's backfill and wake the local worker."""
+    backfills = CategorizationBackfillRepository(db)
+    current = backfills.get(user_id)
+    after_id = 0 if restart or current is None else current.last_transaction_id
+    total = TransactionRepository(db).count_uncategorized(user_id, after_id)
+    backfill = backfills.enqueue(user_id, total, restart=restart)
+    get_backfill_worker().notify()
+    return backfill
+
+
+class CategorizationBackfillWorker:
+    """Single asyncio task running queued backfills batch by batch."""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        pause_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.batch_size = batch_size if batch_size is not None else settings.categorize_backfill_batch_size
+        self.pause_seconds = pause_seconds if pause_seconds is not None else settings.categorize_backfill_pause_seconds
+        self.poll_interval = poll_interval if poll_interval is not None else settings.categorize_backfill_poll_seconds
+        self.session_factory = session_factory
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._task is not None or not settings.categorize_backfill_enabled:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="categorization-backfill")
+        logger.info("🧵 Categorization backfill worker started")
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Finish the batch in progress; the backfill is requeued and resumes elsewhere/later."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("🛑 Categorization backfill worker stopped")
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                user_id = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"❌ Failed to claim categorization backfill: {e}")
+                user_id = None
+            if user_id is None:
+                await self._sleep(self.poll_interval)
+                continue
+
+            logger.info(f"🏷️ Categorization backfill started for user {user_id}")
+            while not self._stopping:
+                keep_alive = asyncio.create_task(self._keep_alive(user_id))
+                try:
+                    done = await asyncio.to_thread(self._run_batch, user_id)
+                except Exception as e:
+                    logger.error(f"❌ Categorization backfill for user {user_id} failed: {e}", exc_info=True)
+                    await asyncio.to_thread(self._finish, user_id, "failed", str(e)[:255])
+                    break
+                finally:
+                    keep_alive.cancel()
+                if done:
+                    break
+                # Throttle: leave room for interactive requests between batches
+                await asyncio.sleep(self.pause_seconds)
+            else:
+                await asyncio.to_thread(self._requeue, user_id)
+
+    async def _keep_alive(self, user_id: int) -> None:
+        interval = settings.categorize_backfill_stale_after_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self._heartbeat, user_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Categorization backfill heartbeat failed for user {user_id}: {e}")
+
+    def _heartbeat(self, user_id: int) -> None:
+        db = self.session_factory()
+        try:
+            CategorizationBackfillRepository(db).heartbeat(user_id)
+        finally:
+            db.close()
+
+    def _claim(self) -> Optional[int]:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.categorize_backfill_stale_after_seconds)
+        db = self.session_factory()
+        try:
+            backfill = CategorizationBackfillRepository(db).claim_next(stale_before)
+            return backfill.user_id if backfill is not None else None
+        finally:
+            db.close()
+
+    def _run_batch(self, user_id: int) -> bool:
+        """Categorize the next batch and checkpoint it. Returns True when the backfill is over."""
+        db = self.session_factory()
+        try:
+            backfills = CategorizationBackfillRepository(db)
+            backfill = backfills.get(user_id)
+            if backfill is None or backfill.status != "running":
+                return True
+            user = db.get(User, user_id)
+            if user is None or not user.auto_categorize_enabled:
+                backfills.finish(user_id, "cancelled")
+                return True
+
+            rows = TransactionRepository(db).uncategorized_after(user_id, backfill.last_transaction_id, self.batch_size)
+            if not rows:
+                backfills.finish(user_id, "completed")
+                logger.info(f"✅ Categorization backfill for user {user_id} completed ({backfill.categorized}/{backfill.processed} categorized)")
+                return True
+
+            last_id = rows[-1].id
+            TransactionCategorizer(db).categorize(
+                user,
+                rows,
+                before_commit=lambda categorized: backfills.checkpoint(user_id, last_id, len(rows), categorized),
+            )
+            return False
+        finally:
+            db.close()
+
+    def _finish(self, user_id: int, status: str, error_detail: Optional[str] = None) -> None:
+        db = self.session_factory()
+        try:
+            CategorizationBackfillRepository(db).finish(user_id, status, error_detail)
+        finally:
+            db.close()
+
+    def _requeue(self, user_id: int) -> None:
+        db = self.session_factory()
+        try:
+            CategorizationBackfillRepository(db).requeue(user_id)
+        finally:
+            db.close()
+
+
+_worker: Optional[CategorizationBackfillWorker] = None
+
+
+def get_backfill_worker() -> CategorizationBackfillWorker:
+    """Get or create the process-wide backfill worker."""
+    global _worker
+    if _worker is None:
+        _worker = CategorizationBackfillWorker()
+    return _worker
@@ -1,14 +1,24 @@
+from datetime import date
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Optional
 
-from app.repositories import CategoryRepository
-from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse
-from app.infrastructure.database import User
+from app.repositories import CategoryRepository, TransactionRepository, TransactionArchiveRepository
+from app.schemas import (
+    CategoryCreate,
+    CategoryUpdate,
+    CategoryResponse,
+    CategoryWithStatsResponse,
+    CategoryMergeResponse,
+)
+from app.infrastructure.database import Transaction, User
+from app.services import category_stats
+from app.services.transaction_service import TransactionService
 
 
 class CategoryService:
-    def __init__(self, repo: CategoryRepository):
+    def __init__(self, repo: CategoryRepository, transaction_service: Optional[TransactionService] = None):
         self.repo = repo
+        self.transaction_service = transaction_service or TransactionService(TransactionRepository(repo.db))
 
     def list_categories(self, user: User, origin: str | None = None) -> List[CategoryResponse]:
         if origin not in (None, 'auto', 'manual'):
@@ -16,11 +26,35 @@ class CategoryService:
         cats = self.repo.list_by_user(user.id, origin=origin)
         return [CategoryResponse.model_validate(c) for c in cats]
 
+    def list_categories_with_stats(self, user: User, origin: str | None = None) -> List[CategoryWithStatsResponse]:
+        if origin not in (None, 'auto', 'manual'):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"detail": "Filtro de origem inválido", "code": "INVALID_FILTER"})
+        today = date.today()
+        stats = category_stats.get(user.id, today)
+        if stats is None:
+            rows = self.repo.list_with_stats(user.id, today.replace(day=1), today)
+            stats = [
+                CategoryWithStatsResponse(
+                    id=c.id,
+                    name=c.name,
+                    is_auto_generated=c.is_auto_generated,
+                    transaction_count=count,
+                    month_spent=spent,
+                    last_used=last_used,
+                )
+                for c, count, spent, last_used in rows
+            ]
+            category_stats.store(user.id, today, stats)
+        if origin is not None:
+            stats = [c for c in stats if bool(c.is_auto_generated) == (origin == 'auto')]
+        return stats
+
     def create_category(self, user: User, data: CategoryCreate) -> CategoryResponse:
         existing = self.repo.get_by_name(user.id, data.name)
         if existing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Categoria já existe")
         c = self.repo.create(user.id, data.name)
+        category_stats.invalidate(user.id)
         return CategoryResponse.model_validate(c)
 
     def rename_category(self, user: User, category_id: int, data: CategoryUpdate) -> CategoryResponse:
@@ -32,13 +66,48 @@ class CategoryService:
         if existing and existing.id != category_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Já existe categoria com este nome")
         c = self.repo.rename(c, data.name)
+        category_stats.invalidate(user.id)
         return CategoryResponse.model_validate(c)
 
+    def _release_merged(self, user: User, category_id: int, target_id: int) -> None:
+        """Archived history follows the merge too; then the source category and its budgets go."""
+        TransactionArchiveRepository(self.repo.db).reassign_category(user.id, category_id, target_id)
+        self.repo.delete_merged(category_id)
+
     def delete_category(self, user: User, category_id: int) -> None:
+        if self.repo.delete_if_unused(user.id, category_id):
+            category_stats.invalidate(user.id)
+            return
+        # Nothing deleted: tell "not found" from "in use" (failure path only)
         c = self.repo.get_by_id(category_id)
         if not c or c.user_id != user.id:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada")
-        try:
-            self.repo.delete(c)
-        except ValueError as e:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Categoria em uso por transações; remova ou recategorize-as antes de excluir.",
+        )
+
+    def merge_category(self, user: User, category_id: int, target_id: int) -> CategoryMergeResponse:
+        """Move all transactions of `category_id` to `target_id` and delete the source (one DB transaction)."""
+        if category_id == target_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"detail": "Categoria de origem e destino são a mesma", "code": "INVALID_MERGE"},
+            )
+        source = self.repo.get_by_id(category_id)
+        target = self.repo.get_by_id(target_id)
+        if not source or source.user_id != user.id or not target or target.user_id != user.id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada")
+
+        moved = self.transaction_service.reassign_category(
+            user,
+            [Transaction.user_id == user.id, Transaction.category_id == category_id],
+            target_id,
+            before_commit=lambda: self._release_merged(user, category_id, target_id),
+            released_category_id=category_id,
+        )
+        return CategoryMergeResponse(
+            category=CategoryResponse.model_validate(target),
+            merged_category_id=category_id,
+            transactions_moved=moved,
+        )
@@ -0,0 +1,33 @@
+"""
+Per-user cache of category usage statistics (`GET /categories/?with_stats=true`).
+
+Entries hold the full list for one user and day, so every `origin` filter is
+served from the same entry. Category and transaction writes call
+`invalidate(user_id)`; the short TTL bounds staleness across processes.
+"""
+
+from datetime import date
+from typing import Optional
+
+from app.config import settings
+from app.infrastructure.cache import TTLCache, MISSING
+
+_cache = TTLCache(
+    maxsize=settings.category_stats_cache_size,
+    ttl_seconds=settings.category_stats_cache_ttl_seconds,
+)
+
+
+def get(user_id: int, today: date) -> Optional[list]:
+    entry = _cache.get(user_id)
+    if entry is MISSING or entry[0] != today:
+        return None
+    return entry[1]
+
+
+def store(user_id: int, today: date, stats: list) -> None:
+    _cache.set(user_id, (today, stats))
+
+
+def invalidate(user_id: int) -> None:
+    _cache.delete(user_id)
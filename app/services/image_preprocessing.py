@@ -0,0 +1,136 @@
+"""
+Receipt image preprocessing before AI upload.
+
+Phone photos (4–12 MB) are decoded, EXIF-stripped (after applying the
+orientation tag), converted to grayscale, cropped to the receipt area and
+downsized to `image_max_dimension`, then re-encoded as compact JPEG/WebP.
+
+Decoding is CPU-bound and holds the GIL, so the async entry point runs it in
+a process pool. Any failure returns the original bytes untouched: the AI can
+still read the raw upload.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pixels lighter than this (0-255) are treated as paper/background when cropping
+_BACKGROUND_LEVEL = 200
+_CROP_MARGIN = 16
+_OUTPUT_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def preprocess_receipt_image(
+    data: bytes,
+    max_dimension: int,
+    output_format: str = "JPEG",
+    quality: int = 80,
+) -> tuple[bytes, str]:
+    """
+    Shrink a receipt photo for upload. Runs in a worker process.
+
+    Returns:
+        (image bytes, MIME type); raises if the image cannot be decoded
+    """
+    from PIL import Image, ImageOps
+
+    img = Image.open(BytesIO(data))
+    # JPEG can decode directly at a reduced scale, which is much faster for huge photos
+    img.draft("L", (max_dimension, max_dimension))
+    img = ImageOps.exif_transpose(img)
+    img = img.convert("L")
+
+    # Crop the empty border around the receipt: bbox of the "ink" (dark) pixels
+    ink = img.point(lambda p: 255 if p < _BACKGROUND_LEVEL else 0)
+    bbox = ink.getbbox()
+    if bbox:
+        left, top, right, bottom = bbox
+        img = img.crop((
+            max(0, left - _CROP_MARGIN),
+            max(0, top - _CROP_MARGIN),
+            min(img.width, right + _CROP_MARGIN),
+            min(img.height, bottom + _CROP_MARGIN),
+        ))
+
+    img.thumbnail((max_dimension, max_dimension))
+
+    fmt = output_format.upper()
+    out = BytesIO()
+    # A fresh save without exif=... drops all metadata
+    img.save(out, format=fmt, quality=quality, optimize=True)
+    return out.getvalue(), _OUTPUT_MIME.get(fmt, "image/jpeg")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.image_preprocess_workers)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _log_result(original: bytes, processed: bytes, started: float) -> None:
+    saved = len(original) - len(processed)
+    logger.info(
+        f"🗜️ Receipt image preprocessed: {len(original)} → {len(processed)} bytes "
+        f"({saved * 100 // max(1, len(original))}% saved) in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+
+def _pick_smaller(original: bytes, content_type: str, processed: tuple[bytes, str]) -> tuple[bytes, str]:
+    if len(processed[0]) >= len(original):
+        return original, content_type
+    return processed
+
+
+def preprocess_image(data: bytes, content_type: str) -> tuple[bytes, str]:
+    """Blocking preprocessing in the calling thread (for worker/background callers)."""
+    if not settings.image_preprocess_enabled:
+        return data, content_type
+    started = time.perf_counter()
+    try:
+        processed = preprocess_receipt_image(
+            data, settings.image_max_dimension, settings.image_output_format, settings.image_quality
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Image preprocessing skipped: {e}")
+        return data, content_type
+    _log_result(data, processed[0], started)
+    return _pick_smaller(data, content_type, processed)
+
+
+async def preprocess_image_async(data: bytes, content_type: str) -> tuple[bytes, str]:
+    """Preprocess in the process pool so decoding never blocks the event loop."""
+    if not settings.image_preprocess_enabled:
+        return data, content_type
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    try:
+        processed = await loop.run_in_executor(
+            _get_pool(),
+            preprocess_receipt_image,
+            data,
+            settings.image_max_dimension,
+            settings.image_output_format,
+            settings.image_quality,
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Image preprocessing skipped: {e}")
+        return data, content_type
+    _log_result(data, processed[0], started)
+    return _pick_smaller(data, content_type, processed)
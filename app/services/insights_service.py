@@ -48,7 +48,7 @@ class InsightsService:
         end_date = end_date - timedelta(days=1)
         
         transactions = self.transaction_repository.get_by_date_range_and_user(
-            start_date, end_date, user.id
+            start_date, end_date, user.id, user.archived_before
         )
         
         if not transactions:
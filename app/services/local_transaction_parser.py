@@ -0,0 +1,236 @@
+"""
+Deterministic local parser for simple Portuguese transaction commands.
+
+Handles the common, trivially structured commands ("gastei 50 reais no uber
+hoje", "recebi salario de 3500", "netflix 45,90 ontem") without any remote call:
+
+- amounts: "R$ 1.234,56", "50,90", "45.90", "3500", "2 mil", "1,5 mil", "mil reais"
+- type: income/expense verbs and nouns ("recebi", "salario", "gastei", "paguei"...)
+- dates: "hoje", "ontem", "anteontem", weekdays, "dia 15", "15/11", "15/11/2025"
+
+Returns a SmartTransactionResponse whose `confidence` says how complete and
+unambiguous the extraction was; callers decide whether to escalate to the AI.
+"""
+
+import calendar
+import re
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+from app.schemas.smart_transaction import SmartTransactionResponse
+from app.services.auto_categorizer import _normalize, suggest_category
+
+# Verbos somem da descrição; substantivos ("salario", "assinatura") permanecem
+_INCOME_VERBS = {"recebi", "recebido", "ganhei", "entrou", "vendi", "depositaram", "caiu"}
+_INCOME_NOUNS = {"salario", "receita", "reembolso", "venda", "rendimento", "rendimentos", "deposito", "freela"}
+_EXPENSE_VERBS = {"gastei", "gasto", "paguei", "pago", "comprei", "transferi", "enviei"}
+_EXPENSE_NOUNS = {"gastos", "pagamento", "compra", "despesa", "assinatura", "mensalidade", "conta", "fatura", "boleto"}
+_INCOME_WORDS = _INCOME_VERBS | _INCOME_NOUNS
+_EXPENSE_WORDS = _EXPENSE_VERBS | _EXPENSE_NOUNS
+# Categorias sugeridas que implicam receita (as demais implicam despesa)
+_INCOME_CATEGORIES = {"Salario", "Transferencias"}
+
+_WEEKDAYS = {
+    "segunda": 0, "terca": 1, "quarta": 2, "quinta": 3, "sexta": 4, "sabado": 5, "domingo": 6,
+}
+_RELATIVE_DAYS = {"hoje": 0, "hj": 0, "ontem": 1, "anteontem": 2}
+
+# Palavras removidas da descrição (já normalizadas)
+_FILLER_WORDS = {
+    "no", "na", "nos", "nas", "de", "do", "da", "dos", "das", "em", "com", "pra", "para", "pro", "o", "a",
+    "os", "as", "um", "uma", "uns", "umas", "e", "reais", "real", "r$", "rs", "conto", "contos", "pila",
+    "mil", "feira", "dia", "passada", "passado", "ultima", "ultimo", "eu", "me", "meu", "minha", "ao", "por",
+    "valor", "foi",
+}
+
+_NUMBER = r"\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d{1,2})?"
+_AMOUNT_RE = re.compile(
+    rf"(?P<prefix>r\$\s*)?(?P<number>{_NUMBER})(?P<mil>\s*mil\b)?(?P<suffix>\s*(?:reais|real|conto|contos|pila)\b)?"
+)
+_BARE_MIL_RE = re.compile(r"(?<![\d,.])\bmil\b(?P<suffix>\s*(?:reais|real)\b)?")
+_DATE_SLASH_RE = re.compile(r"\b(?P<day>\d{1,2})/(?P<month>\d{1,2})(?:/(?P<year>\d{2,4}))?\b")
+_DAY_OF_MONTH_RE = re.compile(r"\bdia\s+(?P<day>\d{1,2})\b")
+# Horários ("as 10:30", "10h30") não são valores nem entram na descrição
+_TIME_RE = re.compile(r"\b\d{1,2}(?::|h)\d{2}\b")
+
+_SCORE_AMOUNT = 0.5
+_SCORE_AMOUNT_AMBIGUOUS = 0.25
+_SCORE_TYPE_EXPLICIT = 0.25
+_SCORE_TYPE_IMPLIED = 0.15
+_SCORE_DESCRIPTION = 0.15
+_SCORE_DATE = 0.1
+# Sem descrição real o comando nunca é resolvido localmente (vai para a AI)
+_MAX_WITHOUT_DESCRIPTION = 0.5
+
+
+def _to_decimal(number: str) -> Optional[Decimal]:
+    if "." in number and "," in number:
+        number = number.replace(".", "").replace(",", ".")
+    elif "," in number:
+        number = number.replace(",", ".")
+    elif re.fullmatch(r"\d{1,3}(?:\.\d{3})+", number):
+        number = number.replace(".", "")
+    try:
+        return Decimal(number)
+    except InvalidOperation:
+        return None
+
+
+def _extract_amount(text: str) -> tuple[Optional[Decimal], bool, list[tuple[int, int]]]:
+    """Return (amount, ambiguous, spans consumed) from normalized text."""
+    date_spans = [m.span() for pattern in (_DATE_SLASH_RE, _DAY_OF_MONTH_RE, _TIME_RE) for m in pattern.finditer(text)]
+
+    candidates = []
+    for m in _AMOUNT_RE.finditer(text):
+        if any(start <= m.start() < end for start, end in date_spans):
+            continue
+        value = _to_decimal(m.group("number"))
+        if value is None:
+            continue
+        if m.group("mil"):
+            value *= 1000
+        marked = bool(m.group("prefix") or m.group("suffix") or m.group("mil"))
+        candidates.append((value, marked, m.span()))
+    for m in _BARE_MIL_RE.finditer(text):
+        # O "mil" de "2 mil" já faz parte do valor acima
+        if any(start < m.end() and m.start() < end for _, _, (start, end) in candidates):
+            continue
+        candidates.append((Decimal(1000), bool(m.group("suffix")), m.span()))
+
+    if not candidates:
+        return None, False, []
+    marked = [c for c in candidates if c[1]]
+    if len(marked) == 1:
+        chosen, ambiguous = marked[0], False
+    elif len(candidates) == 1:
+        chosen, ambiguous = candidates[0], False
+    else:
+        chosen, ambiguous = (marked or candidates)[0], True
+    return chosen[0], ambiguous, [c[2] for c in candidates]
+
+
+def _strip_dates(text: str) -> str:
+    """Remove date and time fragments ("15/11", "dia 5", "10:30") from normalized text."""
+    for pattern in (_DATE_SLASH_RE, _DAY_OF_MONTH_RE, _TIME_RE):
+        text = pattern.sub(" ", text)
+    return text
+
+
+def _extract_date(text: str, tokens: list[str], today: date) -> Optional[date]:
+    """Return the date mentioned in normalized text, or None when no date was mentioned."""
+    for token in tokens:
+        if token in _RELATIVE_DAYS:
+            return today - timedelta(days=_RELATIVE_DAYS[token])
+
+    m = _DATE_SLASH_RE.search(text)
+    if m:
+        year = int(m.group("year")) if m.group("year") else today.year
+        if year < 100:
+            year += 2000
+        try:
+            parsed = date(year, int(m.group("month")), int(m.group("day")))
+            if not m.group("year") and parsed > today:
+                parsed = parsed.replace(year=year - 1)
+            return parsed
+        except ValueError:
+            pass
+
+    m = _DAY_OF_MONTH_RE.search(text)
+    if m and 1 <= int(m.group("day")) <= 31:
+        # Último mês (até hoje) que tem esse dia: "dia 31" em 19/10 → 31/08
+        day = int(m.group("day"))
+        year, month = today.year, today.month
+        while day > calendar.monthrange(year, month)[1] or date(year, month, day) > today:
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        return date(year, month, day)
+
+    for token in tokens:
+        if token in _WEEKDAYS:
+            delta = (today.weekday() - _WEEKDAYS[token]) % 7
+            return today - timedelta(days=delta)
+
+    return None
+
+
+def parse_command_locally(command: str, today: Optional[date] = None) -> Optional[SmartTransactionResponse]:
+    """
+    Parse a command with local rules only.
+
+    Returns:
+        SmartTransactionResponse with a confidence score, or None when no amount is found
+    """
+    today = today or date.today()
+    text = " ".join(_normalize(command).split())
+    if not text:
+        return None
+
+    amount, ambiguous, amount_spans = _extract_amount(text)
+    if amount is None or amount <= 0:
+        return None
+
+    tokens = re.findall(r"[a-z$]+", text)
+    confidence = _SCORE_AMOUNT_AMBIGUOUS if ambiguous else _SCORE_AMOUNT
+
+    is_income = any(t in _INCOME_WORDS for t in tokens)
+    is_expense = any(t in _EXPENSE_WORDS for t in tokens)
+    # "dia" (rede de supermercados) e afins não podem vir de "dia 5"
+    category = suggest_category(_strip_dates(text))
+    if is_income != is_expense:
+        transaction_type = "income" if is_income else "expense"
+        confidence += _SCORE_TYPE_EXPLICIT
+    elif category:
+        transaction_type = "income" if category in _INCOME_CATEGORIES else "expense"
+        confidence += _SCORE_TYPE_IMPLIED
+    else:
+        transaction_type = "expense"
+
+    transaction_date = _extract_date(text, tokens, today)
+    if transaction_date is not None:
+        confidence += _SCORE_DATE
+    else:
+        transaction_date = today
+
+    description = _build_description(command, text, amount_spans)
+    if description:
+        confidence += _SCORE_DESCRIPTION
+    else:
+        description = category or "Transação"
+        confidence = min(confidence, _MAX_WITHOUT_DESCRIPTION)
+
+    return SmartTransactionResponse(
+        description=description,
+        amount=amount.quantize(Decimal("0.01")),
+        type=transaction_type,
+        transaction_date=transaction_date,
+        confidence=round(min(confidence, 1.0), 2),
+    )
+
+
+def _build_description(command: str, text: str, amount_spans: list[tuple[int, int]]) -> str:
+    """Keep the meaningful words of the original command (accents preserved)."""
+    removed = set(_RELATIVE_DAYS) | set(_WEEKDAYS) | _INCOME_VERBS | _EXPENSE_VERBS | _FILLER_WORDS
+    # Remove amount and date fragments first, then filter word by word
+    merged: list[list[int]] = []
+    for start, end in sorted(amount_spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    for start, end in reversed(merged):
+        text = text[:start] + " " + text[end:]
+    text = _strip_dates(text).replace("-feira", " feira")
+    kept_normalized = [
+        w for w in text.split()
+        if w not in removed and not re.fullmatch(r"[\d.,$r]+", w) and re.search(r"\w", w)
+    ]
+
+    originals = {}
+    for word in command.replace("-feira", " feira").replace("-Feira", " Feira").split():
+        originals.setdefault(_normalize(word).strip(".,;:!?"), word.strip(".,;:!?"))
+    words = [originals.get(w.strip(".,;:!?"), w) for w in kept_normalized]
+    words = [w for w in words if w]
+    if not words:
+        return ""
+    description = " ".join(words)
+    return (description[0].upper() + description[1:])[:50]
@@ -0,0 +1,236 @@
+"""
+Worker pool for asynchronous image/audio smart-parse jobs.
+
+Jobs live in the `parse_jobs` table, so any process can enqueue and any
+process can work: each worker claims the oldest runnable row with
+`FOR UPDATE SKIP LOCKED`, runs the async parser and stores the result.
+
+- In-process wakeups: `notify()` wakes idle workers as soon as a job is
+  enqueued by the same process; other processes are picked up on the next
+  poll (`parse_jobs_poll_seconds`).
+- Long-polling: `wait_for(job_id)` returns as soon as a local worker finishes
+  the job, letting `GET /jobs/{id}?wait=N` answer without busy polling.
+- Graceful drain: `stop()` stops claiming, waits up to `parse_jobs_drain_seconds`
+  for in-flight jobs and puts the unfinished ones back in the queue.
+- Crash recovery: jobs left `running` longer than `parse_jobs_stale_after_seconds`
+  are claimed again, up to `parse_jobs_max_attempts`.
+
+Run standalone (keeps web workers free of AI latency):
+    python -m app.parse_worker
+"""
+
+import asyncio
+import logging
+import signal
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings, SessionLocal
+from app.repositories import ParseJobRepository
+from app.services.ai_resilience import CircuitOpenError
+from app.services.image_preprocessing import shutdown_pool
+from app.services.smart_transaction_parser import get_smart_parser
+
+logger = logging.getLogger(__name__)
+
+_PARSE_FAILED = {
+    "image": "Não foi possível identificar dados da imagem. Tente uma foto mais clara.",
+    "audio": "Não foi possível entender o áudio. Tente gravar novamente com clareza.",
+}
+_AI_TIMEOUT = "Serviço de AI demorou demais para responder. Tente novamente."
+_AI_UNAVAILABLE = "Serviço de AI não está disponível no momento."
+_INTERNAL_ERROR = "Erro interno ao processar o arquivo."
+
+
+@dataclass
+class ClaimedJob:
+    id: str
+    kind: str
+    content_type: str
+    payload: bytes
+
+
+class ParseJobWorker:
+    """Bounded pool of asyncio workers draining the `parse_jobs` queue."""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.concurrency = concurrency if concurrency is not None else settings.parse_jobs_workers
+        self.poll_interval = poll_interval if poll_interval is not None else settings.parse_jobs_poll_seconds
+        self.session_factory = session_factory
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: list[asyncio.Task] = []
+        self._current: dict[int, str] = {}
+        self._waiters: dict[str, list[asyncio.Event]] = {}
+        self._stopping = False
+        self._last_sweep = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not self._stopping
+
+    def start(self) -> None:
+        if self._tasks or self.concurrency <= 0:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(i), name=f"parse-job-worker-{i}") for i in range(self.concurrency)]
+        logger.info(f"🧵 Parse job worker started ({self.concurrency} concurrent jobs)")
+
+    def notify(self) -> None:
+        """Wake idle workers (a job was just enqueued)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def wait_for(self, job_id: str, timeout: float) -> None:
+        """Return when a local worker finishes `job_id` or after `timeout` seconds."""
+        event = asyncio.Event()
+        self._waiters.setdefault(job_id, []).append(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(job_id)
+            if waiters is not None:
+                if event in waiters:
+                    waiters.remove(event)
+                if not waiters:
+                    self._waiters.pop(job_id, None)
+
+    async def stop(self, drain_timeout: Optional[float] = None) -> None:
+        """Stop claiming jobs, let in-flight ones finish and requeue what did not."""
+        if not self._tasks:
+            return
+        drain_timeout = drain_timeout if drain_timeout is not None else settings.parse_jobs_drain_seconds
+        self._stopping = True
+        self._wakeup.set()
+        logger.info(f"⏳ Draining parse job worker ({len(self._current)} job(s) in flight)")
+
+        _, pending = await asyncio.wait(self._tasks, timeout=drain_timeout)
+        interrupted = [self._current[i] for i, task in enumerate(self._tasks) if task in pending and i in self._current]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        self._current.clear()
+
+        if interrupted:
+            requeued = await asyncio.to_thread(self._requeue, interrupted)
+            logger.warning(f"↩️ {requeued} parse job(s) returned to the queue after drain timeout")
+        logger.info("🛑 Parse job worker stopped")
+
+    async def _run(self, index: int) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"❌ Failed to claim parse job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._current[index] = job.id
+            try:
+                await self._process(job)
+            finally:
+                self._current.pop(index, None)
+
+    async def _process(self, job: ClaimedJob) -> None:
+        started = time.perf_counter()
+        parser = get_smart_parser()
+        outcome: dict = {"status": "failed"}
+        try:
+            if job.kind == "image":
+                result = await parser.parse_image_async(job.payload, job.content_type)
+            else:
+                result = await parser.parse_audio_async(job.payload, job.content_type)
+            if result is None:
+                outcome.update(error_code="PARSE_FAILED", error_detail=_PARSE_FAILED[job.kind])
+            else:
+                outcome = {"status": "succeeded", "result": result.model_dump(mode="json")}
+        except asyncio.TimeoutError:
+            outcome.update(error_code="AI_TIMEOUT", error_detail=_AI_TIMEOUT)
+        except CircuitOpenError:
+            outcome.update(error_code="AI_SERVICE_UNAVAILABLE", error_detail=_AI_UNAVAILABLE)
+        except Exception as e:
+            logger.error(f"❌ Parse job {job.id} crashed: {e}", exc_info=True)
+            outcome.update(error_code="INTERNAL_ERROR", error_detail=_INTERNAL_ERROR)
+
+        await asyncio.to_thread(self._finish, job.id, outcome)
+        logger.info(
+            f"📬 Parse job {job.id} ({job.kind}) {outcome['status']} in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        for event in self._waiters.pop(job.id, []):
+            event.set()
+
+    def _claim(self) -> Optional[ClaimedJob]:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.parse_jobs_stale_after_seconds)
+        db = self.session_factory()
+        try:
+            repo = ParseJobRepository(db)
+            # Abandoned jobs are rare: sweep at most once per poll interval, not per claim
+            now = time.monotonic()
+            if now - self._last_sweep >= self.poll_interval:
+                self._last_sweep = now
+                repo.fail_exhausted(settings.parse_jobs_max_attempts, stale_before)
+            job = repo.claim_next(settings.parse_jobs_max_attempts, stale_before)
+            if job is None:
+                return None
+            return ClaimedJob(id=job.id, kind=job.kind, content_type=job.content_type, payload=job.payload or b"")
+        finally:
+            db.close()
+
+    def _finish(self, job_id: str, outcome: dict) -> None:
+        db = self.session_factory()
+        try:
+            ParseJobRepository(db).finish(job_id, **outcome)
+        finally:
+            db.close()
+
+    def _requeue(self, job_ids: list[str]) -> int:
+        db = self.session_factory()
+        try:
+            return ParseJobRepository(db).requeue(job_ids)
+        finally:
+            db.close()
+
+
+_worker: Optional[ParseJobWorker] = None
+
+
+def get_parse_job_worker() -> ParseJobWorker:
+    """Get or create the process-wide worker pool."""
+    global _worker
+    if _worker is None:
+        _worker = ParseJobWorker()
+    return _worker
+
+
+async def serve() -> None:
+    """Run the pool until SIGINT/SIGTERM, then drain."""
+    worker = get_parse_job_worker()
+    if worker.concurrency <= 0:
+        worker.concurrency = 1
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    worker.start()
+    await stop.wait()
+    await worker.stop()
+    shutdown_pool()
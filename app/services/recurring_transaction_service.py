@@ -0,0 +1,110 @@
+import heapq
+from datetime import date
+from fastapi import HTTPException, status
+from typing import Iterator, List
+
+from app.domain.recurrence import occurrences
+from app.repositories import RecurringTransactionRepository, TransactionRepository
+from app.schemas import (
+    RecurringTransactionCreate,
+    RecurringTransactionUpdate,
+    RecurringOccurrence,
+)
+from app.schemas.recurring_transaction import check_recurrence
+from app.infrastructure.database import RecurringTransaction, User
+
+
+def _not_found(rule_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={"detail": f"Regra recorrente com id {rule_id} não encontrada", "code": "RECURRING_NOT_FOUND"},
+    )
+
+
+class RecurringTransactionService:
+    def __init__(self, repo: RecurringTransactionRepository):
+        self.repo = repo
+
+    def list_rules(self, user: User) -> List[RecurringTransaction]:
+        return self.repo.list_by_user(user.id)
+
+    def get_rule(self, user: User, rule_id: int) -> RecurringTransaction:
+        rule = self.repo.get_for_user(user.id, rule_id)
+        if rule is None:
+            raise _not_found(rule_id)
+        return rule
+
+    def create_rule(self, user: User, data: RecurringTransactionCreate) -> RecurringTransaction:
+        self._check_category(user, data.category_id)
+        return self.repo.create(RecurringTransaction(user_id=user.id, **data.model_dump()))
+
+    def update_rule(self, user: User, rule_id: int, data: RecurringTransactionUpdate) -> RecurringTransaction:
+        rule = self.get_rule(user, rule_id)
+        updates = data.model_dump(exclude_unset=True)
+        for required in ("description", "amount", "type", "frequency", "interval", "start_date"):
+            if required in updates and updates[required] is None:
+                raise self._invalid(f"{required} não pode ser null")
+        self._check_category(user, updates.get("category_id"))
+        if "frequency" in updates:
+            # Campos específicos da frequência anterior deixam de valer
+            updates.setdefault("weekday", None)
+            updates.setdefault("day_of_month", None)
+        merged = {
+            field: updates.get(field, getattr(rule, field))
+            for field in ("frequency", "start_date", "end_date", "weekday", "day_of_month")
+        }
+        try:
+            check_recurrence(**merged)
+        except ValueError as e:
+            raise self._invalid(str(e))
+        return self.repo.update(rule, updates)
+
+    def delete_rule(self, user: User, rule_id: int) -> None:
+        self.repo.delete(self.get_rule(user, rule_id))
+
+    def occurrences(self, user: User, start_date: date, end_date: date) -> Iterator[RecurringOccurrence]:
+        """
+        Projected occurrences of all the user's rules in [start_date, end_date], in date order.
+
+        One query for the rules active in the window; each rule's dates come from a
+        lazy generator and `heapq.merge` interleaves them, so nothing is materialized
+        beyond what the caller consumes.
+        """
+        rules = self.repo.active_between(user.id, start_date, end_date)
+        streams = [self._rule_occurrences(rule, start_date, end_date) for rule in rules]
+        return heapq.merge(*streams, key=lambda occurrence: occurrence.date)
+
+    @staticmethod
+    def _rule_occurrences(rule: RecurringTransaction, start_date: date, end_date: date) -> Iterator[RecurringOccurrence]:
+        for day in occurrences(
+            rule.frequency,
+            rule.interval,
+            rule.start_date,
+            start_date,
+            end_date,
+            end_date=rule.end_date,
+            weekday=rule.weekday,
+            day_of_month=rule.day_of_month,
+        ):
+            yield RecurringOccurrence(
+                recurring_id=rule.id,
+                date=day,
+                description=rule.description,
+                amount=rule.amount,
+                type=rule.type,
+                category_id=rule.category_id,
+            )
+
+    def _check_category(self, user: User, category_id) -> None:
+        if category_id is not None and not TransactionRepository(self.repo.db).category_belongs_to_user(category_id, user.id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"detail": f"Categoria com id {category_id} não encontrada", "code": "CATEGORY_NOT_FOUND"},
+            )
+
+    @staticmethod
+    def _invalid(message: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"detail": message, "code": "INVALID_RECURRENCE"},
+        )
@@ -1,21 +1,32 @@
 """
-Smart Transaction Parser Service using Google Gemini AI.
+Smart Transaction Parser Service using the configured AI provider (Gemini by default).
 
 Parses natural language commands into structured transaction data.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
 import re
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import date, datetime
 from decimal import Decimal
-import google.generativeai as genai
 
 from app.config import settings
+from app.infrastructure.cache import TTLCache, MISSING
 from app.schemas.smart_transaction import SmartTransactionResponse
+from app.services.auto_categorizer import _normalize
+from app.services.local_transaction_parser import parse_command_locally
+from app.services.image_preprocessing import preprocess_image, preprocess_image_async
+from app.services.ai_resilience import CircuitOpenError, call_with_resilience, call_with_resilience_async
+from app.services.ai_provider import AIResponse, get_ai_provider
 
 logger = logging.getLogger(__name__)
 
+_MEDIA_ICONS = {"image": "📸", "audio": "🎤"}
+_GENERATION_PARAMS = {"temperature": 0.1, "max_output_tokens": 200}
+
 
 class SmartTransactionParser:
     """Service to parse natural language transaction commands using AI."""
@@ -23,28 +34,30 @@ class SmartTransactionParser:
     def __init__(self):
         """Initialize AI parser with configured provider."""
         self.provider = settings.ai_provider
-        self.api_key = settings.ai_provider_api_key
-        self.enabled = bool(self.api_key)
+        self.ai = get_ai_provider()
+        self.enabled = self.ai is not None
+        # Resends of the same command (double taps, retries) are answered from memory
+        self.command_cache = TTLCache(
+            maxsize=settings.smart_parse_cache_size,
+            ttl_seconds=settings.smart_parse_cache_ttl_seconds,
+        )
+        # Re-uploads of the same receipt/audio (keyed by content hash) skip the AI entirely
+        self.media_cache = TTLCache(
+            maxsize=settings.smart_parse_media_cache_size,
+            ttl_seconds=settings.smart_parse_cache_ttl_seconds,
+        )
         
-        if self.enabled and self.provider == "gemini":
-            try:
-                genai.configure(api_key=self.api_key)
-                try:
-                    self.model = genai.GenerativeModel('models/gemini-2.5-pro')
-                    logger.info("✅ Gemini 2.5 Pro enabled for smart transactions")
-                except Exception:
-                    self.model = genai.GenerativeModel('models/gemini-2.5-flash')
-                    logger.info("✅ Gemini 2.5 Flash enabled for smart transactions")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize Gemini: {e}")
-                self.enabled = False
-        else:
+        if not self.enabled:
             logger.info("ℹ️ AI parser disabled")
     
     def parse_command(self, command: str) -> Optional[SmartTransactionResponse]:
         """
         Parse natural language command into transaction data.
         
+        The local rule-based parser runs first; the AI is only called when its
+        confidence is below `smart_parse_local_confidence_threshold`. If the AI
+        is disabled or fails, the local result (if any) is returned.
+        
         Args:
             command: Natural language command (e.g., "gastei 50 reais no uber hoje")
             
@@ -54,29 +67,47 @@ class SmartTransactionParser:
         if not command or not command.strip():
             logger.warning("⚠️ Empty command received")
             return None
+        
+        # Relative dates ("hoje", "ontem") resolve differently each day, so the date is part of the key
+        today = date.today()
+        cache_key = (" ".join(_normalize(command).split()), today)
+        cached = self.command_cache.get(cache_key)
+        if cached is not MISSING:
+            logger.info(f"♻️ Smart parse served from cache: '{command[:50]}'")
+            return cached.model_copy(update={"cached": True})
+        
+        result, cacheable = self._parse_uncached(command, today)
+        # Fallbacks (AI disabled/failing) are not cached: the next call retries the AI
+        if cacheable:
+            self.command_cache.set(cache_key, result)
+        return result
+    
+    def _parse_uncached(self, command: str, today: date) -> Tuple[Optional[SmartTransactionResponse], bool]:
+        """Returns (result, cacheable): only local results above the threshold and AI parses are cacheable."""
+        local = parse_command_locally(command, today)
+        if local and local.confidence >= settings.smart_parse_local_confidence_threshold:
+            logger.info(f"⚡ Parsed locally ({local.confidence}): {local.description} - R${local.amount}")
+            return local, True
             
         if not self.enabled:
             logger.warning("⚠️ AI parser is disabled")
-            return None
+            return local, False
         
         try:
             logger.info(f"🔍 Parsing command: '{command[:50]}...'")
-            result = self._parse_with_ai(command)
+            result = self._parse_with_ai(command, today)
             if result:
                 logger.info(f"✅ Successfully parsed: {result.description} - R${result.amount}")
             else:
                 logger.warning(f"⚠️ Failed to parse command: '{command[:50]}...'")
-            return result
+                return local, False
+            return result, True
         except Exception as e:
             logger.error(f"❌ AI parsing failed: {e}", exc_info=True)
-            return None
+            return local, False
     
-    def _parse_with_ai(self, command: str) -> Optional[SmartTransactionResponse]:
+    def _parse_with_ai(self, command: str, today: date) -> Optional[SmartTransactionResponse]:
         """Internal method to parse using AI provider."""
-        if self.provider != "gemini":
-            return None
-        
-        today = date.today()
         prompt = f"""Parse this transaction command into structured data.
 
 Command: "{command}"
@@ -97,16 +128,10 @@ Respond ONLY with valid JSON (no markdown, no explanation):
 {{"description": "...", "amount": 0.0, "type": "expense", "transaction_date": "YYYY-MM-DD", "confidence": 0.0}}"""
 
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.1,
-                    max_output_tokens=200,
-                )
-            )
+            response = self._generate(prompt, task="parse_command")
             
             # Check if response was blocked
-            if not response.candidates or not response.candidates[0].content.parts:
+            if response.blocked:
                 logger.warning(f"⚠️ AI response blocked for command: {command[:50]}")
                 return None
             
@@ -119,7 +144,6 @@ Respond ONLY with valid JSON (no markdown, no explanation):
             json_text = json_text.strip()
             
             # Parse JSON
-            import json
             data = json.loads(json_text)
             
             logger.info(f"📊 Parsed JSON data: {data}")
@@ -179,6 +203,8 @@ Respond ONLY with valid JSON (no markdown, no explanation):
         """
         Parse transaction data from an image using AI vision.
         
+        Blocking: prefer `parse_image_async` inside async endpoints.
+        
         Args:
             image_bytes: Image file bytes
             content_type: MIME type (image/jpeg, image/png, etc)
@@ -186,18 +212,135 @@ Respond ONLY with valid JSON (no markdown, no explanation):
         Returns:
             SmartTransactionResponse or None if parsing fails
         """
-        if not self.enabled:
-            logger.warning("⚠️ AI parser is disabled")
+        return self._parse_media("image", image_bytes, content_type)
+    
+    async def parse_image_async(self, image_bytes: bytes, content_type: str) -> Optional[SmartTransactionResponse]:
+        """
+        Non-blocking variant of `parse_image` using the SDK's async generation.
+        
+        Raises:
+            asyncio.TimeoutError: if the model does not answer within `ai_request_timeout_seconds`
+            CircuitOpenError: if the AI circuit breaker is open
+        """
+        return await self._parse_media_async("image", image_bytes, content_type)
+    
+    def parse_audio(self, audio_bytes: bytes, content_type: str) -> Optional[SmartTransactionResponse]:
+        """
+        Parse transaction data from audio using AI (transcription + parsing).
+        
+        Blocking: prefer `parse_audio_async` inside async endpoints.
+        
+        Args:
+            audio_bytes: Audio file bytes
+            content_type: MIME type (audio/mpeg, audio/wav, etc)
+            
+        Returns:
+            SmartTransactionResponse or None if parsing fails
+        """
+        return self._parse_media("audio", audio_bytes, content_type)
+    
+    async def parse_audio_async(self, audio_bytes: bytes, content_type: str) -> Optional[SmartTransactionResponse]:
+        """
+        Non-blocking variant of `parse_audio` using the SDK's async generation.
+        
+        Raises:
+            asyncio.TimeoutError: if the model does not answer within `ai_request_timeout_seconds`
+            CircuitOpenError: if the AI circuit breaker is open
+        """
+        return await self._parse_media_async("audio", audio_bytes, content_type)
+    
+    def _parse_media(self, kind: str, data: bytes, content_type: str) -> Optional[SmartTransactionResponse]:
+        if not self._media_parsing_available():
+            return None
+        
+        today = date.today()
+        cache_key = self._media_cache_key(data, content_type, today)
+        cached = self.media_cache.get(cache_key)
+        if cached is not MISSING:
+            logger.info(f"♻️ Duplicate {kind} upload served from cache")
+            return cached.model_copy(update={"cached": True})
+        
+        try:
+            logger.info(f"{_MEDIA_ICONS[kind]} Parsing {kind} ({content_type})")
+            if kind == "image":
+                data, content_type = preprocess_image(data, content_type)
+            response = self._generate(self._media_contents(kind, data, content_type, today), task=f"parse_{kind}")
+            result = self._media_response_to_result(response, today, kind)
+        except Exception as e:
+            logger.error(f"❌ Failed to parse {kind}: {e}", exc_info=True)
             return None
         
-        if self.provider != "gemini":
+        if result is not None:
+            self.media_cache.set(cache_key, result)
+        return result
+    
+    async def _parse_media_async(self, kind: str, data: bytes, content_type: str) -> Optional[SmartTransactionResponse]:
+        if not self._media_parsing_available():
             return None
         
+        today = date.today()
+        # hashlib releases the GIL on large buffers: hash off the event loop
+        cache_key = await asyncio.to_thread(self._media_cache_key, data, content_type, today)
+        cached = self.media_cache.get(cache_key)
+        if cached is not MISSING:
+            logger.info(f"♻️ Duplicate {kind} upload served from cache")
+            return cached.model_copy(update={"cached": True})
+        
         try:
-            logger.info(f"📸 Parsing image ({content_type})")
-            
-            today = date.today()
-            prompt = f"""Analyze this image and extract transaction data.
+            logger.info(f"{_MEDIA_ICONS[kind]} Parsing {kind} ({content_type})")
+            if kind == "image":
+                data, content_type = await preprocess_image_async(data, content_type)
+            response = await self._generate_async(self._media_contents(kind, data, content_type, today), task=f"parse_{kind}")
+            result = self._media_response_to_result(response, today, kind)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ {kind.capitalize()} parsing timed out after {settings.ai_request_timeout_seconds}s")
+            raise
+        except CircuitOpenError:
+            logger.warning(f"🔌 {kind.capitalize()} parsing skipped: AI circuit open")
+            raise
+        except Exception as e:
+            logger.error(f"❌ Failed to parse {kind}: {e}", exc_info=True)
+            return None
+        
+        if result is not None:
+            self.media_cache.set(cache_key, result)
+        return result
+    
+    @staticmethod
+    def _media_cache_key(data: bytes, content_type: str, today: date) -> tuple[str, str, date]:
+        """Content address of an upload; `today` is included because prompts default dates to today."""
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        return digest, content_type, today
+    
+    def _media_contents(self, kind: str, data: bytes, content_type: str, today: date) -> list:
+        prompt = self._image_prompt(today) if kind == "image" else self._audio_prompt(today)
+        return [prompt, {"mime_type": content_type, "data": data}]
+    
+    def _media_parsing_available(self) -> bool:
+        if not self.enabled:
+            logger.warning("⚠️ AI parser is disabled")
+            return False
+        return self.ai.supports_media
+    
+    def _generate(self, contents, task: str) -> AIResponse:
+        """Blocking model call under the shared deadline/circuit breaker."""
+        timeout = settings.ai_request_timeout_seconds
+        return call_with_resilience(
+            lambda: self.ai.generate(contents, task=task, timeout=timeout, **_GENERATION_PARAMS),
+            timeout=timeout,
+        )
+    
+    async def _generate_async(self, contents, task: str) -> AIResponse:
+        """Await the model under the shared deadline/circuit breaker."""
+        timeout = settings.ai_request_timeout_seconds
+        return await call_with_resilience_async(
+            lambda: self.ai.generate_async(contents, task=task, timeout=timeout, **_GENERATION_PARAMS),
+            timeout=timeout,
+        )
+    
+    @staticmethod
+    def _image_prompt(today: date) -> str:
+        return f"""Analyze this image and extract transaction data.
 
 Today's date: {today.isoformat()}
 
@@ -216,86 +359,10 @@ Rules:
 - type: "expense" for purchases, "income" for received payments
 - transaction_date: Date in YYYY-MM-DD (use today if not visible)
 - confidence: How confident you are (0-1)"""
-
-            response = self.model.generate_content(
-                [prompt, {"mime_type": content_type, "data": image_bytes}],
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.1,
-                    max_output_tokens=200,
-                )
-            )
-            
-            if not response.candidates or not response.candidates[0].content.parts:
-                logger.warning("⚠️ AI response blocked for image")
-                return None
-            
-            json_text = response.text.strip()
-            json_text = re.sub(r'^```json\s*', '', json_text)
-            json_text = re.sub(r'\s*```$', '', json_text)
-            json_text = json_text.strip()
-            
-            import json
-            data = json.loads(json_text)
-            
-            description = str(data.get('description', 'Transação'))[:255]
-            if not description.strip():
-                description = 'Transação'
-            
-            amount = Decimal(str(data.get('amount', 0)))
-            if amount <= 0:
-                return None
-            
-            transaction_type = data.get('type', 'expense')
-            if transaction_type not in ['income', 'expense']:
-                return None
-            
-            date_str = data.get('transaction_date', today.isoformat())
-            try:
-                transaction_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            except Exception:
-                transaction_date = today
-            
-            confidence = float(data.get('confidence', 0.5))
-            confidence = max(0.0, min(1.0, confidence))
-            
-            result = SmartTransactionResponse(
-                description=description,
-                amount=amount,
-                type=transaction_type,
-                transaction_date=transaction_date,
-                confidence=confidence
-            )
-            
-            logger.info(f"✅ Parsed image: {result.description} (R${result.amount})")
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to parse image: {e}", exc_info=True)
-            return None
     
-    def parse_audio(self, audio_bytes: bytes, content_type: str) -> Optional[SmartTransactionResponse]:
-        """
-        Parse transaction data from audio using AI (transcription + parsing).
-        
-        Args:
-            audio_bytes: Audio file bytes
-            content_type: MIME type (audio/mpeg, audio/wav, etc)
-            
-        Returns:
-            SmartTransactionResponse or None if parsing fails
-        """
-        if not self.enabled:
-            logger.warning("⚠️ AI parser is disabled")
-            return None
-        
-        if self.provider != "gemini":
-            return None
-        
-        try:
-            logger.info(f"🎤 Parsing audio ({content_type})")
-            
-            today = date.today()
-            prompt = f"""Listen to this audio and extract transaction information.
+    @staticmethod
+    def _audio_prompt(today: date) -> str:
+        return f"""Listen to this audio and extract transaction information.
 
 Today's date: {today.isoformat()}
 
@@ -310,62 +377,51 @@ Rules:
 - type: "expense" for spending, "income" for receiving
 - transaction_date: Date in YYYY-MM-DD ("hoje"=today, "ontem"=yesterday, or as mentioned)
 - confidence: How confident you are (0-1)"""
-
-            response = self.model.generate_content(
-                [prompt, {"mime_type": content_type, "data": audio_bytes}],
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.1,
-                    max_output_tokens=200,
-                )
-            )
-            
-            if not response.candidates or not response.candidates[0].content.parts:
-                logger.warning("⚠️ AI response blocked for audio")
-                return None
-            
-            json_text = response.text.strip()
-            json_text = re.sub(r'^```json\s*', '', json_text)
-            json_text = re.sub(r'\s*```$', '', json_text)
-            json_text = json_text.strip()
-            
-            import json
-            data = json.loads(json_text)
-            
-            description = str(data.get('description', 'Transação'))[:255]
-            if not description.strip():
-                description = 'Transação'
-            
-            amount = Decimal(str(data.get('amount', 0)))
-            if amount <= 0:
-                return None
-            
-            transaction_type = data.get('type', 'expense')
-            if transaction_type not in ['income', 'expense']:
-                return None
-            
-            date_str = data.get('transaction_date', today.isoformat())
-            try:
-                transaction_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            except Exception:
-                transaction_date = today
-            
-            confidence = float(data.get('confidence', 0.5))
-            confidence = max(0.0, min(1.0, confidence))
-            
-            result = SmartTransactionResponse(
-                description=description,
-                amount=amount,
-                type=transaction_type,
-                transaction_date=transaction_date,
-                confidence=confidence
-            )
-            
-            logger.info(f"✅ Parsed audio: {result.description} (R${result.amount})")
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to parse audio: {e}", exc_info=True)
+    
+    def _media_response_to_result(self, response: AIResponse, today: date, kind: str) -> Optional[SmartTransactionResponse]:
+        """Validate the model's JSON answer for an image/audio prompt."""
+        if response.blocked:
+            logger.warning(f"⚠️ AI response blocked for {kind}")
             return None
+        
+        json_text = response.text.strip()
+        json_text = re.sub(r'^```json\s*', '', json_text)
+        json_text = re.sub(r'\s*```$', '', json_text)
+        json_text = json_text.strip()
+        
+        data = json.loads(json_text)
+        
+        description = str(data.get('description', 'Transação'))[:255]
+        if not description.strip():
+            description = 'Transação'
+        
+        amount = Decimal(str(data.get('amount', 0)))
+        if amount <= 0:
+            return None
+        
+        transaction_type = data.get('type', 'expense')
+        if transaction_type not in ['income', 'expense']:
+            return None
+        
+        date_str = data.get('transaction_date', today.isoformat())
+        try:
+            transaction_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except Exception:
+            transaction_date = today
+        
+        confidence = float(data.get('confidence', 0.5))
+        confidence = max(0.0, min(1.0, confidence))
+        
+        result = SmartTransactionResponse(
+            description=description,
+            amount=amount,
+            type=transaction_type,
+            transaction_date=transaction_date,
+            confidence=confidence
+        )
+        
+        logger.info(f"✅ Parsed {kind}: {result.description} (R${result.amount})")
+        return result
 
 
 # Singleton instance
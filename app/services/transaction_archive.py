@@ -0,0 +1,139 @@
+"""
+Cold-history archival.
+
+Transactions dated before the horizon (`archive_after_months`, aligned to the
+first day of a month) are moved from `transactions` to `archived_transactions`
+in batches. Each batch is one DB transaction: the move itself (a single
+`WITH moved AS (DELETE ... RETURNING) INSERT ...`), the rebuild of the touched
+months in `transaction_month_summaries` and the `users.archived_before`
+watermark, so readers never see a half-archived month.
+
+Reads that reach before a user's watermark (listing, daily balance, insights,
+budget spent, category stats) merge the archive in; everything newer is
+served by the hot table and its indexes alone. The archive is read-only.
+
+- In-process: with `archive_enabled`, the API runs a sweep every
+  `archive_interval_seconds`.
+- Standalone (cron): `python -m app.archive`
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings, SessionLocal
+from app.repositories import TransactionArchiveRepository
+from app.services import category_stats
+
+logger = logging.getLogger(__name__)
+
+
+def archive_cutoff(today: date, months: int) -> date:
+    """First day of the month `months` before today's month (the current month is never archived)."""
+    index = today.year * 12 + today.month - 1 - max(1, months)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class TransactionArchiver:
+    def __init__(self, batch_size: Optional[int] = None, session_factory: Callable[[], Session] = SessionLocal):
+        self.batch_size = batch_size if batch_size is not None else settings.archive_batch_size
+        self.session_factory = session_factory
+
+    def run_once(self, today: Optional[date] = None, should_stop: Callable[[], bool] = lambda: False) -> int:
+        """Archive every user's history older than the horizon. Returns the number of rows moved."""
+        cutoff = archive_cutoff(today or date.today(), settings.archive_after_months)
+        db = self.session_factory()
+        try:
+            user_ids = TransactionArchiveRepository(db).users_with_rows_before(cutoff)
+        finally:
+            db.close()
+
+        moved = 0
+        for user_id in user_ids:
+            if should_stop():
+                break
+            try:
+                moved += self.archive_user(user_id, cutoff)
+            except Exception as e:
+                logger.error(f"❌ Archival failed for user {user_id}: {e}", exc_info=True)
+        if moved:
+            logger.info(f"🗄️ Archived {moved} transaction(s) of {len(user_ids)} user(s) dated before {cutoff}")
+        return moved
+
+    def archive_user(self, user_id: int, cutoff: date) -> int:
+        moved = 0
+        while True:
+            count = self._archive_batch(user_id, cutoff)
+            moved += count
+            if count < self.batch_size:
+                break
+        if moved:
+            category_stats.invalidate(user_id)
+        return moved
+
+    def _archive_batch(self, user_id: int, cutoff: date) -> int:
+        db = self.session_factory()
+        try:
+            repo = TransactionArchiveRepository(db)
+            dates = repo.move_batch(user_id, cutoff, self.batch_size)
+            if dates:
+                repo.rebuild_summaries(user_id, min(dates), max(dates))
+                repo.mark_archived(user_id, cutoff)
+            db.commit()
+            return len(dates)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+class ArchiveScheduler:
+    """Single asyncio task running `TransactionArchiver.run_once` periodically (off the event loop)."""
+
+    def __init__(self, interval: Optional[float] = None, archiver: Optional[TransactionArchiver] = None):
+        self.interval = interval if interval is not None else settings.archive_interval_seconds
+        self.archiver = archiver or TransactionArchiver()
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is not None or not settings.archive_enabled:
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="transaction-archive")
+        logger.info(f"🧵 Transaction archival scheduled every {self.interval:.0f}s")
+
+    async def stop(self) -> None:
+        """The sweep in progress finishes its current user; batches already committed stay archived."""
+        if self._task is None:
+            return
+        self._stop.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("🛑 Transaction archival stopped")
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.to_thread(self.archiver.run_once, None, self._stop.is_set)
+            except Exception as e:
+                logger.error(f"❌ Transaction archival sweep failed: {e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+_scheduler: Optional[ArchiveScheduler] = None
+
+
+def get_archive_scheduler() -> ArchiveScheduler:
+    """Get or create the process-wide archival scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ArchiveScheduler()
+    return _scheduler
@@ -0,0 +1,135 @@
+"""
+Categorization of stored transactions: rules first, AI only for rule misses.
+
+Used by the history backfill and, after commit, for every transaction created
+without a category: suggestions are mapped onto the user's existing
+categories (case-insensitive) and missing ones are get-or-created as
+auto-generated, then every pick is written with one bulk UPDATE.
+
+Post-create categorization runs in a small thread pool, so AI latency never
+reaches the create request nor occupies the web threadpool. On shutdown the
+queue is drained for up to `auto_categorize_drain_seconds`; whatever is still
+queued after that (or lost in a crash) stays uncategorized until the user runs
+a history backfill.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings, SessionLocal
+from app.infrastructure.database import User
+from app.repositories import CategoryRepository, TransactionRepository
+from app.services.auto_categorizer import RULE_CATEGORIES, suggest_category
+from app.services.ai_category_service import AICategoryService, get_ai_category_service
+from app.services.transaction_service import TransactionService
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionCategorizer:
+    def __init__(self, db: Session, ai_service: Optional[AICategoryService] = None, use_ai: bool = True):
+        self.categories = CategoryRepository(db)
+        self.transactions = TransactionService(TransactionRepository(db))
+        self.ai_service = ai_service
+        self.use_ai = use_ai
+
+    def suggest(self, user: User, descriptions: list[str]) -> list[Optional[str]]:
+        """One category name (or None) per description, spelled as the user's category when it exists."""
+        existing = {c.name.lower(): c.name for c in self.categories.list_by_user(user.id)}
+        names: list[Optional[str]] = [suggest_category(d) for d in descriptions]
+
+        misses = [i for i, name in enumerate(names) if name is None and descriptions[i]]
+        if misses and self.use_ai:
+            available = sorted(set(existing.values()) | {n for n in RULE_CATEGORIES if n.lower() not in existing})
+            ai = self.ai_service or get_ai_category_service()
+            if len(misses) == 1:
+                # Single creates go through the micro-batcher, coalescing concurrent requests
+                answers = [ai.categorize(descriptions[misses[0]], available)]
+            else:
+                answers = ai.categorize_many([descriptions[i] for i in misses], available)
+            for i, name in zip(misses, answers):
+                names[i] = name
+
+        return [existing.get(name.lower(), name) if name else None for name in names]
+
+    def categorize(
+        self,
+        user: User,
+        rows: list,
+        before_commit: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Categorize rows (id, description) and commit. Returns how many were categorized;
+        `before_commit` runs in the same DB transaction with that count.
+        """
+        names = self.suggest(user, [row.description for row in rows])
+        ids = self.categories.get_or_create_many(user.id, [name for name in names if name])
+        assignments = {row.id: ids[name] for row, name in zip(rows, names) if name in ids}
+        return self.transactions.assign_categories(user, assignments, before_commit)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending: set[Future] = set()
+_pending_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.auto_categorize_workers, thread_name_prefix="auto-categorize"
+        )
+    return _executor
+
+
+def shutdown_executor(drain_timeout: Optional[float] = None) -> None:
+    """Stop accepting work and let queued categorizations finish, up to `drain_timeout` seconds (blocking)."""
+    global _executor
+    if _executor is None:
+        return
+    executor, _executor = _executor, None
+    drain_timeout = drain_timeout if drain_timeout is not None else settings.auto_categorize_drain_seconds
+    with _pending_lock:
+        pending = set(_pending)
+    _, not_done = wait(pending, timeout=drain_timeout)
+    dropped = sum(1 for future in not_done if future.cancel())
+    executor.shutdown(wait=False, cancel_futures=True)
+    if dropped:
+        logger.warning(f"⏱️ {dropped} queued auto-categorization(s) dropped after the drain timeout")
+
+
+def _track(future: Future) -> None:
+    with _pending_lock:
+        _pending.add(future)
+
+    def _done(f: Future) -> None:
+        with _pending_lock:
+            _pending.discard(f)
+
+    future.add_done_callback(_done)
+
+
+def categorize_in_background(user_id: int, transaction_ids: list[int]) -> None:
+    """Schedule categorization of already committed transactions, off the request path."""
+    if transaction_ids:
+        _track(_get_executor().submit(_categorize_committed, user_id, transaction_ids))
+
+
+def _categorize_committed(user_id: int, transaction_ids: list[int]) -> None:
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        if user is None or not user.auto_categorize_enabled:
+            return
+        rows = TransactionRepository(db).uncategorized_by_ids(user_id, transaction_ids)
+        if rows:
+            categorized = TransactionCategorizer(db).categorize(user, rows)
+            logger.info(f"🏷️ Auto-categorized {categorized}/{len(rows)} new transaction(s) of user {user_id}")
+    except Exception as e:
+        logger.error(f"❌ Auto-categorization failed for transactions {transaction_ids}: {e}", exc_info=True)
+    finally:
+        db.close()
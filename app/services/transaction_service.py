@@ -1,25 +1,114 @@
-from typing import List, Dict, Optional
+import base64
+from typing import Callable, Iterable, List, Dict, Optional
 from datetime import date, timedelta
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from types import SimpleNamespace
 
-from app.repositories import TransactionRepository
+from app.domain.budgets import budget_status
+from app.repositories import TransactionRepository, BudgetRepository
 from app.infrastructure.database import Transaction, TransactionType, User
-from app.schemas.transaction import TransactionCreate, TransactionUpdate
+from app.schemas.transaction import (
+    TransactionCreate,
+    TransactionUpdate,
+    TransactionRecategorize,
+    TransactionSelection,
+    TransactionBulkUpdate,
+    TransactionResponse,
+    TransactionSearchResult,
+    TransactionSearchPage,
+    TransactionSort,
+)
+from app.schemas.recurring_transaction import RecurringOccurrence
+from app.services.auto_categorizer import _normalize
+from app.services import budget_events, category_stats
+from app.services.budget_events import BudgetAlertEvent
+
+# ((category_id, year, month), amount) de uma despesa categorizada
+SpendEntry = Optional[tuple[tuple[int, int, int], Decimal]]
+
+
+def spend_entry(transaction: Transaction) -> SpendEntry:
+    """Budget bucket a transaction counts towards (only categorized expenses count)."""
+    if transaction.type != TransactionType.EXPENSE or transaction.category_id is None:
+        return None
+    d = transaction.transaction_date
+    return (transaction.category_id, d.year, d.month), Decimal(transaction.amount)
+
+
+def spend_deltas(before: SpendEntry, after: SpendEntry) -> Dict[tuple[int, int, int], Decimal]:
+    deltas: Dict[tuple[int, int, int], Decimal] = {}
+    if before is not None:
+        deltas[before[0]] = deltas.get(before[0], Decimal("0")) - before[1]
+    if after is not None:
+        deltas[after[0]] = deltas.get(after[0], Decimal("0")) + after[1]
+    return {key: delta for key, delta in deltas.items() if delta != 0}
+
+
+def _encode_search_cursor(rank: Decimal, transaction_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{rank}:{transaction_id}".encode()).decode()
+
+
+def _decode_search_cursor(cursor: str) -> tuple[Decimal, int]:
+    try:
+        rank, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return Decimal(rank), int(transaction_id)
+    except (ValueError, InvalidOperation, UnicodeDecodeError):
+        raise ValueError("Cursor de paginação inválido")
+
+
+def _balance_thresholds(user: User) -> Optional[tuple[float, float, float]]:
+    """User's (bad, ok, good) balance thresholds, or None when not (consistently) configured."""
+    bad_t = user.bad_threshold
+    ok_t = user.ok_threshold
+    good_t = user.good_threshold
+    if bad_t is None or ok_t is None or good_t is None:
+        return None
+    # Regra de negócio garante thresholds crescentes no momento da configuração.
+    # Se houver qualquer inconsistência (ex: manipulação direta no banco), marcamos como 'unconfigured'.
+    if not (bad_t <= ok_t <= good_t):
+        return None
+    return bad_t, ok_t, good_t
+
+
+def _balance_status(balance: Decimal, thresholds: Optional[tuple[float, float, float]]) -> str:
+    if thresholds is None:
+        return "unconfigured"
+    bad_t, ok_t, _ = thresholds
+    bal = float(balance)
+    # Lógica: valor <= threshold indica nível
+    # Exemplo: bad=3000, ok=5000, good=8000
+    # - balance <= 3000 => red (ruim)
+    # - balance <= 5000 => yellow (médio)
+    # - balance <= 8000 => green (bom)
+    # - balance > 8000 => green (também bom)
+    if bal <= bad_t:
+        return "red"
+    if bal <= ok_t:
+        return "yellow"
+    return "green"
 
 
 class TransactionService:
-    def __init__(self, repository: TransactionRepository):
+    def __init__(self, repository: TransactionRepository, budget_repo: Optional[BudgetRepository] = None):
         self.repository = repository
+        self.budget_repo = budget_repo or BudgetRepository(repository.db)
 
     def create_transaction(self, transaction_data: TransactionCreate, user: User) -> Transaction:
+        self._check_category(transaction_data.category_id, user)
         transaction = Transaction(
             user_id=user.id,
             description=transaction_data.description,
             amount=transaction_data.amount,
             type=transaction_data.type,
             transaction_date=transaction_data.transaction_date,
+            category_id=transaction_data.category_id,
         )
-        return self.repository.create(transaction)
+        transaction = self.repository.create(transaction, commit=False)
+        events = self._apply_spend(user, None, spend_entry(transaction))
+        self.repository.commit(transaction)
+        category_stats.invalidate(user.id)
+        budget_events.publish(events)
+        return transaction
 
     def get_transaction(self, transaction_id: int, user: User) -> Transaction:
         transaction = self.repository.get_by_id(transaction_id)
@@ -35,30 +124,292 @@ class TransactionService:
         skip: int = 0,
         limit: int = 100,
         on_date: Optional[date] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        transaction_type: Optional[TransactionType] = None,
+        category_id: Optional[int] = None,
+        uncategorized: bool = False,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        sort: TransactionSort = TransactionSort.DATE_DESC,
     ) -> List[Transaction]:
+        if start_date and end_date and start_date > end_date:
+            raise ValueError("start deve ser anterior ou igual a end")
+        if min_amount is not None and max_amount is not None and min_amount > max_amount:
+            raise ValueError("min_amount deve ser menor ou igual a max_amount")
         return self.repository.get_by_user(
-            user.id, skip=skip, limit=limit, on_date=on_date
+            user.id,
+            skip=skip,
+            limit=limit,
+            on_date=on_date,
+            sort=sort.value,
+            archived_before=user.archived_before,
+            start_date=start_date,
+            end_date=end_date,
+            transaction_type=transaction_type,
+            category_id=category_id,
+            uncategorized=uncategorized,
+            min_amount=min_amount,
+            max_amount=max_amount,
         )
 
+    def search_transactions(self, user: User, query: str, limit: int = 20, cursor: Optional[str] = None) -> TransactionSearchPage:
+        """Ranked search over descriptions (accent/case-insensitive), keyset-paginated by an opaque cursor."""
+        normalized = " ".join(_normalize(query).split())
+        if not normalized:
+            return TransactionSearchPage(items=[])
+        after = _decode_search_cursor(cursor) if cursor else None
+        rows = self.repository.search(user.id, normalized, limit + 1, after, archived_before=user.archived_before)
+        page = rows[:limit]
+        items = [
+            TransactionSearchResult(**TransactionResponse.model_validate(transaction).model_dump(), rank=float(rank))
+            for transaction, rank in page
+        ]
+        next_cursor = _encode_search_cursor(page[-1][1], page[-1][0].id) if len(rows) > limit else None
+        return TransactionSearchPage(items=items, next_cursor=next_cursor)
+
     def update_transaction(self, transaction_id: int, transaction_data: TransactionUpdate, user: User) -> Transaction:
-        transaction = self.repository.get_by_id(transaction_id)
+        # Locked until commit: concurrent updates/deletes of the same row see its final state
+        transaction = self.repository.get_by_id(transaction_id, for_update=True)
         if not transaction:
             raise ValueError(f"Transação com id {transaction_id} não encontrada")
         if transaction.user_id != user.id:
             raise ValueError("Você não tem permissão para atualizar esta transação")
         
         updates = transaction_data.model_dump(exclude_unset=True)
-        transaction = self.repository.update(transaction_id, updates)
+        self._check_category(updates.get("category_id"), user)
+        before = spend_entry(transaction)
+        transaction = self.repository.update(transaction_id, updates, commit=False)
+        events = self._apply_spend(user, before, spend_entry(transaction))
+        self.repository.commit(transaction)
+        category_stats.invalidate(user.id)
+        budget_events.publish(events)
         return transaction
 
     def delete_transaction(self, transaction_id: int, user: User) -> bool:
-        transaction = self.repository.get_by_id(transaction_id)
+        # A second concurrent delete waits here and then finds no row (budget released once)
+        transaction = self.repository.get_by_id(transaction_id, for_update=True)
         if not transaction:
             raise ValueError(f"Transação com id {transaction_id} não encontrada")
         if transaction.user_id != user.id:
             raise ValueError("Você não tem permissão para deletar esta transação")
         
-        return self.repository.delete(transaction_id)
+        events = self._apply_spend(user, spend_entry(transaction), None)
+        deleted = self.repository.delete(transaction_id, commit=False)
+        self.repository.commit()
+        category_stats.invalidate(user.id)
+        budget_events.publish(events)
+        return deleted
+
+    def _check_category(self, category_id: Optional[int], user: User) -> None:
+        if category_id is not None and not self.repository.category_belongs_to_user(category_id, user.id):
+            raise ValueError(f"Categoria com id {category_id} não encontrada")
+
+    def recategorize(self, data: TransactionRecategorize, user: User) -> int:
+        """Move every matching transaction to `data.category_id` with one UPDATE. Returns the count."""
+        self._check_category(data.category_id, user)
+        self._check_category(data.from_category_id, user)
+        conditions = self.repository.match_conditions(
+            user.id,
+            category_id=data.from_category_id,
+            uncategorized=data.uncategorized,
+            description_contains=data.description_contains,
+            transaction_type=data.type,
+            start_date=data.start_date,
+            end_date=data.end_date,
+        )
+        if data.category_id is not None:
+            conditions.append(Transaction.category_id.is_distinct_from(data.category_id))
+        return self.reassign_category(user, conditions, data.category_id)
+
+    def bulk_update(self, data: TransactionBulkUpdate, user: User) -> int:
+        """
+        Apply the same changes to every selected transaction with one UPDATE.
+
+        The selection is locked first (SELECT ... FOR UPDATE) and the UPDATE targets
+        exactly the locked ids, so the budget deltas computed from those rows stay
+        right under concurrent writes. Counters are adjusted once for the batch.
+        """
+        changes = data.changes.model_dump(exclude_unset=True)
+        self._check_category(changes.get("category_id"), user)
+        rows = self.repository.lock_matching(self._selection_conditions(data, user))
+        if not rows:
+            return 0
+
+        deltas: Dict[tuple[int, int, int], Decimal] = {}
+        for row in rows:
+            after = SimpleNamespace(**{**row._asdict(), **changes})
+            for key, delta in spend_deltas(spend_entry(row), spend_entry(after)).items():
+                deltas[key] = deltas.get(key, Decimal("0")) + delta
+
+        updated = self.repository.update_matching([Transaction.id.in_([row.id for row in rows])], changes)
+        events = self._apply_deltas(user, {key: delta for key, delta in deltas.items() if delta != 0})
+        self.repository.commit()
+        if updated:
+            category_stats.invalidate(user.id)
+        budget_events.publish(events)
+        return updated
+
+    def bulk_delete(self, data: TransactionSelection, user: User) -> int:
+        """
+        Delete every selected transaction with one DELETE ... RETURNING; the budget
+        spend released comes from the rows actually deleted (once per batch).
+        """
+        rows = self.repository.delete_matching(self._selection_conditions(data, user))
+        deltas: Dict[tuple[int, int, int], Decimal] = {}
+        for row in rows:
+            entry = spend_entry(row)
+            if entry is not None:
+                deltas[entry[0]] = deltas.get(entry[0], Decimal("0")) - entry[1]
+        events = self._apply_deltas(user, {key: delta for key, delta in deltas.items() if delta != 0})
+        self.repository.commit()
+        if rows:
+            category_stats.invalidate(user.id)
+        budget_events.publish(events)
+        return len(rows)
+
+    def _selection_conditions(self, data: TransactionSelection, user: User) -> list:
+        """WHERE clauses for `ids` or `filter`, always scoped to the user's own transactions."""
+        if data.ids is not None:
+            return [Transaction.user_id == user.id, Transaction.id.in_(set(data.ids))]
+        f = data.filter
+        return self.repository.match_conditions(
+            user.id,
+            category_id=f.category_id,
+            uncategorized=f.uncategorized,
+            description_contains=f.description_contains,
+            transaction_type=f.type,
+            start_date=f.start_date,
+            end_date=f.end_date,
+            min_amount=f.min_amount,
+            max_amount=f.max_amount,
+        )
+
+    def reassign_category(
+        self,
+        user: User,
+        conditions: list,
+        category_id: Optional[int],
+        before_commit: Optional[Callable[[], None]] = None,
+        released_category_id: Optional[int] = None,
+    ) -> int:
+        """
+        Set-based category change: one grouped SELECT for the budget deltas, one
+        UPDATE of the transactions, then the budget counters, all in one DB transaction.
+
+        The UPDATE bypasses the per-row write path, so `budgets.spent` is adjusted
+        here from the per-(category, month) expense totals. `before_commit` runs extra
+        cleanup in the same transaction; budgets of `released_category_id` are being
+        deleted by it and are not adjusted.
+        """
+        totals = self.repository.expense_totals(conditions)
+        updated = self.repository.set_category(conditions, category_id)
+
+        deltas: Dict[tuple[int, int, int], Decimal] = {}
+        for old_category_id, year, month, total in totals:
+            year, month, total = int(year), int(month), Decimal(total)
+            if old_category_id != released_category_id:
+                key = (old_category_id, year, month)
+                deltas[key] = deltas.get(key, Decimal("0")) - total
+            if category_id is not None:
+                key = (category_id, year, month)
+                deltas[key] = deltas.get(key, Decimal("0")) + total
+        events = self._apply_deltas(user, {key: delta for key, delta in deltas.items() if delta != 0})
+
+        if before_commit is not None:
+            before_commit()
+        self.repository.commit()
+        category_stats.invalidate(user.id)
+        budget_events.publish(events)
+        return updated
+
+    def assign_categories(
+        self,
+        user: User,
+        category_by_transaction: Dict[int, int],
+        before_commit: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Categorize still-uncategorized transactions in one UPDATE and commit.
+
+        Budget counters of the newly categorized expenses are bumped in the same
+        DB transaction; `before_commit` gets the number of rows updated (e.g. to
+        write a checkpoint atomically with the batch).
+        """
+        rows = self.repository.assign_categories(user.id, category_by_transaction)
+        deltas: Dict[tuple[int, int, int], Decimal] = {}
+        for row in rows:
+            entry = spend_entry(row)
+            if entry is not None:
+                deltas[entry[0]] = deltas.get(entry[0], Decimal("0")) + entry[1]
+        events = self._apply_deltas(user, deltas)
+        if before_commit is not None:
+            before_commit(len(rows))
+        self.repository.commit()
+        if rows:
+            category_stats.invalidate(user.id)
+        budget_events.publish(events)
+        return len(rows)
+
+    def _apply_spend(self, user: User, before: SpendEntry, after: SpendEntry) -> List[BudgetAlertEvent]:
+        """Update budget counters in the current DB transaction; return level changes to publish after commit."""
+        return self._apply_deltas(user, spend_deltas(before, after))
+
+    def _apply_deltas(self, user: User, deltas: Dict[tuple[int, int, int], Decimal]) -> List[BudgetAlertEvent]:
+        if not deltas:
+            return []
+        events = []
+        for row in self.budget_repo.apply_spent_deltas(user.id, deltas):
+            delta = deltas[(row.category_id, row.year, row.month)]
+            previous = budget_status(row.spent - delta, row.amount, row.notify_threshold)
+            if previous != row.alert_level:
+                events.append(BudgetAlertEvent(
+                    user_id=user.id,
+                    budget_id=row.id,
+                    category_id=row.category_id,
+                    year=row.year,
+                    month=row.month,
+                    previous_status=previous,
+                    status=row.alert_level,
+                    spent=Decimal(row.spent),
+                    amount=Decimal(row.amount),
+                ))
+        return events
+
+    def forecast_balance(self, user: User, until: date, projected: Iterable[RecurringOccurrence]) -> List[Dict]:
+        """
+        Daily balance from the first day of the current month through `until`.
+
+        Same running balance and status as `calculate_daily_balance`; recorded
+        transactions come aggregated per day from the database and `projected`
+        occurrences (date-ordered, e.g. from recurring rules) are added for the
+        days after today. Everything else is an in-memory merge.
+        """
+        today = date.today()
+        start_date = today.replace(day=1)
+        net_by_date = self.repository.daily_net(user.id, start_date, until)
+        for occurrence in projected:
+            if occurrence.date <= today:
+                continue
+            if occurrence.date > until:
+                break
+            signed = occurrence.amount if occurrence.type == TransactionType.INCOME else -occurrence.amount
+            net_by_date[occurrence.date] = net_by_date.get(occurrence.date, Decimal("0")) + signed
+
+        thresholds = _balance_thresholds(user)
+        balance = Decimal("0.00")
+        series = []
+        current_date = start_date
+        while current_date <= until:
+            balance += net_by_date.get(current_date, Decimal("0"))
+            series.append({
+                "date": current_date.isoformat(),
+                "balance": float(balance),
+                "status": _balance_status(balance, thresholds),
+                "projected": current_date > today,
+            })
+            current_date += timedelta(days=1)
+        return series
 
     def calculate_daily_balance(self, year: int, month: int, user: User) -> List[Dict]:
         try:
@@ -69,7 +420,7 @@ class TransactionService:
             else:
                 end_date = date(year, month + 1, 1) - timedelta(days=1)
             
-            transactions = self.repository.get_by_date_range_and_user(start_date, end_date, user.id)
+            transactions = self.repository.get_by_date_range_and_user(start_date, end_date, user.id, user.archived_before)
             
             daily_balances = []
             current_balance = Decimal("0.00")
@@ -81,18 +432,7 @@ class TransactionService:
                 transactions_by_date[transaction.transaction_date].append(transaction)
             
             current_date = start_date
-            # Capturar preferências do usuário
-            bad_t = user.bad_threshold
-            ok_t = user.ok_threshold
-            good_t = user.good_threshold
-
-            # Regra de negócio garante thresholds crescentes no momento da configuração.
-            # Se houver qualquer inconsistência (ex: manipulação direta no banco), marcamos como 'unconfigured'.
-            if (
-                bad_t is not None and ok_t is not None and good_t is not None and
-                not (bad_t <= ok_t <= good_t)
-            ):
-                bad_t = ok_t = good_t = None  # Força status 'unconfigured'
+            thresholds = _balance_thresholds(user)
 
             while current_date <= end_date:
                 if current_date in transactions_by_date:
@@ -102,24 +442,7 @@ class TransactionService:
                         else:
                             current_balance -= transaction.amount
 
-                # Determinar status com base nas preferências (FORA do if)
-                status = None
-                if bad_t is None or ok_t is None or good_t is None:
-                    status = "unconfigured"
-                else:
-                    bal = float(current_balance)
-                    # Lógica: valor <= threshold indica nível
-                    # Exemplo: bad=3000, ok=5000, good=8000
-                    # - balance <= 3000 => red (ruim)
-                    # - balance <= 5000 => yellow (médio)
-                    # - balance <= 8000 => green (bom)
-                    # - balance > 8000 => green (também bom)
-                    if bal <= bad_t:
-                        status = "red"
-                    elif bal <= ok_t:
-                        status = "yellow"
-                    else:
-                        status = "green"
+                status = _balance_status(current_balance, thresholds)
 
                 daily_balances.append({
                     "date": current_date.isoformat(),
@@ -10,6 +10,7 @@ from app.schemas.user import (
     UserPreferencesInit,
 )
 from app.infrastructure.database import User
+from app.services.categorization_backfill import request_backfill
 
 
 class UserService:
@@ -47,7 +48,12 @@ class UserService:
 
         # Atualizar apenas os campos fornecidos
         update_data = profile_data.model_dump(exclude_unset=True)
+        was_auto_categorizing = bool(user.auto_categorize_enabled)
         updated_user = self.user_repository.update_profile(user, **update_data)
+
+        # Ao ativar a categorização automática, categoriza também o histórico (em background)
+        if updated_user.auto_categorize_enabled and not was_auto_categorizing:
+            request_backfill(self.user_repository.db, user_id)
         
         return self._user_to_profile(updated_user)
 
@@ -0,0 +1,143 @@
+"""
+Compara o custo de CPU por requisição entre o caminho padrão do FastAPI
+(`response_model` → validação `from_attributes` → encoder da stdlib) e o
+caminho rápido (`list_response` / `ORJSONResponse`).
+
+Não usa banco: as linhas são objetos ORM transitórios montados em memória.
+
+    python -m scripts.bench_serialization [--rows 200] [--days 31] [--requests 300]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from fastapi.testclient import TestClient
+
+from app.config import settings  # noqa: F401  (carrega a configuração antes dos models)
+from app.api.responses import list_response
+from app.infrastructure.database import Category, Transaction, TransactionType
+from app.schemas import DailyBalanceResponse, TransactionResponse
+
+
+def build_rows(count: int) -> List[Transaction]:
+    categories = [Category(id=i, name=f"Categoria {i}") for i in range(1, 11)]
+    start = date(2025, 1, 1)
+    return [
+        Transaction(
+            id=i,
+            user_id=1,
+            description=f"Compra número {i} no mercado",
+            amount=Decimal("10.00") + i,
+            type=TransactionType.EXPENSE if i % 3 else TransactionType.INCOME,
+            transaction_date=start + timedelta(days=i % 365),
+            category_id=categories[i % 10].id,
+            category=categories[i % 10],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def build_series(days: int) -> List[dict]:
+    start = date(2025, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "balance": 1000.0 - i * 12.5, "status": "green"}
+        for i in range(days)
+    ]
+
+
+def build_app(rows: List[Transaction], series: List[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default/transactions", response_model=List[TransactionResponse])
+    def default_transactions():
+        return rows
+
+    @app.get("/fast/transactions", response_model=List[TransactionResponse])
+    def fast_transactions():
+        return list_response(TransactionResponse, rows)
+
+    @app.get("/default/balance", response_model=List[DailyBalanceResponse])
+    def default_balance():
+        return series
+
+    @app.get("/fast/balance", response_model=List[DailyBalanceResponse])
+    def fast_balance():
+        return ORJSONResponse(series)
+
+    return app
+
+
+def cpu_per_request(client: TestClient, path: str, requests: int) -> float:
+    """Tempo de CPU médio (ms) por requisição; inclui o overhead fixo do TestClient."""
+    for _ in range(10):
+        client.get(path)
+    started = time.process_time()
+    for _ in range(requests):
+        response = client.get(path)
+        response.raise_for_status()
+    return (time.process_time() - started) * 1000 / requests
+
+
+def serialization_cpu(app: FastAPI, path: str, fast_path: str, requests: int) -> tuple:
+    """
+    Só a etapa de serialização (ms por requisição), sem HTTP: o que o FastAPI faz
+    com o retorno do endpoint (`serialize_response` + `JSONResponse`) contra o
+    endpoint rápido, que já devolve os bytes.
+    """
+    routes = {route.path: route for route in app.routes if isinstance(route, APIRoute)}
+    default_route, fast_route = routes[path], routes[fast_path]
+
+    async def default_run():
+        content = await serialize_response(
+            field=default_route.secure_cloned_response_field, response_content=default_route.endpoint()
+        )
+        return JSONResponse(content).body
+
+    def fast_run():
+        return fast_route.endpoint().body
+
+    async def measure():
+        started = time.process_time()
+        for _ in range(requests):
+            await default_run()
+        default = (time.process_time() - started) * 1000 / requests
+        started = time.process_time()
+        for _ in range(requests):
+            fast_run()
+        return default, (time.process_time() - started) * 1000 / requests
+
+    return asyncio.run(measure())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    app = build_app(build_rows(args.rows), build_series(args.days))
+    client = TestClient(app)
+    endpoints = ((f"transações ({args.rows} linhas)", "transactions"), (f"saldo diário ({args.days} dias)", "balance"))
+
+    print(f"{'requisição completa':<30}{'padrão (ms)':>14}{'rápido (ms)':>14}{'redução':>10}")
+    for name, kind in endpoints:
+        default = cpu_per_request(client, f"/default/{kind}", args.requests)
+        fast = cpu_per_request(client, f"/fast/{kind}", args.requests)
+        print(f"{name:<30}{default:>14.3f}{fast:>14.3f}{(1 - fast / default):>10.0%}")
+
+    print(f"\n{'só serialização':<30}{'padrão (ms)':>14}{'rápido (ms)':>14}{'redução':>10}")
+    for name, kind in endpoints:
+        default, fast = serialization_cpu(app, f"/default/{kind}", f"/fast/{kind}", args.requests)
+        print(f"{name:<30}{default:>14.3f}{fast:>14.3f}{(1 - fast / default):>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
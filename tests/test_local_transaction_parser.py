@@ -0,0 +1,25 @@
+from datetime import date
+from decimal import Decimal
+
+import app.config  # noqa: F401  (carrega a configuração antes dos services)
+from app.services.local_transaction_parser import parse_command_locally
+
+TODAY = date(2026, 10, 19)
+
+
+def test_decimal_thousands_amount_keeps_description():
+    result = parse_command_locally("gastei 1,5 mil em televisao hoje", TODAY)
+
+    assert result.amount == Decimal("1500.00")
+    assert result.description == "Televisao"
+    assert result.type == "expense"
+    assert result.transaction_date == TODAY
+
+
+def test_thousands_amount_with_currency_is_not_ambiguous():
+    result = parse_command_locally("comprei geladeira 2 mil reais ontem", TODAY)
+
+    assert result.amount == Decimal("2000.00")
+    assert result.description == "Geladeira"
+    assert result.transaction_date == date(2026, 10, 18)
+    assert result.confidence == 1.0